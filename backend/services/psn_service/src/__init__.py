@@ -1,3 +1,14 @@
-from ._psnawp import get_psn_user, PSNUserProfile
+from ._psnawp import get_psn_user, get_presences, invalidate_psn_user, PSNUserProfile
+from ._accounts import get_account_id_store, AccountIdStore
+from ._session import get_psn_session, PSNSession
 
-__all__ = ["get_psn_user", "PSNUserProfile"]
+__all__ = [
+    "get_psn_user",
+    "get_presences",
+    "invalidate_psn_user",
+    "PSNUserProfile",
+    "get_account_id_store",
+    "AccountIdStore",
+    "get_psn_session",
+    "PSNSession",
+]
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# SQLite file remembering the account ID of every online ID looked up
+ACCOUNT_DB_PATH = os.getenv("PSN_ACCOUNT_DB", "data/psn_accounts.db")
+
+# Account IDs never change, but an online ID can be renamed or handed to another
+# account, so a resolution is looked up again after this many seconds
+ACCOUNT_ID_MAX_AGE = int(os.getenv("PSN_ACCOUNT_ID_MAX_AGE", 30 * 24 * 60 * 60))
+
+
+class AccountIdStore:
+    """Thread-safe, persistent map of online IDs to PSN account IDs
+
+    Resolving an online ID costs a PSN request before any data of the user can be
+    fetched. The store keeps the result across restarts, so a user is resolved
+    once per ``max_age`` instead of once per process. Online IDs are matched
+    case-insensitively, as on PSN.
+    """
+
+    def __init__(
+        self, path: str = ACCOUNT_DB_PATH, max_age: float = ACCOUNT_ID_MAX_AGE
+    ):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_age = max_age
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS account_ids ("
+                "online_id TEXT PRIMARY KEY COLLATE NOCASE, "
+                "account_id TEXT NOT NULL, "
+                "resolved_at REAL NOT NULL)"
+            )
+
+    def get(self, online_id: str) -> Optional[str]:
+        """Get the account ID of an online ID, or None if unknown or too old"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT account_id, resolved_at FROM account_ids WHERE online_id = ?",
+                (online_id,),
+            ).fetchone()
+        if row is None or time.time() - row[1] >= self.max_age:
+            return None
+        return row[0]
+
+    def put(self, online_id: str, account_id: str) -> None:
+        """Remember the account ID an online ID was resolved to"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO account_ids VALUES (?, ?, ?)",
+                (online_id, account_id, time.time()),
+            )
+
+    def invalidate(self, online_id: str) -> None:
+        """Forget an online ID, so it is resolved again on next use"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM account_ids WHERE online_id = ?", (online_id,)
+            )
+
+
+_store: Optional[AccountIdStore] = None
+_store_lock = threading.Lock()
+
+
+def get_account_id_store() -> AccountIdStore:
+    """Get the process-wide account ID store, opening it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AccountIdStore()
+    return _store
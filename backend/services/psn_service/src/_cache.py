@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from ._scheduler import Priority, set_priority
+
+# Background refreshes of stale entries, shared by all caches. Nobody waits on
+# them, so their PSN calls run at background priority.
+refresh_executor = ThreadPoolExecutor(
+    max_workers=4,
+    thread_name_prefix="psn-refresh",
+    initializer=set_priority,
+    initargs=(Priority.BACKGROUND,),
+)
+
+
+class TTLCache:
+    """Thread-safe, size-bounded cache whose entries expire after a time to live.
+
+    An entry younger than ``ttl`` is served as is. For another ``stale_ttl`` seconds
+    after that it is still served, while a background refresh replaces it
+    (stale-while-revalidate). Older entries are loaded again before returning.
+
+    Concurrent loads of the same key share one call to the loader. Once ``maxsize``
+    entries are held, the least recently used entry is evicted.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 5000,
+        stale_ttl: Optional[float] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = ttl if stale_ttl is None else stale_ttl
+        self.maxsize = maxsize
+        self._executor = executor or refresh_executor
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Get the value of a key, calling ``loader`` if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                loaded_at, value = entry
+                age = time.monotonic() - loaded_at
+                if age < self.ttl + self.stale_ttl:
+                    if age >= self.ttl and key not in self._loading:
+                        future = self._loading[key] = Future()
+                        self._executor.submit(self._load, key, loader, future, True)
+                    return value
+
+            future = self._loading.get(key)
+            load = future is None
+            if load:
+                future = self._loading[key] = Future()
+
+        if load:
+            self._load(key, loader, future, False)
+        return future.result()
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Get the value of a key if it is cached and fresh, without loading it"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value loaded outside of ``get``, e.g. by a bulk request"""
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a key, so the next get loads it again"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def _load(
+        self, key: Hashable, loader: Callable[[], Any], future: Future, background: bool
+    ) -> None:
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(key, None)
+            if background:
+                # The stale value keeps being served until it ages out
+                print(f"Error refreshing cached {key}: {str(e)}")
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._store(key, value)
+            self._loading.pop(key, None)
+        future.set_result(value)
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
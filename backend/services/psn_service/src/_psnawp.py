@@ -1,9 +1,23 @@
 import os
-from typing import Dict, Any, List, Optional, ClassVar, Union, Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    ClassVar,
+    Union,
+    Generator,
+)
 from pydantic import BaseModel, Field
-from psnawp_api import PSNAWP
 from psnawp_api.models import User as PSNUser
-from functools import lru_cache
+
+from ._accounts import get_account_id_store
+from ._cache import TTLCache
+from ._session import get_psn_session
 
 try:
     # For region information
@@ -14,28 +28,65 @@ except ImportError:
     HAS_PYCOUNTRY = False
 
 
-class PSNClient:
-    """Singleton client for PSNAWP API"""
-
-    _instance: ClassVar[Optional["PSNClient"]] = None
-    _client: PSNAWP
-
-    def __new__(cls):
-        if cls._instance is None:
-            npsso = os.getenv("NPSSO")
-            if not npsso:
-                raise ValueError("NPSSO environment variable must be set")
-            cls._instance = super(PSNClient, cls).__new__(cls)
-            cls._instance._client = PSNAWP(npsso)
-        return cls._instance
-
-    @property
-    def client(self) -> PSNAWP:
-        return self._client
+# Data source (PSNUserProfile property) each profile field is read from. Fields
+# without a source only need the user lookup.
+FIELD_SOURCES = {
+    "online_id": None,
+    "account_id": None,
+    "about_me": "profile",
+    "avatars": "profile",
+    "languages": "profile",
+    "is_plus": "profile",
+    "is_officially_verified": "profile",
+    "online_status": "presence",
+    "platform": "presence",
+    "last_online": "presence",
+    "availability": "presence",
+    "friends_count": "friendship",
+    "mutual_friends_count": "friendship",
+    "friend_relation": "friendship",
+    "is_blocking": "blocked",
+    "trophy_level": "trophy_summary",
+    "trophy_progress": "trophy_summary",
+    "trophy_tier": "trophy_summary",
+    "earned_trophies": "trophy_summary",
+}
+
+# How long each data source is served from cache, in seconds. An expired entry is
+# still served for as long again while it is refreshed in the background.
+SOURCE_TTLS = {
+    "user": 24 * 60 * 60,
+    "profile": 24 * 60 * 60,
+    "presence": 60,
+    "friendship": 60 * 60,
+    "blocked": 60 * 60,
+    "trophy_summary": 60 * 60,
+}
+
+# Users held per data source before the least recently used is evicted
+CACHE_SIZE = int(os.getenv("PSN_CACHE_SIZE", 5000))
+
+# Cached data sources keyed by online ID, shared by all profiles
+source_caches = {
+    source: TTLCache(ttl, maxsize=CACHE_SIZE) for source, ttl in SOURCE_TTLS.items()
+}
+
+# Users whose presence is requested from PSN at a time by ``get_presences``
+PRESENCE_BATCH_SIZE = 50
+
+# Sources of one profile are fetched concurrently; shared by all profiles
+source_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PSN_SOURCE_CONCURRENCY", 16)),
+    thread_name_prefix="psn-source",
+)
 
 
 class PSNUserProfile(BaseModel):
-    """Pydantic model for a PlayStation Network user profile"""
+    """Pydantic model for a PlayStation Network user profile
+
+    Data sources are read through the shared per-source caches and then kept on the
+    instance, so one instance gives a consistent snapshot of the user.
+    """
 
     online_id: str
     _user: Optional[PSNUser] = None
@@ -43,6 +94,7 @@ class PSNUserProfile(BaseModel):
     _presence_data: Optional[Dict[str, Any]] = None
     _friendship_data: Optional[Dict[str, Any]] = None
     _trophy_summary_data: Optional[Any] = None
+    _blocked_data: Optional[bool] = None
     _account_id: Optional[str] = None
 
     class Config:
@@ -53,15 +105,28 @@ class PSNUserProfile(BaseModel):
         """Get or fetch the PSNUser object"""
         if self._user is None:
             try:
-                # Direct instance is more reliable than the singleton
-                psnawp_client = PSNAWP(os.getenv("NPSSO"))
-                self._user = psnawp_client.user(online_id=self.online_id)
+                self._user = source_caches["user"].get(
+                    self.online_id, self._resolve_user
+                )
                 self._account_id = self._user.account_id
             except Exception as e:
                 print(f"Error fetching user {self.online_id}: {str(e)}")
                 raise
         return self._user
 
+    def _resolve_user(self) -> PSNUser:
+        """Create the PSNUser object, looking up the account ID only if unknown"""
+        session = get_psn_session()
+        store = get_account_id_store()
+        account_id = store.get(self.online_id)
+        if account_id is not None:
+            # PSNAWP only needs the IDs to build its requests, so skip the lookup
+            return PSNUser(session.client.authenticator, self.online_id, account_id)
+
+        user = session.call(lambda: session.client.user(online_id=self.online_id))
+        store.put(self.online_id, user.account_id)
+        return user
+
     @property
     def account_id(self) -> str:
         """Get the user's account ID"""
@@ -73,46 +138,76 @@ class PSNUserProfile(BaseModel):
     def profile(self) -> Dict[str, Any]:
         """Get or fetch the user profile"""
         if self._profile_data is None:
-            try:
-                self._profile_data = self.user.profile()
-            except Exception as e:
-                print(f"Error fetching profile for {self.online_id}: {str(e)}")
-                self._profile_data = {}
+            self._profile_data = self._fetch_source(
+                "profile", lambda: self.user.profile(), {}
+            )
         return self._profile_data
 
     @property
     def presence(self) -> Dict[str, Any]:
         """Get or fetch the user presence data"""
         if self._presence_data is None:
-            try:
-                self._presence_data = self.user.get_presence()
-            except Exception as e:
-                print(f"Error fetching presence for {self.online_id}: {str(e)}")
-                self._presence_data = {}
+            # PSN returns the presence wrapped in a basicPresence object
+            self._presence_data = self._fetch_source(
+                "presence", lambda: self.user.get_presence()["basicPresence"], {}
+            )
         return self._presence_data
 
     @property
     def friendship(self) -> Dict[str, Any]:
         """Get or fetch the friendship data"""
         if self._friendship_data is None:
-            try:
-                self._friendship_data = self.user.friendship()
-            except Exception as e:
-                print(f"Error fetching friendship for {self.online_id}: {str(e)}")
-                self._friendship_data = {}
+            self._friendship_data = self._fetch_source(
+                "friendship", lambda: self.user.friendship(), {}
+            )
         return self._friendship_data
 
     @property
     def trophy_summary(self) -> Any:
         """Get the user's trophy summary using the direct method"""
         if self._trophy_summary_data is None:
-            try:
-                self._trophy_summary_data = self.user.trophy_summary()
-            except Exception as e:
-                print(f"Error fetching trophy summary for {self.online_id}: {str(e)}")
-                self._trophy_summary_data = {}
+            self._trophy_summary_data = self._fetch_source(
+                "trophy_summary", lambda: self.user.trophy_summary(), {}
+            )
         return self._trophy_summary_data
 
+    @property
+    def blocked(self) -> bool:
+        """Get or fetch whether you are blocking this user"""
+        if self._blocked_data is None:
+            self._blocked_data = self._fetch_source(
+                "blocked", lambda: self.user.is_blocked(), False
+            )
+        return self._blocked_data
+
+    def _fetch_source(
+        self, source: str, fetch: Callable[[], Any], default: Any
+    ) -> Any:
+        """Get a data source through its cache, or a default if it cannot be fetched"""
+        try:
+            return source_caches[source].get(
+                self.online_id, lambda: get_psn_session().call(fetch)
+            )
+        except Exception as e:
+            print(f"Error fetching {source} for {self.online_id}: {str(e)}")
+            return default
+
+    def fetch_sources(self, fields: Iterable[str]) -> None:
+        """Fetch the data sources the given fields are read from, concurrently"""
+        fields = set(fields)
+
+        # Every source needs the user lookup, so resolve it once up front. It also
+        # makes an unknown user fail even when only online_id is requested.
+        self.user
+        sources = {FIELD_SOURCES[f] for f in fields if FIELD_SOURCES.get(f)}
+        # Each fetch runs in a copy of the caller's context, keeping its PSN priority
+        fetches = [
+            source_executor.submit(copy_context().run, getattr, self, source)
+            for source in sources
+        ]
+        for fetch in fetches:
+            fetch.result()
+
     # Basic profile information
     def get_about_me(self) -> str:
         """Get the user's about me text"""
@@ -200,10 +295,7 @@ class PSNUserProfile(BaseModel):
     # Access methods to check blocking/following status
     def get_is_blocking(self) -> bool:
         """Check if you are blocking this user"""
-        try:
-            return self.user.is_blocked()
-        except Exception:
-            return False
+        return self.blocked
 
     def get_is_following(self) -> bool:
         """This info isn't directly available through PSNAWP API"""
@@ -249,10 +341,19 @@ class PSNUserProfile(BaseModel):
             return {"platinum": 0, "gold": 0, "silver": 0, "bronze": 0}
 
     # Pass-through methods for more advanced trophy functions
-    def get_trophy_titles(self, limit=None):
-        """Get user's trophy titles"""
+    def get_trophy_titles(self, limit=None, offset=0, page_size=50):
+        """Get user's trophy titles
+
+        Titles are fetched lazily from PSN, ``page_size`` per request, starting at
+        ``offset``.
+        """
         try:
-            return self.user.trophy_titles(limit=limit)
+            # PSNAWP's limit is counted from the first title, not from the offset
+            return self.user.trophy_titles(
+                limit=None if limit is None else offset + limit,
+                offset=offset,
+                page_size=page_size,
+            )
         except Exception as e:
             print(f"Error fetching trophy titles: {str(e)}")
             return []
@@ -277,52 +378,141 @@ class PSNUserProfile(BaseModel):
             print(f"Error fetching trophies: {str(e)}")
             return []
 
-    def get_title_stats(self, limit=None):
+    def get_title_stats(self, limit=None, offset=0, page_size=200):
         """Get detailed information about games the user has played
 
         Returns information about play time, play count, and other stats
-        for each game title the user has played.
+        for each game title the user has played. Titles are fetched lazily from
+        PSN, ``page_size`` per request, starting at ``offset``.
         """
         try:
-            return self.user.title_stats(limit=limit)
+            # PSNAWP's limit is counted from the first title, not from the offset
+            return self.user.title_stats(
+                limit=None if limit is None else offset + limit,
+                offset=offset,
+                page_size=page_size,
+            )
         except Exception as e:
             print(f"Error fetching title stats: {str(e)}")
             return []
 
     # Construct full profile object
-    def get_full_profile(self) -> Dict[str, Any]:
-        """Get a complete profile with all available information"""
-        profile = {
+    def get_full_profile(
+        self, fields: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """Get a complete profile with all available information
+
+        When ``fields`` is given, only those fields are included and only the data
+        sources they are read from are fetched from PSN.
+        """
+        getters = {
             # Basic info
-            "online_id": self.online_id,
-            "account_id": self.get_account_id(),
-            "about_me": self.get_about_me(),
-            "avatars": self.get_avatars(),
-            "languages": self.get_languages(),
-            "is_plus": self.get_is_plus(),
-            "is_officially_verified": self.get_is_officially_verified(),
+            "online_id": lambda: self.online_id,
+            "account_id": self.get_account_id,
+            "about_me": self.get_about_me,
+            "avatars": self.get_avatars,
+            "languages": self.get_languages,
+            "is_plus": self.get_is_plus,
+            "is_officially_verified": self.get_is_officially_verified,
             # Presence information
-            "online_status": self.get_online_status(),
-            "platform": self.get_platform(),
-            "last_online": self.get_last_online_date(),
-            "availability": self.get_availability(),
+            "online_status": self.get_online_status,
+            "platform": self.get_platform,
+            "last_online": self.get_last_online_date,
+            "availability": self.get_availability,
             # Friendship information
-            "friends_count": self.get_friends_count(),
-            "mutual_friends_count": self.get_mutual_friends_count(),
-            "friend_relation": self.get_friend_relation(),
-            "is_blocking": self.get_is_blocking(),
+            "friends_count": self.get_friends_count,
+            "mutual_friends_count": self.get_mutual_friends_count,
+            "friend_relation": self.get_friend_relation,
+            "is_blocking": self.get_is_blocking,
             # Trophy information
-            "trophy_level": self.get_trophy_level(),
-            "trophy_progress": self.get_trophy_progress(),
-            "trophy_tier": self.get_trophy_tier(),
-            "earned_trophies": self.get_earned_trophies(),
+            "trophy_level": self.get_trophy_level,
+            "trophy_progress": self.get_trophy_progress,
+            "trophy_tier": self.get_trophy_tier,
+            "earned_trophies": self.get_earned_trophies,
         }
+        if fields is None:
+            fields = list(getters)
+        else:
+            fields = [f for f in fields if f in getters]
+
+        self.fetch_sources(fields)
+        profile = {f: getters[f]() for f in fields}
 
         # Clean up the profile by removing empty/zero values
         return {k: v for k, v in profile.items() if v or v == 0 or v == False}
 
 
-@lru_cache(maxsize=100)
 def get_psn_user(online_id: str) -> PSNUserProfile:
-    """Get a PSN user profile (cached)"""
+    """Get a PSN user profile backed by the shared data source caches"""
     return PSNUserProfile(online_id=online_id)
+
+
+def invalidate_psn_user(
+    online_id: str, sources: Optional[Iterable[str]] = None
+) -> None:
+    """Drop a user's cached data sources (all of them by default)
+
+    Dropping the user source also forgets the stored account ID of the online ID.
+    """
+    sources = list(SOURCE_TTLS if sources is None else sources)
+    for source in sources:
+        source_caches[source].invalidate(online_id)
+    if "user" in sources:
+        get_account_id_store().invalidate(online_id)
+
+
+def get_presences(online_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Get the presence of many users with as few PSN requests as possible
+
+    Cached presences are served as is. The others are requested
+    ``PRESENCE_BATCH_SIZE`` users at a time by account ID, taken from the cached
+    user lookups; users PSN leaves out of a bulk response are fetched one by one.
+    A user whose presence cannot be fetched maps to None.
+    """
+    presence_cache = source_caches["presence"]
+    presences: Dict[str, Optional[Dict[str, Any]]] = {}
+    missing = []
+    for online_id in dict.fromkeys(online_ids):
+        presences[online_id] = presence_cache.peek(online_id)
+        if presences[online_id] is None:
+            missing.append(online_id)
+    if not missing:
+        return presences
+
+    # Resolve the account IDs concurrently, keeping the caller's PSN priority
+    users = [get_psn_user(online_id) for online_id in missing]
+    lookups = [
+        source_executor.submit(copy_context().run, getattr, user, "account_id")
+        for user in users
+    ]
+    by_account_id = {}
+    for user, lookup in zip(users, lookups):
+        try:
+            by_account_id[lookup.result()] = user
+        except Exception:
+            pass
+
+    session = get_psn_session()
+    account_ids = list(by_account_id)
+    for start in range(0, len(account_ids), PRESENCE_BATCH_SIZE):
+        batch = account_ids[start : start + PRESENCE_BATCH_SIZE]
+        try:
+            response = session.call(lambda: session.client.me().get_presences(batch))
+        except Exception as e:
+            print(f"Error fetching presences of {len(batch)} users: {str(e)}")
+            continue
+        for presence in response.get("basicPresences", []):
+            user = by_account_id.get(presence.get("accountId"))
+            if user is not None:
+                presence_cache.put(user.online_id, presence)
+                presences[user.online_id] = presence
+
+    # PSN may leave out users it only shows presence for one at a time
+    remaining = [u for u in by_account_id.values() if presences[u.online_id] is None]
+    fetches = [
+        source_executor.submit(copy_context().run, getattr, user, "presence")
+        for user in remaining
+    ]
+    for user, fetch in zip(remaining, fetches):
+        presences[user.online_id] = fetch.result() or None
+    return presences
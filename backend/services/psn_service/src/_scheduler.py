@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from psnawp_api.core.psnawp_exceptions import PSNAWPTooManyRequestsError
+
+# PSN allows about 300 requests per 15 minutes per account, the limit PSNAWP's own
+# limiter (one request every 3 seconds) is built around. The defaults keep a full
+# burst plus 15 minutes at the sustained rate within it: 10 + 15 * 19 = 295.
+#
+# The budget is per process. The API and the sync worker each get their own, so
+# when both run against one account, split the rate (and burst) between them.
+
+# Sustained requests per minute shared by every PSN call in the process
+PSN_REQUESTS_PER_MINUTE = int(os.getenv("PSN_REQUESTS_PER_MINUTE", 19))
+
+# Requests that may be sent back to back after an idle period
+PSN_BURST = int(os.getenv("PSN_BURST", 10))
+
+# Tokens background work leaves in the bucket, so an interactive request arriving
+# during a sync does not have to wait for the bucket to refill
+BACKGROUND_RESERVE = 2
+
+# Backoff after PSN answers 429, doubling on every further 429
+BACKOFF_INITIAL = 2.0
+BACKOFF_MAX = 120.0
+
+# Times a throttled request is retried before the 429 is raised
+MAX_RETRIES = 2
+
+
+class Priority(IntEnum):
+    """Priority of a PSN call; lower values are served first"""
+
+    INTERACTIVE = 0
+    BATCH = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "psn_priority", default=Priority.INTERACTIVE
+)
+
+
+def set_priority(priority: Priority) -> None:
+    """Set the priority of PSN calls made from the current thread or task
+
+    Meant for executor initializers, so every task of the executor runs at it.
+    """
+    _priority.set(priority)
+
+
+@contextmanager
+def psn_priority(priority: Priority) -> Iterator[None]:
+    """Run the PSN calls made inside the block at a priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class PSNScheduler:
+    """Token bucket shared by all PSN requests, served in priority order
+
+    A request takes a token before it is sent. Waiting requests are granted tokens
+    interactive first, then batch, then background (in arrival order within a
+    class), and background work never takes the last ``background_reserve``
+    tokens.
+
+    When PSN answers 429, sending pauses with exponential backoff and the refill
+    rate is halved; every successful request then restores a little of the
+    configured rate.
+
+    PSNAWP calls ``try_acquire`` before every request, so an instance can replace
+    the rate limiter of its request builder. The bucket only covers the process it
+    lives in; separate processes do not share a budget.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = PSN_REQUESTS_PER_MINUTE,
+        burst: int = PSN_BURST,
+        background_reserve: int = BACKGROUND_RESERVE,
+    ):
+        self.max_rate = requests_per_minute / 60
+        self.burst = burst
+        self.background_reserve = min(background_reserve, burst - 1)
+        self._rate = self.max_rate
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self._waiters: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, priority: Optional[Priority] = None) -> None:
+        """Block until a request of the given (or the current) priority may be sent"""
+        if priority is None:
+            priority = _priority.get()
+        waiter = (int(priority), next(self._sequence))
+        reserve = self.background_reserve if priority == Priority.BACKGROUND else 0
+
+        with self._condition:
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if (
+                        self._waiters[0] == waiter
+                        and now >= self._paused_until
+                        and self._tokens >= 1 + reserve
+                    ):
+                        self._tokens -= 1
+                        return
+                    self._condition.wait(self._time_to_token(now, reserve))
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def try_acquire(self, name: str, weight: int = 1) -> bool:
+        """Rate limiter interface used by PSNAWP's request builder"""
+        for _ in range(weight):
+            self.acquire()
+        return True
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """Pause sending and slow down after PSN answered 429"""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            self._backoff = min(BACKOFF_MAX, self._backoff * 2 or BACKOFF_INITIAL)
+            self._paused_until = max(
+                self._paused_until, now + max(self._backoff, retry_after or 0)
+            )
+            self._rate = max(self.max_rate / 16, self._rate / 2)
+            self._tokens = 0.0
+            print(
+                f"PSN rate limited, pausing {self._paused_until - now:.1f}s "
+                f"at {self._rate * 60:.1f} requests/min"
+            )
+
+    def succeeded(self) -> None:
+        """Recover the configured rate after a request went through"""
+        if self._rate >= self.max_rate and not self._backoff:
+            return
+        with self._condition:
+            self._refill(time.monotonic())
+            self._backoff = 0.0
+            self._rate = min(self.max_rate, self._rate + self.max_rate / 20)
+
+    def retrying(self, request: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a request function to back off and retry when PSN answers 429"""
+
+        def scheduled_request(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    response = request(*args, **kwargs)
+                except PSNAWPTooManyRequestsError:
+                    self.throttled()
+                    if attempt == MAX_RETRIES:
+                        raise
+                    continue
+                self.succeeded()
+                return response
+
+        return scheduled_request
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the current budget and queue of the scheduler"""
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            waiting = {p.name.lower(): 0 for p in Priority}
+            for priority, _ in self._waiters:
+                waiting[Priority(priority).name.lower()] += 1
+            return {
+                "requests_per_minute": round(self._rate * 60, 2),
+                "max_requests_per_minute": round(self.max_rate * 60, 2),
+                "tokens": round(self._tokens, 2),
+                "paused_for": round(max(0.0, self._paused_until - now), 1),
+                "waiting": waiting,
+            }
+
+    def _refill(self, now: float) -> None:
+        # Tokens do not accumulate during a pause
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self._rate)
+        self._updated = now
+
+    def _time_to_token(self, now: float, reserve: int) -> float:
+        missing = max(0.0, 1 + reserve - self._tokens)
+        return max(self._paused_until - now, 0.0) + missing / self._rate + 0.001
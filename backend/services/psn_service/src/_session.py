@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from typing import Any, Callable, ClassVar, Dict, Optional, TypeVar
+
+from psnawp_api import PSNAWP
+from psnawp_api.core.psnawp_exceptions import (
+    PSNAWPAuthenticationError,
+    PSNAWPInvalidTokenError,
+    PSNAWPUnauthorizedError,
+)
+from psnawp_api.utils.endpoints import API_PATH, BASE_PATH
+
+from ._scheduler import PSNScheduler
+
+T = TypeVar("T")
+
+# Refresh the access token this many seconds before it expires, so a lookup that
+# starts just before expiry never has its token run out halfway through
+TOKEN_REFRESH_MARGIN = 300
+
+# User agent PSNAWP sends with token requests
+TOKEN_USER_AGENT = "com.sony.snei.np.android.sso.share.oauth.versa.USER_AGENT"
+
+# Errors that mean the tokens are no longer accepted and a new sign-in is needed
+AUTH_ERRORS = (
+    PSNAWPAuthenticationError,
+    PSNAWPUnauthorizedError,
+    PSNAWPInvalidTokenError,
+)
+
+
+class PSNSession:
+    """Thread-safe owner of the one authenticated PSNAWP client.
+
+    The NPSSO -> access token exchange happens once per process instead of once per
+    looked up user. Tokens are refreshed before they expire, and a call rejected for
+    authentication signs in again from the NPSSO and is retried once.
+
+    The authenticator is refreshed in place, so ``User`` objects created from the
+    client keep working after a refresh or a new sign-in.
+
+    Every request the client sends, including token refreshes and the pages of
+    listings, waits for the session's scheduler and is retried with backoff when
+    PSN answers 429.
+    """
+
+    _instance: ClassVar[Optional["PSNSession"]] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        npsso: Optional[str] = None,
+        refresh_margin: float = TOKEN_REFRESH_MARGIN,
+        scheduler: Optional[PSNScheduler] = None,
+    ):
+        npsso = npsso or os.getenv("NPSSO")
+        if not npsso:
+            raise ValueError("NPSSO environment variable must be set")
+        self._client = PSNAWP(npsso)
+        self.scheduler = scheduler or PSNScheduler()
+
+        # The scheduler takes the place of PSNAWP's own rate limiter
+        request_builder = self._client.authenticator.request_builder
+        request_builder.limiter = self.scheduler
+        request_builder.request = self.scheduler.retrying(request_builder.request)
+
+        self._refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> "PSNSession":
+        """Get the process-wide session, creating it on first use"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def client(self) -> PSNAWP:
+        """Get the shared client, with a token valid for at least the refresh margin"""
+        self.ensure_token()
+        return self._client
+
+    def ensure_token(self) -> None:
+        """Sign in or refresh the access token if it is missing or about to expire"""
+        if not self._needs_refresh():
+            return
+        with self._lock:
+            # Another thread may have refreshed while this one waited for the lock
+            if self._needs_refresh():
+                self._refresh()
+
+    def reauthenticate(self, rejected: Optional[Dict[str, Any]] = None) -> None:
+        """Sign in again from the NPSSO, replacing the current tokens
+
+        When ``rejected`` is given, the sign-in is skipped if another thread has
+        already replaced those tokens.
+        """
+        with self._lock:
+            tokens = self._client.authenticator.token_response
+            if rejected is None or tokens is rejected:
+                self._sign_in()
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a PSN call with a fresh token, signing in again once if it is rejected"""
+        self.ensure_token()
+        tokens = self._client.authenticator.token_response
+        try:
+            return fn(*args, **kwargs)
+        except AUTH_ERRORS as e:
+            print(f"PSN authentication rejected ({str(e)}), signing in again")
+            self.reauthenticate(rejected=tokens)
+            return fn(*args, **kwargs)
+
+    def _needs_refresh(self) -> bool:
+        authenticator = self._client.authenticator
+        if authenticator.token_response is None:
+            return True
+        expires_at = authenticator.access_token_expiration_time
+        return expires_at - self._refresh_margin <= time.time()
+
+    def _refresh(self) -> None:
+        authenticator = self._client.authenticator
+        refresh_expires_at = authenticator.refresh_token_expiration_time
+        if (
+            authenticator.token_response is None
+            or refresh_expires_at - self._refresh_margin <= time.time()
+        ):
+            self._sign_in()
+            return
+
+        try:
+            self._request_tokens(
+                {
+                    "refresh_token": authenticator.token_response["refresh_token"],
+                    "grant_type": "refresh_token",
+                    "scope": authenticator.AUTH_METADATA["SCOPE"],
+                    "token_format": "jwt",
+                }
+            )
+        except AUTH_ERRORS:
+            self._sign_in()
+
+    def _sign_in(self) -> None:
+        authenticator = self._client.authenticator
+        authorization_code = authenticator.get_authorization_code()
+        self._request_tokens(
+            {
+                "cid": authenticator.cid,
+                "code": authorization_code,
+                "grant_type": "authorization_code",
+                "redirect_uri": authenticator.AUTH_METADATA["REDIRECT_URI"],
+                "scope": authenticator.AUTH_METADATA["SCOPE"],
+                "token_format": "jwt",
+            },
+            {"X-Psn-Correlation-Id": authenticator.cid},
+        )
+
+    def _request_tokens(
+        self, data: Dict[str, str], headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Request new tokens and swap them in as a whole
+
+        PSNAWP checks the token before every request without a lock, so the shared
+        token response is never marked expired or left without its expiry times,
+        which would make concurrent requests refresh the token as well.
+        """
+        authenticator = self._client.authenticator
+        response = authenticator.request_builder.post(
+            url=f"{BASE_PATH['base_uri']}{API_PATH['access_token']}",
+            headers={
+                **authenticator.AUTH_HEADER,
+                "Content-Type": "application/x-www-form-urlencoded",
+                "User-Agent": TOKEN_USER_AGENT,
+                **(headers or {}),
+            },
+            data=data,
+        )
+        tokens = response.json()
+        now = time.time()
+        tokens["access_token_expires_at"] = now + tokens["expires_in"]
+        tokens["refresh_token_expires_at"] = now + tokens["refresh_token_expires_in"]
+        authenticator.token_response = tokens
+
+
+def get_psn_session() -> PSNSession:
+    """Get the shared PSN session"""
+    return PSNSession.get()
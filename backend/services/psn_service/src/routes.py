@@ -1,6 +1,23 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from fastapi import APIRouter, HTTPException, Depends, Query, Path, Body
-from typing import List, Dict, Any, Optional, Set
-from src._psnawp import get_psn_user, PSNUserProfile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from psnawp_api.core.psnawp_exceptions import PSNAWPNotFoundError
+from src._scheduler import Priority, set_priority
+from src._session import get_psn_session
+from src._psnawp import (
+    SOURCE_TTLS,
+    get_presences,
+    get_psn_user,
+    invalidate_psn_user,
+    PSNUserProfile,
+)
 from pydantic import BaseModel, Field
 
 # Create router with API prefix and tags for better documentation
@@ -33,6 +50,27 @@ AVAILABLE_USER_FIELDS = {
     "earned_trophies",
 }
 
+# Titles requested from PSN at a time; a page is also what a stream waits for
+TROPHY_TITLES_PAGE_SIZE = 100
+GAMES_PAGE_SIZE = 200
+
+# Threads running the blocking PSNAWP calls of the single-user endpoints, so a
+# slow PSN response never holds up the event loop
+PSN_WORKERS = int(os.getenv("PSN_WORKERS", 16))
+psn_executor = ThreadPoolExecutor(max_workers=PSN_WORKERS, thread_name_prefix="psn")
+
+# Users of a batch request looked up at the same time
+BATCH_CONCURRENCY = int(os.getenv("PSN_BATCH_CONCURRENCY", 8))
+
+# Shared by all batch requests, so concurrent batches cannot multiply the load on
+# PSN. Their calls run at batch priority, behind single-user lookups.
+batch_executor = ThreadPoolExecutor(
+    max_workers=BATCH_CONCURRENCY,
+    thread_name_prefix="psn-batch",
+    initializer=set_priority,
+    initargs=(Priority.BATCH,),
+)
+
 
 class UserRequest(BaseModel):
     """Model for requesting user data with specific fields"""
@@ -50,6 +88,28 @@ class BatchUserRequest(BaseModel):
     users: List[UserRequest]
 
 
+class PresenceRequest(BaseModel):
+    """Model for requesting the presence of multiple users"""
+
+    online_ids: List[str]
+    online_only: bool = Field(
+        default=False, description="Only include users who are online"
+    )
+
+
+async def run_blocking(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking PSN call on the PSN executor and wait for it"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(psn_executor, partial(fn, *args, **kwargs))
+
+
+def _requested_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Get the valid requested fields, or None for all fields"""
+    if not fields:
+        return None
+    return [f for f in fields if f in AVAILABLE_USER_FIELDS]
+
+
 # Dependency to get a PSN user profile
 async def get_psn_profile(
     online_id: str = Path(..., description="PlayStation Network ID")
@@ -64,8 +124,12 @@ async def get_psn_profile(
 # Get API status
 @router.get("/status")
 async def api_status():
-    """Check API status"""
-    return {"status": "online", "version": "1.0"}
+    """Check API status and the PSN request budget"""
+    try:
+        scheduler = get_psn_session().scheduler.stats()
+    except ValueError:
+        scheduler = None
+    return {"status": "online", "version": "1.0", "psn_scheduler": scheduler}
 
 
 @router.get("/users/{online_id}")
@@ -91,15 +155,10 @@ async def get_user_profile(
     try:
         user = get_psn_user(online_id)
 
-        # Get all profile data
-        profile = user.get_full_profile()
-
-        # Filter fields if specified
-        if fields:
-            valid_fields = [f for f in fields if f in AVAILABLE_USER_FIELDS]
-            return {k: profile[k] for k in valid_fields if k in profile}
-
-        return profile
+        # Only the data sources of the requested fields are fetched
+        return await run_blocking(
+            user.get_full_profile, fields=_requested_fields(fields)
+        )
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
 
@@ -110,7 +169,10 @@ async def get_user_basic_info(online_id: str):
     """Get basic user information (online_id, about_me, avatars)"""
     try:
         user = get_psn_user(online_id)
-        profile = user.get_full_profile()
+        profile = await run_blocking(
+            user.get_full_profile,
+            fields=["online_id", "about_me", "avatars"]
+        )
         return {
             "online_id": profile["online_id"],
             "about_me": profile["about_me"],
@@ -125,7 +187,16 @@ async def get_user_presence(online_id: str):
     """Get user's online presence information"""
     try:
         user = get_psn_user(online_id)
-        profile = user.get_full_profile()
+        profile = await run_blocking(
+            user.get_full_profile,
+            fields=[
+                "online_id",
+                "online_status",
+                "platform",
+                "last_online",
+                "availability",
+            ]
+        )
         return {
             "online_id": profile["online_id"],
             "online_status": profile["online_status"],
@@ -142,7 +213,15 @@ async def get_user_friends_info(online_id: str):
     """Get information about a user's friends"""
     try:
         user = get_psn_user(online_id)
-        profile = user.get_full_profile()
+        profile = await run_blocking(
+            user.get_full_profile,
+            fields=[
+                "online_id",
+                "friends_count",
+                "mutual_friends_count",
+                "friend_relation",
+            ]
+        )
         return {
             "online_id": profile["online_id"],
             "friends_count": profile["friends_count"],
@@ -158,7 +237,16 @@ async def get_user_trophies(online_id: str):
     """Get user's trophy information"""
     try:
         user = get_psn_user(online_id)
-        profile = user.get_full_profile()
+        profile = await run_blocking(
+            user.get_full_profile,
+            fields=[
+                "online_id",
+                "trophy_level",
+                "trophy_progress",
+                "trophy_tier",
+                "earned_trophies",
+            ]
+        )
         return {
             "online_id": profile["online_id"],
             "trophy_level": profile["trophy_level"],
@@ -170,6 +258,25 @@ async def get_user_trophies(online_id: str):
         raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
 
 
+@router.delete("/users/{online_id}/cache")
+async def invalidate_user_cache(
+    online_id: str,
+    sources: Optional[List[str]] = Query(
+        None,
+        description="Data sources to drop (user, profile, presence, friendship, blocked, trophy_summary). Omit for all.",
+    ),
+):
+    """Drop a user's cached PSN data so the next request fetches it again"""
+    if sources:
+        unknown = [s for s in sources if s not in SOURCE_TTLS]
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown data sources: {unknown}"
+            )
+    invalidate_psn_user(online_id, sources)
+    return {"online_id": online_id, "invalidated": sources or list(SOURCE_TTLS)}
+
+
 @router.post("/users/batch")
 async def batch_get_users(
     request: BatchUserRequest = Body(
@@ -187,27 +294,72 @@ async def batch_get_users(
     - Friendship: friends_count, mutual_friends_count, friend_relation, is_blocking
     - Trophies: trophy_level, trophy_progress, trophy_tier, earned_trophies
     """
-    results = []
+    loop = asyncio.get_running_loop()
+    lookups = [
+        loop.run_in_executor(batch_executor, _get_batch_user, user_req)
+        for user_req in request.users
+    ]
+    return await asyncio.gather(*lookups)
 
-    for user_req in request.users:
-        try:
-            user = get_psn_user(user_req.online_id)
-            profile = user.get_full_profile()
 
-            # Filter fields if specified
-            if user_req.fields:
-                valid_fields = [
-                    f for f in user_req.fields if f in AVAILABLE_USER_FIELDS
-                ]
-                results.append({k: profile[k] for k in valid_fields if k in profile})
-            else:
-                results.append(profile)
+def _get_batch_user(user_req: UserRequest) -> Dict[str, Any]:
+    """Look up one user of a batch request, reporting a failure in place of the user"""
+    try:
+        user = get_psn_user(user_req.online_id)
+        return user.get_full_profile(fields=_requested_fields(user_req.fields))
 
-        except Exception:
-            # Add a placeholder for users that couldn't be found
-            results.append({"online_id": user_req.online_id, "error": "User not found"})
+    except PSNAWPNotFoundError:
+        return {"online_id": user_req.online_id, "error": "User not found"}
+    except Exception as e:
+        return {
+            "online_id": user_req.online_id,
+            "error": f"Could not retrieve user: {str(e)}",
+        }
 
-    return results
+
+@router.post("/users/presence")
+async def batch_get_presence(
+    request: PresenceRequest = Body(
+        ..., description="Online IDs to get the presence of, e.g. a league roster"
+    )
+):
+    """
+    Get the presence of multiple users in a single request.
+
+    Presences are requested from PSN in bulk and cached for a minute, so polling a
+    roster for who is online stays cheap. A user whose presence could not be
+    retrieved is returned as {"online_id": ..., "error": ...}; with online_only
+    only users who are online are returned.
+    """
+    presences = await run_blocking(get_presences, request.online_ids)
+
+    players = []
+    for online_id, presence in presences.items():
+        if presence is None:
+            if not request.online_only:
+                players.append(
+                    {"online_id": online_id, "error": "Presence not available"}
+                )
+            continue
+        player = _presence_item(online_id, presence)
+        if not request.online_only or player["online_status"] == "online":
+            players.append(player)
+    return {
+        "online_count": sum(p.get("online_status") == "online" for p in players),
+        "players": players,
+    }
+
+
+def _presence_item(online_id: str, presence: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a PSN presence to its response item"""
+    platform_info = presence.get("primaryPlatformInfo", {})
+    return {
+        "online_id": online_id,
+        "online_status": platform_info.get("onlineStatus", ""),
+        "platform": platform_info.get("platform", ""),
+        "last_online": platform_info.get("lastOnlineDate", ""),
+        "availability": presence.get("availability", ""),
+    }
 
 
 # Search endpoint
@@ -230,14 +382,9 @@ async def search_users(
     """
     try:
         user = get_psn_user(query)
-        profile = user.get_full_profile()
-
-        # Filter fields if specified
-        if fields:
-            valid_fields = [f for f in fields if f in AVAILABLE_USER_FIELDS]
-            return [{k: profile[k] for k in valid_fields if k in profile}]
-
-        return [profile]
+        return [
+            await run_blocking(user.get_full_profile, fields=_requested_fields(fields))
+        ]
     except Exception:
         return []
 
@@ -251,7 +398,7 @@ async def get_user_raw_profile(online_id: str):
     """
     try:
         user = get_psn_user(online_id)
-        return user.profile
+        return await run_blocking(lambda: user.profile)
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
 
@@ -259,38 +406,46 @@ async def get_user_raw_profile(online_id: str):
 @router.get("/users/{online_id}/trophy-titles")
 async def get_trophy_titles(
     online_id: str,
-    limit: Optional[int] = Query(None, description="Max number of titles to retrieve"),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Max number of titles to retrieve"
+    ),
+    offset: int = Query(
+        0, ge=0, description="Number of titles to skip (next_offset of the last page)"
+    ),
+    stream: bool = Query(
+        False, description="Stream titles as NDJSON while PSN pages arrive"
+    ),
 ):
     """
     Get the user's trophy titles (games they have trophies for)
 
     This endpoint returns the list of games for which the user has earned trophies.
-    It supports limiting the number of titles returned.
+    Page through the titles with offset and limit; next_offset is null on the last
+    page. With stream=true the titles are sent as newline-delimited JSON, one title
+    per line, as each page arrives from PSN.
     """
     try:
         user = get_psn_user(online_id)
-        trophy_titles = user.get_trophy_titles(limit=limit)
-
-        # Return titles in a list format
-        title_list = []
-        for title in trophy_titles:
-            try:
-                title_list.append(
-                    {
-                        "title_id": title.title_id,
-                        "title_name": title.title_name,
-                        "platform": str(title.platform),
-                        "trophies_earned": title.earned_trophies.total,
-                        "trophies_total": title.defined_trophies.total,
-                        "progress": title.progress,
-                    }
-                )
-            except Exception as e:
-                print(f"Error processing title: {e}")
+        trophy_titles = await run_blocking(
+            user.get_trophy_titles,
+            limit=limit,
+            offset=offset,
+            page_size=TROPHY_TITLES_PAGE_SIZE,
+        )
+
+        if stream:
+            return _ndjson_response(
+                trophy_titles, _trophy_title_item, TROPHY_TITLES_PAGE_SIZE
+            )
 
+        title_list, next_offset = await run_blocking(
+            _read_page, trophy_titles, offset, _trophy_title_item
+        )
         return {
             "online_id": online_id,
             "total_titles": len(title_list),
+            "offset": offset,
+            "next_offset": next_offset,
             "titles": title_list,
         }
     except Exception as e:
@@ -302,7 +457,15 @@ async def get_trophy_titles(
 @router.get("/users/{online_id}/games")
 async def get_played_games(
     online_id: str,
-    limit: Optional[int] = Query(None, description="Max number of games to retrieve"),
+    limit: Optional[int] = Query(
+        None, ge=1, description="Max number of games to retrieve"
+    ),
+    offset: int = Query(
+        0, ge=0, description="Number of games to skip (next_offset of the last page)"
+    ),
+    stream: bool = Query(
+        False, description="Stream games as NDJSON while PSN pages arrive"
+    ),
 ):
     """
     Get a list of games the user has played with detailed statistics
@@ -315,36 +478,105 @@ async def get_played_games(
     - First played date
     - Last played date
     - Play duration
+
+    Paging and streaming work as for trophy titles.
     """
     try:
         user = get_psn_user(online_id)
-        title_iterator = user.get_title_stats(limit=limit)
-
-        # Return game data in a list format
-        game_list = []
-        for title in title_iterator:
-            try:
-                game_list.append(
-                    {
-                        "name": title.name,
-                        "title_id": title.title_id,
-                        "platform": title.category,
-                        "image_url": title.image_url,
-                        "play_count": title.play_count,
-                        "first_played": title.first_played_date_time,
-                        "last_played": title.last_played_date_time,
-                        "play_duration": str(title.play_duration),
-                    }
-                )
-            except Exception as e:
-                print(f"Error processing game: {e}")
+        title_iterator = await run_blocking(
+            user.get_title_stats,
+            limit=limit,
+            offset=offset,
+            page_size=GAMES_PAGE_SIZE,
+        )
+
+        if stream:
+            return _ndjson_response(title_iterator, _game_item, GAMES_PAGE_SIZE)
 
+        game_list, next_offset = await run_blocking(
+            _read_page, title_iterator, offset, _game_item
+        )
         return {
             "online_id": online_id,
             "total_games": len(game_list),
+            "offset": offset,
+            "next_offset": next_offset,
             "games": game_list,
         }
     except Exception as e:
         raise HTTPException(
             status_code=404, detail=f"Could not retrieve game stats: {str(e)}"
         )
+
+
+def _trophy_title_item(title) -> Dict[str, Any]:
+    """Convert a PSNAWP trophy title to its response item"""
+    return {
+        "title_id": title.np_communication_id,
+        "title_name": title.title_name,
+        "platform": ",".join(sorted(p.value for p in title.title_platform)),
+        "trophies_earned": _trophy_total(title.earned_trophies),
+        "trophies_total": _trophy_total(title.defined_trophies),
+        "progress": title.progress,
+    }
+
+
+def _trophy_total(trophies) -> int:
+    return trophies.bronze + trophies.silver + trophies.gold + trophies.platinum
+
+
+def _game_item(title) -> Dict[str, Any]:
+    """Convert a PSNAWP title stats entry to its response item"""
+    return {
+        "name": title.name,
+        "title_id": title.title_id,
+        "platform": title.category,
+        "image_url": title.image_url,
+        "play_count": title.play_count,
+        "first_played": title.first_played_date_time,
+        "last_played": title.last_played_date_time,
+        "play_duration": str(title.play_duration),
+    }
+
+
+def _read_page(
+    iterator, offset: int, to_item: Callable[[Any], Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Read a page of titles, returning them with the offset of the next page"""
+    items = []
+    read = 0
+    for title in iterator:
+        read += 1
+        try:
+            items.append(to_item(title))
+        except Exception as e:
+            print(f"Error processing title: {e}")
+
+    # PSN reports the total count with each page it returns
+    end = offset + read
+    next_offset = end if read and end < len(iterator) else None
+    return items, next_offset
+
+
+def _ndjson_response(
+    iterator, to_item: Callable[[Any], Dict[str, Any]], page_size: int
+) -> StreamingResponse:
+    """Stream titles as newline-delimited JSON while their pages arrive from PSN"""
+
+    async def lines() -> AsyncIterator[str]:
+        titles = iter(iterator)
+        try:
+            # Reading a page may wait for PSN, so it runs on the executor
+            while page := await run_blocking(lambda: list(islice(titles, page_size))):
+                for title in page:
+                    try:
+                        item = to_item(title)
+                    except Exception as e:
+                        print(f"Error processing title: {e}")
+                        continue
+                    yield json.dumps(jsonable_encoder(item)) + "\n"
+        except Exception as e:
+            # The status line has been sent, so report the failure in the stream
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,377 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+# The client generated into backend/services/database_service, which must be on the
+# path ahead of the prisma runtime package (see the README)
+from prisma import Prisma
+from prisma.enums import PSNSyncStatus, PSNSyncType
+from prisma.models import PSNProfile
+from psnawp_api.models import User as PSNUser
+from psnawp_api.utils import iso_format_to_datetime
+
+from ._psnawp import get_psn_user
+from ._scheduler import Priority, psn_priority
+from ._session import get_psn_session
+
+T = TypeVar("T")
+
+# How stale each kind of data may get before a profile is synced again
+SYNC_INTERVALS = {
+    PSNSyncType.PROFILE: timedelta(hours=6),
+    PSNSyncType.GAMES: timedelta(hours=1),
+    PSNSyncType.TROPHIES: timedelta(hours=1),
+}
+
+# PSNProfile column holding the last successful sync of each kind
+SYNC_COLUMNS = {
+    PSNSyncType.PROFILE: "lastProfileSync",
+    PSNSyncType.GAMES: "lastGameSync",
+    PSNSyncType.TROPHIES: "lastTrophySync",
+}
+
+# Profiles synced per round, stalest first
+SYNC_BATCH_SIZE = int(os.getenv("PSN_SYNC_BATCH_SIZE", 10))
+
+# Seconds to wait before looking again when no profile is due
+SYNC_IDLE_SECONDS = int(os.getenv("PSN_SYNC_IDLE_SECONDS", 60))
+
+# Games per request when looking up trophy titles by title ID (PSN accepts 5)
+TITLE_IDS_PER_REQUEST = 5
+
+# Games requested from PSN at a time
+GAMES_PAGE_SIZE = 200
+
+TROPHY_GRADES = ("platinum", "gold", "silver", "bronze")
+
+
+class PSNSyncWorker:
+    """Background worker that keeps the PSN tables up to date
+
+    Each round picks the stalest sync-enabled profiles and, for every kind of data
+    that is due, fetches only what changed since its last sync:
+
+    - PROFILE: profile, presence and friendship fields, and the avatars
+    - GAMES: title stats newer than lastGameSync (PSN lists the most recently
+      played first, so reading stops at the first unchanged game)
+    - TROPHIES: the trophy summary, and per-game trophy counts only for games
+      played since lastTrophySync, and only if the summary changed
+
+    Writes are grouped into batches, and every sync is logged to PSNSyncLog. The
+    website reads the tables and never waits on PSN. PSN calls are made at
+    background priority.
+    """
+
+    def __init__(self, db: Prisma, batch_size: int = SYNC_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    async def run_forever(self) -> None:
+        """Sync due profiles until cancelled"""
+        while True:
+            if not await self.run_once():
+                await asyncio.sleep(SYNC_IDLE_SECONDS)
+
+    async def run_once(self) -> int:
+        """Sync one round of due profiles, returning how many were synced"""
+        profiles = await self.due_profiles()
+        # Sync requests yield to interactive and batch lookups
+        with psn_priority(Priority.BACKGROUND):
+            for profile in profiles:
+                await self.sync_profile(profile)
+        return len(profiles)
+
+    async def due_profiles(self) -> List[PSNProfile]:
+        """Get the stalest sync-enabled profiles with at least one kind of data due"""
+        now = datetime.now(timezone.utc)
+        due = []
+        for sync_type, interval in SYNC_INTERVALS.items():
+            column = SYNC_COLUMNS[sync_type]
+            due.append({column: None})
+            due.append({column: {"lt": now - interval}})
+
+        return await self.db.psnprofile.find_many(
+            where={"syncEnabled": True, "OR": due},
+            order={"lastUpdated": "asc"},
+            take=self.batch_size,
+        )
+
+    async def sync_profile(self, profile: PSNProfile) -> None:
+        """Sync every kind of data that is due for one profile"""
+        try:
+            user = await self._psn(lambda: get_psn_user(profile.onlineId).user)
+        except Exception as e:
+            await self._log_failure(profile, PSNSyncType.ALL, e)
+            await self._touch(profile, {})
+            return
+
+        # Games before trophies, which look at the games played since the last sync
+        steps = [
+            (PSNSyncType.PROFILE, self._sync_profile_data),
+            (PSNSyncType.GAMES, self._sync_games),
+            (PSNSyncType.TROPHIES, self._sync_trophies),
+        ]
+        now = datetime.now(timezone.utc)
+        synced = {}
+        if profile.accountId != user.account_id:
+            synced["accountId"] = user.account_id
+
+        for sync_type, sync in steps:
+            last_sync = getattr(profile, SYNC_COLUMNS[sync_type])
+            if last_sync is not None and last_sync > now - SYNC_INTERVALS[sync_type]:
+                continue
+            if await self._logged(profile, sync_type, lambda: sync(profile, user)):
+                synced[SYNC_COLUMNS[sync_type]] = now
+
+        await self._touch(profile, synced)
+
+    async def _sync_profile_data(self, profile: PSNProfile, user: PSNUser) -> int:
+        data = await self._psn(user.profile)
+        presence = (await self._psn(user.get_presence))["basicPresence"]
+        friendship = await self._psn(user.friendship)
+        is_blocking = await self._psn(user.is_blocked)
+
+        platform_info = presence.get("primaryPlatformInfo", {})
+        await self.db.psnprofile.update(
+            where={"id": profile.id},
+            data={
+                "aboutMe": data.get("aboutMe"),
+                "languages": data.get("languages", []),
+                "isPlus": data.get("isPlus", False),
+                "isOfficiallyVerified": data.get("isOfficiallyVerified", False),
+                "friendsCount": friendship.get("friendsCount"),
+                "mutualFriendsCount": friendship.get("mutualFriendsCount"),
+                "friendRelation": friendship.get("friendRelation"),
+                "isBlocking": is_blocking,
+                "onlineStatus": platform_info.get("onlineStatus"),
+                "platform": platform_info.get("platform"),
+                "lastOnline": iso_format_to_datetime(
+                    platform_info.get("lastOnlineDate")
+                ),
+                "availability": presence.get("availability"),
+            },
+        )
+
+        avatars = data.get("avatars", [])
+        async with self.db.batch_() as batch:
+            for avatar in avatars:
+                key = {"profileId": profile.id, "size": avatar["size"]}
+                batch.psnavatar.upsert(
+                    where={"profileId_size": key},
+                    data={
+                        "create": {**key, "url": avatar["url"]},
+                        "update": {"url": avatar["url"]},
+                    },
+                )
+        return 1 + len(avatars)
+
+    async def _sync_games(self, profile: PSNProfile, user: PSNUser) -> int:
+        since = profile.lastGameSync
+
+        def changed_titles() -> List[Any]:
+            titles = []
+            for title in user.title_stats(page_size=GAMES_PAGE_SIZE):
+                last_played = title.last_played_date_time
+                if since and last_played and last_played <= since:
+                    break
+                titles.append(title)
+            return titles
+
+        titles = await self._psn(changed_titles)
+        async with self.db.batch_() as batch:
+            for title in titles:
+                key = {
+                    "profileId": profile.id,
+                    "titleId": title.title_id,
+                    "platform": title.category.value if title.category else "unknown",
+                }
+                fields = {
+                    "name": title.name or title.title_id,
+                    "imageUrl": title.image_url,
+                    "playCount": title.play_count,
+                    "firstPlayed": title.first_played_date_time,
+                    "lastPlayed": title.last_played_date_time,
+                    "playDuration": (
+                        str(title.play_duration) if title.play_duration else None
+                    ),
+                    "playTimeMinutes": (
+                        int(title.play_duration.total_seconds() // 60)
+                        if title.play_duration
+                        else None
+                    ),
+                }
+                batch.psngame.upsert(
+                    where={"profileId_titleId_platform": key},
+                    data={"create": {**key, **fields}, "update": fields},
+                )
+        return len(titles)
+
+    async def _sync_trophies(self, profile: PSNProfile, user: PSNUser) -> int:
+        summary = await self._psn(user.trophy_summary)
+        earned = _trophy_counts(summary.earned_trophies)
+        fields = {
+            "trophyLevel": summary.trophy_level,
+            "progress": summary.progress,
+            "tier": summary.tier,
+            **{f"{grade}Count": count for grade, count in earned.items()},
+            "totalTrophies": sum(earned.values()),
+        }
+
+        stored = await self.db.psntrophy.find_unique(
+            where={"profileId": profile.id}
+        )
+        if stored is not None and profile.lastTrophySync is not None and all(
+            getattr(stored, column) == value for column, value in fields.items()
+        ):
+            # No trophy was earned anywhere, so no game's counts can have changed
+            return 0
+
+        await self.db.psntrophy.upsert(
+            where={"profileId": profile.id},
+            data={"create": {"profileId": profile.id, **fields}, "update": fields},
+        )
+
+        where: Dict[str, Any] = {"profileId": profile.id}
+        if profile.lastTrophySync is not None:
+            where["lastPlayed"] = {"gt": profile.lastTrophySync}
+        games = await self.db.psngame.find_many(
+            where=where, include={"trophyInfo": True}
+        )
+        return 1 + await self._sync_game_trophies(profile, user, games)
+
+    async def _sync_game_trophies(
+        self, profile: PSNProfile, user: PSNUser, games: List[Any]
+    ) -> int:
+        """Update the trophy counts of the given games where they changed"""
+        by_title_id = {game.titleId: game for game in games}
+        title_ids = list(by_title_id)
+        updates = []
+        for start in range(0, len(title_ids), TITLE_IDS_PER_REQUEST):
+            chunk = title_ids[start : start + TITLE_IDS_PER_REQUEST]
+            trophy_titles = await self._psn(
+                lambda: list(user.trophy_titles_for_title(title_ids=chunk))
+            )
+            for trophy_title in trophy_titles:
+                game = by_title_id.get(trophy_title.np_title_id)
+                if game is None:
+                    continue
+                earned = _trophy_counts(trophy_title.earned_trophies)
+                fields = {
+                    "trophiesEarned": sum(earned.values()),
+                    "trophiesTotal": sum(
+                        _trophy_counts(trophy_title.defined_trophies).values()
+                    ),
+                    "progress": trophy_title.progress,
+                    **{f"{grade}Earned": count for grade, count in earned.items()},
+                }
+                stored = game.trophyInfo
+                if stored is not None and all(
+                    getattr(stored, column) == value
+                    for column, value in fields.items()
+                ):
+                    continue
+                updates.append((game, fields))
+
+        now = datetime.now(timezone.utc)
+        async with self.db.batch_() as batch:
+            for game, fields in updates:
+                fields = {**fields, "lastUpdated": now}
+                batch.psngametrophies.upsert(
+                    where={"gameId": game.id},
+                    data={
+                        "create": {
+                            "profileId": profile.id,
+                            "gameId": game.id,
+                            **fields,
+                        },
+                        "update": fields,
+                    },
+                )
+        return len(updates)
+
+    async def _logged(
+        self, profile: PSNProfile, sync_type: PSNSyncType, sync: Callable[[], Any]
+    ) -> bool:
+        """Run one sync step with a PSNSyncLog entry, returning whether it succeeded"""
+        log = await self.db.psnsynclog.create(
+            data={
+                "profileId": profile.id,
+                "syncType": sync_type,
+                "status": PSNSyncStatus.IN_PROGRESS,
+            }
+        )
+        try:
+            records = await sync()
+        except Exception as e:
+            print(f"PSN {sync_type} sync failed for {profile.onlineId}: {str(e)}")
+            await self.db.psnsynclog.update(
+                where={"id": log.id},
+                data={
+                    "status": PSNSyncStatus.FAILED,
+                    "completedAt": datetime.now(timezone.utc),
+                    "errorMessage": str(e),
+                },
+            )
+            return False
+
+        await self.db.psnsynclog.update(
+            where={"id": log.id},
+            data={
+                "status": PSNSyncStatus.SUCCESS,
+                "completedAt": datetime.now(timezone.utc),
+                "recordsUpdated": records,
+            },
+        )
+        return True
+
+    async def _log_failure(
+        self, profile: PSNProfile, sync_type: PSNSyncType, error: Exception
+    ) -> None:
+        print(f"PSN {sync_type} sync failed for {profile.onlineId}: {str(error)}")
+        await self.db.psnsynclog.create(
+            data={
+                "profileId": profile.id,
+                "syncType": sync_type,
+                "status": PSNSyncStatus.FAILED,
+                "completedAt": datetime.now(timezone.utc),
+                "errorMessage": str(error),
+            }
+        )
+
+    async def _touch(self, profile: PSNProfile, data: Dict[str, Any]) -> None:
+        """Save the sync results and move the profile to the back of the queue"""
+        await self.db.psnprofile.update(
+            where={"id": profile.id},
+            data={**data, "lastUpdated": datetime.now(timezone.utc)},
+        )
+
+    @staticmethod
+    async def _psn(fn: Callable[[], T]) -> T:
+        """Run a blocking PSN call through the shared session off the event loop"""
+        return await asyncio.to_thread(get_psn_session().call, fn)
+
+
+def _trophy_counts(trophies: Any) -> Dict[str, int]:
+    """Get per-grade trophy counts from a TrophySet or a raw PSN dict"""
+    if isinstance(trophies, dict):
+        return {grade: trophies.get(grade, 0) for grade in TROPHY_GRADES}
+    return {grade: getattr(trophies, grade) for grade in TROPHY_GRADES}
+
+
+async def main() -> None:
+    db = Prisma()
+    await db.connect()
+    try:
+        await PSNSyncWorker(db).run_forever()
+    finally:
+        await db.disconnect()
+
+
+# Run with `PYTHONPATH=../database_service python -m src.sync` from the service
+# directory
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
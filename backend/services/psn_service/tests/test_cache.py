@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src._cache import TTLCache
+
+
+def test_concurrent_gets_share_one_load():
+    cache = TTLCache(ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = [pool.submit(cache.get, "user", loader) for _ in range(8)]
+        time.sleep(0.1)
+        release.set()
+        values = [result.result(timeout=5) for result in results]
+
+    assert values == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_it_refreshes():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        cache = TTLCache(ttl=0.05, stale_ttl=60, executor=executor)
+        cache.get("user", lambda: "old")
+        time.sleep(0.1)
+
+        refreshing = threading.Event()
+        release = threading.Event()
+
+        def refresh():
+            refreshing.set()
+            release.wait(5)
+            return "new"
+
+        # The stale value comes back at once while the refresh runs in the background
+        assert cache.get("user", refresh) == "old"
+        assert refreshing.wait(5)
+        assert cache.get("user", refresh) == "old"
+
+        release.set()
+        executor.shutdown(wait=True)
+
+    assert cache.get("user", lambda: "unused") == "new"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.get("a", lambda: 1)
+    cache.get("b", lambda: 2)
+    cache.get("a", lambda: 1)
+    cache.get("c", lambda: 3)
+
+    assert len(cache) == 2
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert cache.peek("c") == 3
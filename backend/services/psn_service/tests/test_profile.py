@@ -0,0 +1,48 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from psnawp_api.core.psnawp_exceptions import PSNAWPNotFoundError
+
+from src import _psnawp
+from src._accounts import AccountIdStore
+from src.routes import router
+
+
+class NoUserSession:
+    """PSN session where no online ID exists"""
+
+    class client:
+        @staticmethod
+        def user(online_id):
+            raise PSNAWPNotFoundError(f"User {online_id} not found")
+
+    def call(self, fn):
+        return fn()
+
+
+def make_client(monkeypatch):
+    monkeypatch.setattr(_psnawp, "get_psn_session", NoUserSession)
+    store = AccountIdStore(":memory:")
+    monkeypatch.setattr(_psnawp, "get_account_id_store", lambda: store)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_unknown_user_is_not_found_when_only_online_id_is_requested(monkeypatch):
+    client = make_client(monkeypatch)
+
+    response = client.get("/api/users/nobody-single", params={"fields": "online_id"})
+
+    assert response.status_code == 404
+
+
+def test_batch_reports_unknown_user_when_only_online_id_is_requested(monkeypatch):
+    client = make_client(monkeypatch)
+
+    response = client.post(
+        "/api/users/batch",
+        json={"users": [{"online_id": "nobody-batch", "fields": ["online_id"]}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"online_id": "nobody-batch", "error": "User not found"}]
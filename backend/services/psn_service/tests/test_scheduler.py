@@ -0,0 +1,45 @@
+import threading
+import time
+
+from src._scheduler import PSNScheduler, Priority
+
+
+def test_background_yields_to_interactive_under_contention():
+    # One token every 0.1s, and none left
+    scheduler = PSNScheduler(requests_per_minute=600, burst=1, background_reserve=0)
+    scheduler.acquire(Priority.INTERACTIVE)
+
+    order = []
+
+    def acquire(priority):
+        scheduler.acquire(priority)
+        order.append(priority)
+
+    background = threading.Thread(target=acquire, args=(Priority.BACKGROUND,))
+    background.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=acquire, args=(Priority.INTERACTIVE,))
+    interactive.start()
+    background.join(5)
+    interactive.join(5)
+
+    # The background request was queued first but is served last
+    assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
+
+
+def test_background_leaves_the_reserve_to_interactive():
+    # Practically no refill during the test
+    scheduler = PSNScheduler(requests_per_minute=1, burst=5, background_reserve=2)
+    for _ in range(3):
+        scheduler.acquire(Priority.BACKGROUND)
+
+    blocked = threading.Thread(
+        target=scheduler.acquire, args=(Priority.BACKGROUND,), daemon=True
+    )
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    started = time.monotonic()
+    scheduler.acquire(Priority.INTERACTIVE)
+    assert time.monotonic() - started < 0.05
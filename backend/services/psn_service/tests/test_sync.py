@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from src import sync
+from src.sync import PSNSyncWorker
+
+NOW = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+class DirectSession:
+    """PSN session that runs every call at once"""
+
+    def call(self, fn):
+        return fn()
+
+
+def make_worker(monkeypatch):
+    monkeypatch.setattr(sync, "get_psn_session", DirectSession)
+    db = MagicMock()
+    batch = MagicMock()
+    db.batch_.return_value.__aenter__ = AsyncMock(return_value=batch)
+    db.batch_.return_value.__aexit__ = AsyncMock(return_value=False)
+    db.psntrophy.find_unique = AsyncMock()
+    db.psntrophy.upsert = AsyncMock()
+    db.psngame.find_many = AsyncMock(return_value=[])
+    return PSNSyncWorker(db), db, batch
+
+
+def make_title(title_id, last_played):
+    return SimpleNamespace(
+        title_id=title_id,
+        name=title_id,
+        category=None,
+        image_url=None,
+        play_count=1,
+        first_played_date_time=last_played,
+        last_played_date_time=last_played,
+        play_duration=None,
+    )
+
+
+def test_games_sync_stops_at_the_first_unchanged_game(monkeypatch):
+    worker, _, batch = make_worker(monkeypatch)
+    since = NOW - timedelta(days=1)
+    titles = [
+        make_title("NEW2", NOW),
+        make_title("NEW1", NOW - timedelta(hours=1)),
+        make_title("OLD1", since),
+        make_title("OLD2", since - timedelta(days=1)),
+    ]
+    read = []
+
+    def title_stats(page_size):
+        for title in titles:
+            read.append(title.title_id)
+            yield title
+
+    user = SimpleNamespace(title_stats=title_stats)
+    profile = SimpleNamespace(id=1, lastGameSync=since)
+
+    assert asyncio.run(worker._sync_games(profile, user)) == 2
+    # PSN lists the most recently played first, so nothing past OLD1 is read
+    assert read == ["NEW2", "NEW1", "OLD1"]
+    upserted = [
+        call.kwargs["where"]["profileId_titleId_platform"]["titleId"]
+        for call in batch.psngame.upsert.call_args_list
+    ]
+    assert upserted == ["NEW2", "NEW1"]
+
+
+def test_unchanged_trophy_summary_skips_the_per_game_trophies(monkeypatch):
+    worker, db, _ = make_worker(monkeypatch)
+    earned = {"platinum": 1, "gold": 2, "silver": 3, "bronze": 4}
+    summary = SimpleNamespace(
+        trophy_level=300, progress=50, tier=3, earned_trophies=earned
+    )
+    db.psntrophy.find_unique.return_value = SimpleNamespace(
+        trophyLevel=300,
+        progress=50,
+        tier=3,
+        platinumCount=1,
+        goldCount=2,
+        silverCount=3,
+        bronzeCount=4,
+        totalTrophies=10,
+    )
+    user = MagicMock()
+    user.trophy_summary.return_value = summary
+    profile = SimpleNamespace(id=1, lastTrophySync=NOW - timedelta(hours=2))
+
+    assert asyncio.run(worker._sync_trophies(profile, user)) == 0
+    db.psntrophy.upsert.assert_not_called()
+    db.psngame.find_many.assert_not_called()
+    user.trophy_titles_for_title.assert_not_called()
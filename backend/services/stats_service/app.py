@@ -1,16 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from routes import router
+from routes import router, war_router, warm_war_artifacts
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the WAR indexes once up front; they are swapped in place when a new run replaces them
+    warm_war_artifacts()
+    yield
+
+
 # Create FastAPI app with metadata
 app = FastAPI(
     title="OVHL Stats Service API",
     description="API for retrieving NHL club statistics",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# Include the router from routes.py
+# Include the routers from routes.py
 app.include_router(router)
+app.include_router(war_router)
 
 
 # Add a root endpoint that redirects to docs
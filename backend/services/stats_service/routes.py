@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException, Query, Path
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from functools import lru_cache
 
 from src.utils import WebRequest, PlatformValidator, MatchTypeValidator
@@ -10,14 +10,38 @@ from src.utils import WebRequest, PlatformValidator, MatchTypeValidator
 from src.ea_api import GetClubsRequest, GetGamesRequest
 from src.models import ClubResponse
 from src.models import Match
+from src.analytics import ArtifactCache, TeammateIndex, LeaderboardIndex, WARTimeSeries, SimilarityIndex
+from src.analytics import TEAMMATE_INDEX_FILE, LEADERBOARD_FILE, TIMESERIES_FILE
+from src.analytics import SIMILARITY_INDEX_FILE, EMBEDDING_INDEX_FILE
+from src.analytics import ModelRegistry, RegisteredModel, MicroBatcher
+from src.analytics import PlayerProjection, FEATURE_STORE_DIR, artifact_path, current_version, projection_file
+from src.analytics import FeatureStore, ArchetypeModel, ARCHETYPES_FILE
 
 # Create router with API prefix and tags for better documentation
 router = APIRouter(prefix="/api/stats", tags=["clubs"])
+war_router = APIRouter(prefix="/api/stats/war", tags=["war"])
 
 # Create instances of required dependencies
 web_request = WebRequest()
 platform_validator = PlatformValidator()
 match_type_validator = MatchTypeValidator()
+war_artifacts = ArtifactCache()
+feature_artifacts = ArtifactCache(artifact_path(FEATURE_STORE_DIR))
+
+model_registry = ModelRegistry()
+war_batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+
+# Maximum players scored in one prediction request
+MAX_PREDICTION_PLAYERS = 5000
+
+# Similarity index file for each `source` accepted by the similar players endpoint
+SIMILARITY_SOURCES = {
+    "features": SIMILARITY_INDEX_FILE,
+    "embedding": EMBEDDING_INDEX_FILE,
+}
+
+# Player projections saved with the feature store by the WAR analyses
+PROJECTIONS = ("clusters", "embedding")
 
 # Create a cached version of the club request
 @lru_cache(maxsize=100)  # Cache up to 100 different club requests
@@ -40,6 +64,146 @@ def get_cached_club_request(search_name: str, platform: str) -> GetClubsRequest:
         platform_validator=platform_validator,
     )
 
+def get_teammate_index() -> TeammateIndex:
+    """Get the teammate index written by the last WAR run.
+
+    The index is reloaded automatically when a new WAR run replaces it.
+
+    Returns:
+        The TeammateIndex loaded from the WAR artifacts directory.
+    """
+    return war_artifacts.get(TEAMMATE_INDEX_FILE, TeammateIndex.load)
+
+def get_leaderboard_index() -> LeaderboardIndex:
+    """Get the WAR leaderboard written by the last WAR run.
+
+    The leaderboard is reloaded automatically when a new WAR run replaces it.
+
+    Returns:
+        The LeaderboardIndex loaded from the WAR artifacts directory.
+    """
+    return war_artifacts.get(LEADERBOARD_FILE, LeaderboardIndex.load)
+
+def get_war_timeseries() -> WARTimeSeries:
+    """Get the per-game WAR history written by the last WAR run.
+
+    The store is reloaded automatically when a new WAR run replaces it.
+
+    Returns:
+        The WARTimeSeries loaded from the WAR artifacts directory.
+    """
+    return war_artifacts.get(TIMESERIES_FILE, WARTimeSeries.load)
+
+def get_similarity_index(source: str = "features") -> SimilarityIndex:
+    """Get a player similarity index written by the last WAR analysis or model training.
+
+    The index is reloaded automatically when a new run replaces it.
+
+    Args:
+        source: "features" for the WAR feature index or "embedding" for the learned embeddings
+
+    Returns:
+        The SimilarityIndex loaded from the WAR artifacts directory.
+    """
+    return war_artifacts.get(SIMILARITY_SOURCES[source], SimilarityIndex.load)
+
+def get_player_projection(name: str) -> PlayerProjection:
+    """Get a 2-D player projection saved with the current feature store version.
+
+    The projection of a new feature store version is picked up as soon as the WAR
+    analysis publishes it.
+
+    Args:
+        name: "clusters" for the WAR feature projection or "embedding" for the learned embeddings
+
+    Returns:
+        The PlayerProjection loaded from the feature store directory.
+    """
+    return feature_artifacts.get(projection_file(name, current_version()), PlayerProjection.load)
+
+def get_feature_store() -> FeatureStore:
+    """Get the current version of the WAR feature store.
+
+    The store is reopened automatically when a new WAR run publishes a new version.
+
+    Returns:
+        The FeatureStore opened from the feature store directory.
+    """
+    version = current_version()
+    return feature_artifacts.get(version, lambda _: FeatureStore.open(version=version))
+
+def get_archetype_model() -> ArchetypeModel:
+    """Get the player archetype centroids written by the last clustering run.
+
+    The centroids are reloaded automatically when the clustering is fitted again.
+
+    Returns:
+        The ArchetypeModel loaded from the WAR artifacts directory.
+    """
+    return war_artifacts.get(ARCHETYPES_FILE, ArchetypeModel.load)
+
+def get_registered_model(name: str, version: Optional[str] = None) -> RegisteredModel:
+    """Get a trained WAR model from the model registry.
+
+    The latest version is reloaded automatically when a new model is registered.
+
+    Args:
+        name: Registry name of the model
+        version: Version to get. Defaults to the latest.
+
+    Returns:
+        The RegisteredModel loaded from the registry.
+    """
+    return model_registry.get(name, version)
+
+def get_model_batcher(model: RegisteredModel) -> MicroBatcher:
+    """Get the micro-batcher that scores requests for a model version.
+
+    Concurrent prediction requests for the same model version are merged into a single
+    model call. The batcher is bound to the concrete version, so every request in a
+    batch is scored by the model it was validated against. When a batcher is created,
+    those of other versions that are no longer the latest are closed and dropped.
+
+    Args:
+        model: Registered model version to score with
+
+    Returns:
+        The MicroBatcher for the model version, yielding predictions per player.
+    """
+    key = (model.name, model.version)
+    if key not in war_batchers:
+        war_batchers[key] = MicroBatcher(model.predict_records)
+        evict_model_batchers(model.name, keep=model.version)
+    return war_batchers[key]
+
+def evict_model_batchers(name: str, keep: Optional[str] = None) -> None:
+    """Close the batchers of a model's versions other than the latest and ``keep``.
+
+    Requests already queued on an evicted batcher are still answered.
+
+    Args:
+        name: Registry name of the model
+        keep: Version to keep in addition to the latest
+    """
+    try:
+        latest = model_registry.latest_version(name)
+    except FileNotFoundError:
+        latest = None
+    for key in [key for key in war_batchers if key[0] == name]:
+        if key[1] not in (latest, keep):
+            war_batchers.pop(key).close()
+
+def warm_war_artifacts() -> None:
+    """Load every WAR artifact that has been written, so the first requests are not slowed."""
+    loaders = [get_teammate_index, get_leaderboard_index, get_war_timeseries, get_feature_store, get_archetype_model]
+    loaders += [lambda source=source: get_similarity_index(source) for source in SIMILARITY_SOURCES]
+    loaders += [lambda name=name: get_player_projection(name) for name in PROJECTIONS]
+    for loader in loaders:
+        try:
+            loader()
+        except FileNotFoundError:
+            pass
+
 class ClubResponse(BaseModel):
     club_id: int
 
@@ -53,6 +217,124 @@ class ClubFullResponse(BaseModel):
 class MatchesResponse(BaseModel):
     matches: List[Match]
 
+class TeammateSynergy(BaseModel):
+    teammate_id: str
+    teammate_name: str
+    games_together: int
+    teammate_avg_war: float
+
+class TeammatesResponse(BaseModel):
+    player_id: str
+    teammates: List[TeammateSynergy]
+
+class WARComponents(BaseModel):
+    war_value: float
+    offensive_war: float
+    defensive_war: float
+    teamplay_war: float
+
+class PlayerFormResponse(BaseModel):
+    player_id: str
+    games_played: int
+    window: int
+    games_in_window: int
+    form: WARComponents
+    trend: WARComponents
+
+class PlayerArchetype(BaseModel):
+    detailed_position: str
+    games_played: int
+    archetype: int
+    distance: float
+    profile: Dict[str, float]
+
+class PlayerArchetypeResponse(BaseModel):
+    player_id: str
+    player_name: str
+    model_version: str
+    features: List[str]
+    archetypes: List[PlayerArchetype]
+
+class SimilarPlayer(BaseModel):
+    player_name: str
+    detailed_position: str
+    war_value: float
+    similarity: float
+
+class SimilarPlayersResponse(BaseModel):
+    player_name: str
+    detailed_position: str
+    source: str
+    similar_players: List[SimilarPlayer]
+
+class ProjectedPlayer(BaseModel):
+    player_name: str
+    detailed_position: str
+    war_value: float
+    x: float
+    y: float
+    cluster: Optional[int] = None
+
+class ProjectionResponse(BaseModel):
+    name: str
+    version: str
+    features: List[str]
+    explained_variance: Optional[List[float]] = None
+    players: List[ProjectedPlayer]
+
+class PlayerStatsInput(BaseModel):
+    player_name: Optional[str] = None
+    detailed_position: Optional[str] = None
+    features: Dict[str, float]
+
+class PredictionRequest(BaseModel):
+    players: List[PlayerStatsInput]
+    version: Optional[str] = None
+
+class PlayerPrediction(BaseModel):
+    player_name: Optional[str] = None
+    detailed_position: Optional[str] = None
+    predictions: Dict[str, float]
+
+class PredictionResponse(BaseModel):
+    name: str
+    version: str
+    targets: List[str]
+    players: List[PlayerPrediction]
+
+class RegisteredModelInfo(BaseModel):
+    name: str
+    latest_version: str
+    versions: List[str]
+    features: List[str]
+    targets: List[str]
+    position_aware: bool
+
+class ModelsResponse(BaseModel):
+    models: List[RegisteredModelInfo]
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    player_id: str
+    player_name: str
+    detailed_position: str
+    games_played: int
+    war_value: float
+    war_per_game: float
+    war_ci_low: Optional[float] = None
+    war_ci_high: Optional[float] = None
+    offensive_war: float
+    defensive_war: float
+    teamplay_war: float
+    points: int
+    archetype: Optional[int] = None
+
+class LeaderboardResponse(BaseModel):
+    season: str
+    position: Optional[str] = None
+    items: List[LeaderboardEntry]
+    next_cursor: Optional[str] = None
+
 @router.get("/club/{search_name}/id", response_model=ClubResponse, summary="Get Club ID")
 async def get_club_id(
     search_name: str = Path(..., description="The name of the club to search for"),
@@ -198,4 +480,367 @@ async def get_club_matches_pydantic(
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error retrieving club matches: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@war_router.get(
+    "/players/{player_id}/teammates", response_model=TeammatesResponse, summary="Get Teammate Synergies"
+)
+async def get_player_teammates(
+    player_id: str = Path(..., description="The EA player ID to get teammates for"),
+    k: int = Query(5, ge=1, le=50, description="Number of teammates to return"),
+    min_games: int = Query(3, ge=1, description="Minimum games played together"),
+    worst: bool = Query(False, description="Return the lowest WAR teammates instead of the highest"),
+):
+    """Get the teammates a player has the best (or worst) results with.
+
+    Teammates are ranked by their average WAR in games shared with the player, using the
+    teammate index produced by the last WAR run.
+
+    Args:
+        player_id (str): Required. The EA player ID to get teammates for
+        k (int): Optional. Number of teammates to return. Default is 5.
+        min_games (int): Optional. Minimum games played together. Default is 3.
+        worst (bool): Optional. Return the lowest WAR teammates instead. Default is False.
+
+    Returns:
+        The player ID and the ranked teammates
+    """
+    try:
+        teammate_index = get_teammate_index()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="WAR teammate index has not been built yet")
+
+    if player_id not in teammate_index:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
+
+    try:
+        teammates = teammate_index.top_synergies(player_id, k=k, min_games=min_games, largest=not worst)
+        return {"player_id": player_id, "teammates": teammates}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving teammates: {str(e)}"
+        )
+
+
+@war_router.get("/leaderboard", response_model=LeaderboardResponse, summary="Get WAR Leaderboard")
+async def get_war_leaderboard(
+    season: str | None = Query(None, description="The season to rank. Defaults to the latest season"),
+    position: str | None = Query(None, description="Restrict to a detailed position, e.g. 'center' or 'goalie'"),
+    min_games: int = Query(0, ge=0, description="Minimum games played"),
+    limit: int = Query(25, ge=1, le=100, description="Number of players per page"),
+    cursor: str | None = Query(None, description="Cursor returned by the previous page"),
+):
+    """Get a page of the WAR leaderboard.
+
+    Rankings are precomputed by the WAR job and held in memory, so requests only slice
+    an already sorted list.
+
+    Args:
+        season (str): Optional. The season to rank. Defaults to the latest season.
+        position (str): Optional. Restrict to a detailed position.
+        min_games (int): Optional. Minimum games played. Default is 0.
+        limit (int): Optional. Number of players per page. Default is 25.
+        cursor (str): Optional. Cursor returned by the previous page.
+
+    Returns:
+        The page of players and the cursor for the next page
+    """
+    try:
+        leaderboard = get_leaderboard_index()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="WAR leaderboard has not been built yet")
+
+    try:
+        items, next_cursor = leaderboard.page(
+            season=season, position=position, min_games=min_games, limit=limit, cursor=cursor
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e).strip("'"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "season": season or leaderboard.latest_season,
+        "position": position,
+        "items": items,
+        "next_cursor": next_cursor,
+    }
+
+
+@war_router.get("/players/{player_id}/form", response_model=PlayerFormResponse, summary="Get Player Form")
+async def get_player_form(
+    player_id: str = Path(..., description="The EA player ID to get form for"),
+    window: int = Query(5, ge=1, le=82, description="Number of recent games to average"),
+):
+    """Get a player's recent form and trend.
+
+    Form is the average of each WAR component over the player's last `window` games. Trend
+    is the change in that average compared to the `window` games before them.
+
+    Args:
+        player_id (str): Required. The EA player ID to get form for
+        window (int): Optional. Number of recent games to average. Default is 5.
+
+    Returns:
+        The player's form and trend over the window
+    """
+    try:
+        war_timeseries = get_war_timeseries()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="WAR time series has not been built yet")
+
+    if player_id not in war_timeseries:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
+
+    try:
+        form = war_timeseries.form(player_id, window)
+        return {
+            "player_id": player_id,
+            "games_played": war_timeseries.games_played(player_id),
+            "window": window,
+            "games_in_window": form.pop("games"),
+            "form": form,
+            "trend": war_timeseries.trend(player_id, window),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving player form: {str(e)}"
+        )
+
+
+@war_router.get(
+    "/players/{player_id}/archetype", response_model=PlayerArchetypeResponse, summary="Get Player Archetype"
+)
+async def get_player_archetype(
+    player_id: str = Path(..., description="The EA player ID to get the archetype of"),
+):
+    """Get a player's archetype from their latest aggregated stats.
+
+    The player is assigned to the nearest stored cluster centroid, so players added by a new
+    WAR run get an archetype without refitting the clustering. Players who played several
+    positions get one archetype per position.
+
+    Args:
+        player_id (str): Required. The EA player ID to get the archetype of
+
+    Returns:
+        The player's archetype, distance to its centroid and the centroid profile for each position
+    """
+    try:
+        archetypes = get_archetype_model()
+        feature_store = get_feature_store()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Player archetypes have not been fitted yet")
+
+    try:
+        rows = feature_store.rows_of(player_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found")
+
+    try:
+        assigned = []
+        for row in rows:
+            values = {f: feature_store.column(f)[row] for f in archetypes.features}
+            archetype, distance = archetypes.assign_one(values)
+            assigned.append({
+                "detailed_position": str(feature_store.column("detailed_position")[row]),
+                "games_played": int(feature_store.column("games_played")[row]),
+                "archetype": archetype,
+                "distance": distance,
+                "profile": archetypes.profile(archetype),
+            })
+        return {
+            "player_id": player_id,
+            "player_name": str(feature_store.column("player_name")[rows[0]]),
+            "model_version": archetypes.version,
+            "features": archetypes.features,
+            "archetypes": assigned,
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving player archetype: {str(e)}"
+        )
+
+
+@war_router.get(
+    "/players/{player_name}/similar", response_model=SimilarPlayersResponse, summary="Get Similar Players"
+)
+async def get_similar_players(
+    player_name: str = Path(..., description="The player name to find similar players for"),
+    k: int = Query(5, ge=1, le=50, description="Number of similar players to return"),
+    position: str | None = Query(None, description="Restrict to a detailed position, e.g. 'center' or 'goalie'"),
+    same_position: bool = Query(False, description="Restrict to the player's own position"),
+    source: str = Query("features", description="Index to search: 'features' or 'embedding'"),
+):
+    """Get the players most similar to a player.
+
+    Players are compared by cosine similarity of their standardized WAR features, or by
+    Euclidean distance between the embeddings learned by the PyTorch model when
+    `source` is 'embedding'.
+
+    Args:
+        player_name (str): Required. The player name to find similar players for
+        k (int): Optional. Number of similar players to return. Default is 5.
+        position (str): Optional. Restrict to a detailed position.
+        same_position (bool): Optional. Restrict to the player's own position. Default is False.
+        source (str): Optional. Index to search. Default is 'features'.
+
+    Returns:
+        The player and the ranked similar players
+    """
+    if source not in SIMILARITY_SOURCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid source: {source}. Must be one of {list(SIMILARITY_SOURCES)}",
+        )
+
+    try:
+        similarity_index = get_similarity_index(source)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail=f"Player similarity index ({source}) has not been built yet")
+
+    if player_name not in similarity_index:
+        raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
+
+    try:
+        matches = similarity_index.query(player_name, k=k, same_position=same_position, position=position)
+        return {
+            "player_name": player_name,
+            "detailed_position": similarity_index.positions[similarity_index.row_of(player_name)],
+            "source": source,
+            "similar_players": matches,
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving similar players: {str(e)}"
+        )
+
+
+@war_router.get("/projections/{name}", response_model=ProjectionResponse, summary="Get Player Projection")
+async def get_player_projection_points(
+    name: str = Path(..., description="Projection to get: 'clusters' or 'embedding'"),
+    position: str | None = Query(None, description="Restrict to a detailed position, e.g. 'center' or 'goalie'"),
+):
+    """Get the 2-D coordinates of every player for a scatter plot.
+
+    'clusters' projects the standardized WAR features used for clustering and includes each
+    player's cluster; 'embedding' holds the embeddings learned by the PyTorch model.
+
+    Args:
+        name (str): Required. The projection to get
+        position (str): Optional. Restrict to a detailed position.
+
+    Returns:
+        The feature store version, projected features, explained variance and the players' coordinates
+    """
+    if name not in PROJECTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid projection: {name}. Must be one of {list(PROJECTIONS)}",
+        )
+
+    try:
+        projection = get_player_projection(name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail=f"Player projection ({name}) has not been built yet")
+
+    try:
+        return {
+            "name": name,
+            "version": projection.version,
+            "features": projection.features,
+            "explained_variance": (
+                None if projection.explained_variance is None else projection.explained_variance.tolist()
+            ),
+            "players": projection.points(position),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error retrieving player projection: {str(e)}"
+        )
+
+
+@war_router.get("/models", response_model=ModelsResponse, summary="List WAR Models")
+async def list_war_models():
+    """List the trained WAR models available for prediction.
+
+    Returns:
+        Every registered model with its versions, input features and predicted targets
+    """
+    try:
+        models = []
+        for name in model_registry.names():
+            model = get_registered_model(name)
+            models.append({
+                "name": name,
+                "latest_version": model.version,
+                "versions": model_registry.versions(name),
+                "features": model.features,
+                "targets": model.targets,
+                "position_aware": model.positions is not None,
+            })
+        return {"models": models}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error listing WAR models: {str(e)}"
+        )
+
+
+@war_router.post("/models/{name}/predict", response_model=PredictionResponse, summary="Predict WAR")
+async def predict_war(
+    request: PredictionRequest,
+    name: str = Path(..., description="Registry name of the model, e.g. 'war_multitask'"),
+):
+    """Project WAR for a group of player-seasons, e.g. a whole draft or bidding pool.
+
+    All players in the request are scored in one model call, and concurrent requests to
+    the same model are batched together.
+
+    Args:
+        request (PredictionRequest): Required. The players' stats and an optional model version
+        name (str): Required. Registry name of the model
+
+    Returns:
+        The model version used and the predicted targets for each player, in request order
+    """
+    if len(request.players) > MAX_PREDICTION_PLAYERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many players: {len(request.players)}. Maximum is {MAX_PREDICTION_PLAYERS}",
+        )
+
+    try:
+        model = get_registered_model(name, request.version)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Model {name} ({request.version or 'latest'}) not found")
+
+    records = []
+    for i, player in enumerate(request.players):
+        record = {**player.features, "detailed_position": player.detailed_position}
+        try:
+            model.validate(record)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Player {i}: {str(e)}")
+        records.append(record)
+
+    try:
+        results = await get_model_batcher(model).predict(records)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error predicting WAR: {str(e)}"
+        )
+
+    return {
+        "name": name,
+        "version": model.version,
+        "targets": model.targets,
+        "players": [
+            {
+                "player_name": player.player_name,
+                "detailed_position": player.detailed_position,
+                "predictions": predictions,
+            }
+            for player, predictions in zip(request.players, results)
+        ],
+    }
@@ -0,0 +1,71 @@
+from .artifacts import (
+    ARTIFACTS_DIR,
+    TEAMMATE_INDEX_FILE,
+    LEADERBOARD_FILE,
+    TIMESERIES_FILE,
+    SIMILARITY_INDEX_FILE,
+    EMBEDDING_INDEX_FILE,
+    ARCHETYPES_FILE,
+    ArtifactCache,
+    artifact_path,
+    dataset_hash,
+    file_hash,
+)
+from .bootstrap import bootstrap_war_intervals
+from .schema import PLAYER_STATS_SCHEMA, load_player_stats, apply_schema, memory_report
+from .teammates import TeammateIndex
+from .leaderboard import LeaderboardIndex
+from .timeseries import WARTimeSeries, WAR_COMPONENTS
+from .similarity import SimilarityIndex
+from .clustering import kmeans_k_sweep, fit_kmeans
+from .training import cross_validate_models, make_folds, make_model, prune_model_cache
+from .registry import ModelRegistry, RegisteredModel
+from .inference import MicroBatcher
+from .features import FeatureStore, FEATURE_STORE_DIR, POSITION_ORDER, current_version, prune_versions
+from .projection import PlayerProjection, carry_over_projections, projection_file, projection_path
+from .render import RenderQueue
+from .archetypes import ArchetypeModel
+
+__all__ = [
+    "ARTIFACTS_DIR",
+    "TEAMMATE_INDEX_FILE",
+    "LEADERBOARD_FILE",
+    "TIMESERIES_FILE",
+    "SIMILARITY_INDEX_FILE",
+    "EMBEDDING_INDEX_FILE",
+    "ARCHETYPES_FILE",
+    "ArtifactCache",
+    "artifact_path",
+    "dataset_hash",
+    "file_hash",
+    "bootstrap_war_intervals",
+    "PLAYER_STATS_SCHEMA",
+    "load_player_stats",
+    "apply_schema",
+    "memory_report",
+    "TeammateIndex",
+    "LeaderboardIndex",
+    "WARTimeSeries",
+    "WAR_COMPONENTS",
+    "SimilarityIndex",
+    "kmeans_k_sweep",
+    "fit_kmeans",
+    "cross_validate_models",
+    "make_folds",
+    "make_model",
+    "prune_model_cache",
+    "ModelRegistry",
+    "RegisteredModel",
+    "MicroBatcher",
+    "FeatureStore",
+    "FEATURE_STORE_DIR",
+    "POSITION_ORDER",
+    "current_version",
+    "prune_versions",
+    "PlayerProjection",
+    "carry_over_projections",
+    "projection_file",
+    "projection_path",
+    "RenderQueue",
+    "ArchetypeModel",
+]
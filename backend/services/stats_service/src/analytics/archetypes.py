@@ -0,0 +1,149 @@
+"""Player archetypes: stored cluster centroids and nearest-centroid assignment."""
+
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class ArchetypeModel:
+    """Fitted archetype centroids together with the scaling they were fitted in.
+
+    Assigning a player standardizes their raw features with the stored mean and scale
+    and picks the nearest centroid, which takes microseconds and needs neither the
+    clustering model nor the data it was fitted on. Newly aggregated players keep being
+    assigned with the same centroids until the clustering is fitted again.
+
+    Attributes:
+        features: Raw feature columns, in centroid column order.
+        centroids: (archetypes x features) centroids in standardized units.
+        mean: Per-feature mean used for standardization.
+        scale: Per-feature standard deviation used for standardization.
+        sizes: Number of players in each archetype when it was fitted, if known.
+        version: When the centroids were fitted.
+        source: Feature store version the centroids were fitted on, if any.
+    """
+
+    def __init__(
+        self,
+        features: Sequence[str],
+        centroids: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        sizes: Optional[np.ndarray] = None,
+        version: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> None:
+        self.features = list(features)
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.sizes = None if sizes is None else np.asarray(sizes, dtype=np.int64)
+        self.version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        self.source = source
+        self._centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def from_kmeans(
+        cls,
+        model: Any,
+        scaler: Any,
+        features: Sequence[str],
+        source: Optional[str] = None,
+    ) -> "ArchetypeModel":
+        """Capture a fitted KMeans model and the scaler of its input.
+
+        Args:
+            model: Fitted ``KMeans`` or ``MiniBatchKMeans``.
+            scaler: Fitted ``StandardScaler`` that produced the model's input.
+            features: Raw feature columns, in model order.
+            source: Feature store version the model was fitted on.
+
+        Returns:
+            The archetype model.
+        """
+        sizes = None
+        if getattr(model, "labels_", None) is not None:
+            sizes = np.bincount(model.labels_, minlength=model.n_clusters)
+        return cls(features, model.cluster_centers_, scaler.mean_, scaler.scale_, sizes=sizes, source=source)
+
+    def assign(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Assign players to their nearest archetype.
+
+        Args:
+            X: (players x features) raw feature values, in ``features`` order.
+
+        Returns:
+            The archetype of each player and the Euclidean distance to its centroid,
+            in standardized units.
+        """
+        Z = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        # ||z - c||^2 = ||z||^2 - 2 z.c + ||c||^2, one matrix product for all players
+        distances = (Z * Z).sum(axis=1)[:, None] - 2 * Z @ self.centroids.T + self._centroid_norms
+        labels = distances.argmin(axis=1)
+        nearest = np.sqrt(np.maximum(distances[np.arange(len(Z)), labels], 0))
+        return labels, nearest
+
+    def assign_one(self, values: Mapping[str, Any]) -> Tuple[int, float]:
+        """Assign a single player to their nearest archetype.
+
+        Args:
+            values: Raw feature values keyed by feature name.
+
+        Returns:
+            The archetype and the distance to its centroid.
+
+        Raises:
+            ValueError: If a feature is missing.
+        """
+        missing = [f for f in self.features if values.get(f) is None]
+        if missing:
+            raise ValueError(f"Missing features for archetype assignment: {missing}")
+        z = (np.array([float(values[f]) for f in self.features]) - self.mean) / self.scale
+        distances = ((self.centroids - z) ** 2).sum(axis=1)
+        label = int(distances.argmin())
+        return label, float(np.sqrt(distances[label]))
+
+    def profile(self, archetype: int) -> Dict[str, float]:
+        """Get the centroid of an archetype in raw feature units."""
+        centroid = self.centroids[archetype] * self.scale + self.mean
+        return dict(zip(self.features, centroid.tolist()))
+
+    def save(self, path: str) -> None:
+        """Write the model atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "centroids": self.centroids,
+            "mean": self.mean,
+            "scale": self.scale,
+            "metadata": np.array(json.dumps(
+                {"features": self.features, "version": self.version, "source": self.source}
+            )),
+        }
+        if self.sizes is not None:
+            arrays["sizes"] = self.sizes
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ArchetypeModel":
+        """Load a model written by :meth:`save`."""
+        with np.load(path) as data:
+            metadata = json.loads(str(data["metadata"]))
+            return cls(
+                features=metadata["features"],
+                centroids=data["centroids"],
+                mean=data["mean"],
+                scale=data["scale"],
+                sizes=data["sizes"] if "sizes" in data else None,
+                version=metadata["version"],
+                source=metadata["source"],
+            )
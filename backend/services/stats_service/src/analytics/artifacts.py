@@ -0,0 +1,114 @@
+"""Locations and versioning of the WAR artifacts shared between the batch jobs and the API."""
+
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Directory the WAR jobs write their indexes to and the API reads them from. Resolved
+# when first imported, so a job that changes its working directory still writes
+# where the API reads when both are started from the service root.
+ARTIFACTS_DIR = os.path.abspath(os.getenv("WAR_ARTIFACTS_DIR", "war_artifacts"))
+
+TEAMMATE_INDEX_FILE = "teammates.npz"
+LEADERBOARD_FILE = "leaderboard.json"
+TIMESERIES_FILE = "war_timeseries.npz"
+# Metadata of the similarity index; it names the similarity.<hash>.npy vectors next to it
+SIMILARITY_INDEX_FILE = "similarity.json"
+# Same layout, built from the learned player embeddings of the PyTorch model
+EMBEDDING_INDEX_FILE = "embedding_similarity.json"
+# Player archetype centroids and their scaling, written by the clustering analysis
+ARCHETYPES_FILE = "archetypes.npz"
+
+
+def artifact_path(filename: str) -> str:
+    """Get the full path of a WAR artifact.
+
+    Args:
+        filename: The artifact file name.
+
+    Returns:
+        The path of the artifact inside ``ARTIFACTS_DIR``.
+    """
+    return os.path.join(ARTIFACTS_DIR, filename)
+
+
+def dataset_hash(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> str:
+    """Get a stable content hash of a DataFrame, used to version cached artifacts.
+
+    Args:
+        df: The data to hash.
+        columns: Restrict the hash to these columns. Defaults to all columns.
+
+    Returns:
+        A short hex digest that changes whenever the hashed values change.
+    """
+    data = df if columns is None else df[list(columns)]
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(",".join(map(str, data.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+def file_hash(path: str) -> str:
+    """Get a content hash of a file, used to detect a changed input file.
+
+    Args:
+        path: The file to hash.
+
+    Returns:
+        A short hex digest of the file's bytes.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class ArtifactCache:
+    """Keeps loaded artifacts in memory and reloads them when their file changes.
+
+    Artifacts are written atomically by the batch jobs, so a changed modification time
+    means a complete new version is available. Checking it costs a single ``stat`` per
+    lookup, which lets the API pick up a new WAR run without a restart.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: Directory the artifact file names are relative to. Defaults to
+                ``ARTIFACTS_DIR``.
+        """
+        self.root = root
+        self._entries: Dict[str, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filename: str, loader: Callable[[str], Any]) -> Any:
+        """Get an artifact, loading it if it is new or has changed on disk.
+
+        Args:
+            filename: The artifact file name inside the cache's root directory.
+            loader: Callable that loads the artifact from its path.
+
+        Returns:
+            The loaded artifact.
+
+        Raises:
+            FileNotFoundError: If the artifact has not been written yet.
+        """
+        path = os.path.join(self.root, filename) if self.root else artifact_path(filename)
+        mtime = os.stat(path).st_mtime_ns
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, loader(path))
+                self._entries[path] = entry
+        return entry[1]
@@ -0,0 +1,114 @@
+"""Bootstrap confidence intervals for player WAR."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .artifacts import ARTIFACTS_DIR, dataset_hash
+
+# Players per worker task. Fixed so results do not depend on the number of workers.
+CHUNK_SIZE = 64
+
+# Upper bound on resampled values materialized at once (players x resamples x games)
+MAX_BLOCK_ELEMENTS = 5_000_000
+
+
+def bootstrap_war_intervals(
+    df: pd.DataFrame,
+    group_cols: Sequence[str] = ("player_id", "detailed_position"),
+    value_col: str = "war_value",
+    n_resamples: int = 1000,
+    confidence: float = 0.9,
+    seed: int = 42,
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = ARTIFACTS_DIR,
+) -> pd.DataFrame:
+    """Estimate confidence intervals for season WAR by resampling player-games.
+
+    For each player the season total is recomputed ``n_resamples`` times from games
+    drawn with replacement. Players with the same number of games are resampled
+    together through a single NumPy index matrix, and groups of players are spread
+    across a process pool. Every chunk of players gets its own child of ``seed``, so
+    the output is identical for any ``n_jobs``.
+
+    Args:
+        df: Per-game rows containing ``group_cols`` and ``value_col``.
+        group_cols: Columns identifying a player season.
+        value_col: The per-game value to total.
+        n_resamples: Number of bootstrap resamples per player.
+        confidence: Width of the central interval, e.g. 0.9 for a 5-95% interval.
+        seed: Seed for the random generator.
+        n_jobs: Worker processes. ``None`` uses every core, 1 runs in-process.
+        cache_dir: Directory for cached results keyed by the dataset version and
+            parameters. ``None`` disables caching.
+
+    Returns:
+        One row per player with ``war_ci_low``, ``war_ci_high`` and ``war_std``.
+    """
+    group_cols = list(group_cols)
+    cache_path = None
+    if cache_dir is not None:
+        version = dataset_hash(df, group_cols + [value_col])
+        cache_path = os.path.join(
+            cache_dir, f"war_bootstrap_{version}_{n_resamples}_{confidence}_{seed}.pkl"
+        )
+        if os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+
+    keys, samples = [], []
+    for key, values in df.groupby(group_cols, observed=True, sort=True)[value_col]:
+        keys.append(key)
+        samples.append(values.to_numpy(dtype=np.float64))
+
+    alpha = (1.0 - confidence) / 2.0
+    chunks = [samples[i:i + CHUNK_SIZE] for i in range(0, len(samples), CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(chunk, n_resamples, alpha, chunk_seed) for chunk, chunk_seed in zip(chunks, seeds)]
+
+    if n_jobs == 1 or len(tasks) <= 1:
+        results = [_bootstrap_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_bootstrap_chunk, tasks))
+
+    stats = np.vstack(results) if results else np.empty((0, 3))
+    intervals = pd.DataFrame(keys, columns=group_cols)
+    intervals["war_ci_low"] = stats[:, 0]
+    intervals["war_ci_high"] = stats[:, 1]
+    intervals["war_std"] = stats[:, 2]
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        intervals.to_pickle(cache_path)
+
+    return intervals
+
+
+def _bootstrap_chunk(task: Tuple[List[np.ndarray], int, float, np.random.SeedSequence]) -> np.ndarray:
+    """Compute (low, high, std) of resampled totals for a chunk of players."""
+    samples, n_resamples, alpha, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    out = np.empty((len(samples), 3))
+
+    # Players with the same number of games share one vectorized resampling pass
+    lengths = np.array([len(values) for values in samples])
+    for n_games in np.unique(lengths):
+        rows = np.flatnonzero(lengths == n_games)
+        games = np.stack([samples[row] for row in rows])
+        block = max(1, MAX_BLOCK_ELEMENTS // (n_resamples * n_games))
+
+        for start in range(0, len(rows), block):
+            values = games[start:start + block]
+            index = rng.integers(0, n_games, size=(len(values), n_resamples, n_games))
+            totals = np.take_along_axis(values[:, None, :], index, axis=2).sum(axis=2)
+
+            low, high = np.quantile(totals, [alpha, 1.0 - alpha], axis=1)
+            target = rows[start:start + block]
+            out[target, 0] = low
+            out[target, 1] = high
+            out[target, 2] = totals.std(axis=1)
+
+    return out
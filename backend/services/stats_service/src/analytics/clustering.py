@@ -0,0 +1,203 @@
+"""Parallel, cached KMeans fitting for player archetype clustering."""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+from .artifacts import ARTIFACTS_DIR, dataset_hash
+
+# Subdirectory of the artifacts directory holding sweeps and centroids
+KMEANS_CACHE_DIR = "kmeans"
+
+# Silhouette is quadratic in the number of players, so larger sets are sampled
+SILHOUETTE_SAMPLE_SIZE = 5000
+
+KMeansModel = Union[KMeans, MiniBatchKMeans]
+
+
+def kmeans_k_sweep(
+    X: np.ndarray,
+    k_values: Iterable[int],
+    features: Sequence[str],
+    minibatch: bool = False,
+    n_init: int = 10,
+    random_state: int = 42,
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = ARTIFACTS_DIR,
+) -> pd.DataFrame:
+    """Fit KMeans for every candidate number of clusters, in parallel.
+
+    Results are cached under the feature set and a hash of ``X``, so an unchanged
+    dataset never refits. When the data has changed, each k starts from the centroids
+    of the previous sweep over the same features and is fitted once instead of
+    ``n_init`` times.
+
+    Args:
+        X: Standardized features, one row per player.
+        k_values: Candidate numbers of clusters.
+        features: Names of the columns of ``X``.
+        minibatch: Use MiniBatchKMeans, which is much faster on large sets.
+        n_init: Random initializations per k when there is nothing to warm-start from.
+        random_state: Seed for the KMeans initialization.
+        n_jobs: Worker processes. ``None`` uses every core, 1 runs in-process.
+        cache_dir: Root directory for cached sweeps. ``None`` disables caching and
+            warm starts.
+
+    Returns:
+        One row per k, indexed by ``k``, with ``inertia`` and ``silhouette`` (NaN for
+        k=1). The fitted centroids are in ``attrs["centroids"]``, keyed by k.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    k_values = [k for k in k_values if 1 <= k <= len(X)]
+
+    sweep_path = previous = None
+    if cache_dir is not None:
+        version = dataset_hash(pd.DataFrame(X, columns=list(features)))
+        sweep_path = _cache_path(cache_dir, f"sweep_{_model_key(features, minibatch)}_{version}.pkl")
+        if os.path.exists(sweep_path):
+            cached = pd.read_pickle(sweep_path)
+            if set(k_values) <= set(cached.index):
+                return cached.loc[k_values]
+        previous = load_centroids(features, minibatch, cache_dir)
+
+    tasks = [
+        (X, k, minibatch, n_init, random_state, (previous or {}).get(k))
+        for k in k_values
+    ]
+    if n_jobs == 1 or len(tasks) <= 1:
+        results = [_fit_k(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_fit_k, tasks))
+
+    sweep = pd.DataFrame(
+        [(k, inertia, silhouette) for k, (inertia, silhouette, _) in zip(k_values, results)],
+        columns=["k", "inertia", "silhouette"],
+    ).set_index("k")
+    sweep.attrs["centroids"] = {k: centroids for k, (_, _, centroids) in zip(k_values, results)}
+
+    if sweep_path is not None:
+        sweep.to_pickle(sweep_path)
+        save_centroids(sweep.attrs["centroids"], features, minibatch, cache_dir)
+
+    return sweep
+
+
+def fit_kmeans(
+    X: np.ndarray,
+    n_clusters: int,
+    features: Sequence[str],
+    minibatch: bool = False,
+    n_init: int = 10,
+    random_state: int = 42,
+    cache_dir: Optional[str] = ARTIFACTS_DIR,
+) -> KMeansModel:
+    """Fit the final clustering, warm-starting from the last centroids for these features.
+
+    Starting from the previous centroids also keeps cluster numbers stable between
+    runs, so archetype labels do not shuffle after a small data update.
+
+    Args:
+        X: Standardized features, one row per player.
+        n_clusters: Number of clusters.
+        features: Names of the columns of ``X``.
+        minibatch: Use MiniBatchKMeans.
+        n_init: Random initializations when there is nothing to warm-start from.
+        random_state: Seed for the KMeans initialization.
+        cache_dir: Root directory for stored centroids. ``None`` disables warm starts.
+
+    Returns:
+        The fitted model.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    init = None
+    if cache_dir is not None:
+        init = (load_centroids(features, minibatch, cache_dir) or {}).get(n_clusters)
+
+    model = _make_model(n_clusters, minibatch, n_init, random_state, init)
+    model.fit(X)
+
+    if cache_dir is not None:
+        centroids = load_centroids(features, minibatch, cache_dir) or {}
+        centroids[n_clusters] = model.cluster_centers_
+        save_centroids(centroids, features, minibatch, cache_dir)
+
+    return model
+
+
+def load_centroids(
+    features: Sequence[str], minibatch: bool = False, cache_dir: str = ARTIFACTS_DIR
+) -> Optional[Dict[int, np.ndarray]]:
+    """Load the most recent centroids for a feature set, keyed by number of clusters.
+
+    Returns:
+        The centroids, or None if none have been stored.
+    """
+    path = _cache_path(cache_dir, f"centroids_{_model_key(features, minibatch)}.npz")
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {int(key.split("_")[1]): data[key] for key in data.files}
+
+
+def save_centroids(
+    centroids: Dict[int, np.ndarray],
+    features: Sequence[str],
+    minibatch: bool = False,
+    cache_dir: str = ARTIFACTS_DIR,
+) -> None:
+    """Store centroids for a feature set, replacing the file atomically."""
+    path = _cache_path(cache_dir, f"centroids_{_model_key(features, minibatch)}.npz")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **{f"k_{k}": np.asarray(c) for k, c in centroids.items()})
+    os.replace(tmp_path, path)
+
+
+def _fit_k(
+    task: Tuple[np.ndarray, int, bool, int, int, Optional[np.ndarray]]
+) -> Tuple[float, float, np.ndarray]:
+    """Fit one k and compute (inertia, silhouette, centroids)."""
+    X, k, minibatch, n_init, random_state, init = task
+    model = _make_model(k, minibatch, n_init, random_state, init)
+    labels = model.fit_predict(X)
+
+    silhouette = np.nan
+    if 1 < k < len(X):
+        sample_size = min(len(X), SILHOUETTE_SAMPLE_SIZE)
+        silhouette = float(
+            silhouette_score(X, labels, sample_size=sample_size, random_state=random_state)
+        )
+    return float(model.inertia_), silhouette, model.cluster_centers_
+
+
+def _make_model(
+    n_clusters: int,
+    minibatch: bool,
+    n_init: int,
+    random_state: int,
+    init: Optional[np.ndarray] = None,
+) -> KMeansModel:
+    """Create a KMeans model, seeded from ``init`` when its shape still fits."""
+    cls = MiniBatchKMeans if minibatch else KMeans
+    if init is not None and init.shape[0] == n_clusters:
+        return cls(n_clusters=n_clusters, init=init, n_init=1, random_state=random_state)
+    return cls(n_clusters=n_clusters, n_init=n_init, random_state=random_state)
+
+
+def _model_key(features: Sequence[str], minibatch: bool) -> str:
+    """Get a short key identifying a feature set and KMeans variant."""
+    digest = hashlib.sha1(",".join(features).encode()).hexdigest()[:12]
+    return f"{'minibatch' if minibatch else 'full'}_{digest}"
+
+
+def _cache_path(cache_dir: str, filename: str) -> str:
+    directory = os.path.join(cache_dir, KMEANS_CACHE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
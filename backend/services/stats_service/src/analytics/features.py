@@ -0,0 +1,379 @@
+"""Versioned columnar store of per-player WAR results and their derived features."""
+
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from .artifacts import artifact_path, dataset_hash, file_hash
+
+# Subdirectory of the artifacts directory holding feature store versions
+FEATURE_STORE_DIR = "features"
+
+CURRENT_FILE = "current.json"
+METADATA_FILE = "metadata.json"
+
+# Versions kept when a new one is published, besides the current one and any with
+# saved projections
+KEEP_VERSIONS = 3
+
+# Position order of the position embeddings in the PyTorch models
+POSITION_ORDER = ["leftWing", "center", "goalie", "rightWing", "rightDefense", "leftDefense"]
+
+# Players need this many games to be included in the ML analyses
+MIN_GAMES = 3
+
+# Prefix of the standardized copy of each numeric feature
+SCALED_PREFIX = "z_"
+
+# Columns never standardized
+_UNSCALED_COLUMNS = {"player_id", "position_idx", "qualified", "archetype"}
+
+
+class FeatureStore:
+    """Per-player WAR results with derived features materialized once per WAR run.
+
+    Every column is stored as its own ``.npy`` file and memory-mapped on open, so
+    ``column`` returns a read-only view with no copy or parse step. Each version lives
+    in its own directory named after the content hash of the results, moved into
+    place once complete and never rewritten afterwards, and a ``current.json``
+    pointer is swapped atomically to publish it. Publishing a new version prunes the
+    old ones (see :func:`prune_versions`).
+
+    Derived features are ``war_per_game``, ``points``, ``position_idx`` (index into
+    ``POSITION_ORDER``, -1 if unknown), ``qualified`` (at least ``MIN_GAMES`` games) and
+    a standardized ``z_<column>`` for every numeric column, scaled over the qualified
+    players exactly as ``StandardScaler`` would.
+
+    Attributes:
+        version: Content hash of the results the store was built from.
+        source: Hash of the file the results were read from, if any.
+        columns: Names of the base (unscaled) columns, in order.
+    """
+
+    def __init__(self, directory: str, metadata: Dict[str, Any]) -> None:
+        """Initialize the store from a written version directory.
+
+        Use :meth:`build`, :meth:`open` or :meth:`for_results` rather than calling this
+        directly.
+        """
+        self.directory = directory
+        self.version = metadata["version"]
+        self.source = metadata.get("source")
+        self.columns: List[str] = metadata["columns"]
+        self._scaling: Dict[str, Tuple[float, float]] = {
+            col: tuple(stats) for col, stats in metadata["scaling"].items()
+        }
+        self._n_rows = metadata["n_rows"]
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._rows_by_id: Optional[Dict[str, List[int]]] = None
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    @property
+    def qualified(self) -> np.ndarray:
+        """Get the mask of players with at least ``MIN_GAMES`` games."""
+        return self.column("qualified")
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a read-only view of a column.
+
+        Args:
+            name: A base column, or ``z_<column>`` for a standardized feature.
+
+        Returns:
+            The memory-mapped column.
+
+        Raises:
+            KeyError: If the column is not in the store.
+        """
+        if name not in self._arrays:
+            path = os.path.join(self.directory, f"{name}.npy")
+            if not os.path.exists(path):
+                raise KeyError(f"Column {name} not found in feature store {self.version}")
+            self._arrays[name] = np.load(path, mmap_mode="r")
+        return self._arrays[name]
+
+    def rows_of(self, player_id: Any) -> List[int]:
+        """Get the rows of a player, one per position they played.
+
+        Raises:
+            KeyError: If the player is not in the store.
+        """
+        if self._rows_by_id is None:
+            rows_by_id: Dict[str, List[int]] = {}
+            for row, value in enumerate(self.column("player_id")):
+                rows_by_id.setdefault(str(value), []).append(row)
+            self._rows_by_id = rows_by_id
+        return self._rows_by_id[str(player_id)]
+
+    def scaled(self, features: Sequence[str], qualified_only: bool = True) -> np.ndarray:
+        """Get standardized features as one (players x features) matrix.
+
+        The standardized columns are precomputed; only stacking them into a matrix
+        allocates.
+
+        Args:
+            features: Numeric base columns.
+            qualified_only: Keep only qualified players.
+
+        Returns:
+            The standardized features.
+        """
+        matrix = np.column_stack([self.column(f"{SCALED_PREFIX}{f}") for f in features])
+        return matrix[np.asarray(self.qualified)] if qualified_only else matrix
+
+    def scaler(self, features: Sequence[str]) -> StandardScaler:
+        """Get a fitted StandardScaler equivalent to the stored standardization.
+
+        Lets new players be scaled exactly like the stored ones, e.g. for a model
+        registered with its scaler.
+        """
+        mean, scale = (np.array(values) for values in zip(*(self._scaling[f] for f in features)))
+        scaler = StandardScaler()
+        scaler.mean_ = mean
+        scaler.scale_ = scale
+        scaler.var_ = scale ** 2
+        scaler.n_features_in_ = len(features)
+        scaler.n_samples_seen_ = int(np.count_nonzero(self.qualified))
+        return scaler
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None, qualified_only: bool = False) -> pd.DataFrame:
+        """Get columns as a DataFrame indexed by store row.
+
+        Args:
+            columns: Columns to include. Defaults to every base column.
+            qualified_only: Keep only qualified players.
+
+        Returns:
+            The DataFrame.
+        """
+        columns = self.columns if columns is None else list(columns)
+        rows = np.flatnonzero(self.qualified) if qualified_only else np.arange(len(self))
+        return pd.DataFrame(
+            {col: np.asarray(self.column(col))[rows] for col in columns},
+            index=rows,
+        )
+
+    @classmethod
+    def build(
+        cls,
+        player_war: pd.DataFrame,
+        root: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> "FeatureStore":
+        """Materialize the derived features of aggregated WAR results and publish them.
+
+        Args:
+            player_war: Aggregated results as produced by ``HockeyWAR.aggregate_player_war``.
+            root: Feature store directory. Defaults to ``features`` in the WAR artifacts directory.
+            source: Hash of the file the results were read from, used to detect changes.
+
+        Returns:
+            The new current version of the store.
+        """
+        root = root or artifact_path(FEATURE_STORE_DIR)
+        frame = _derive_features(player_war)
+        version = dataset_hash(frame)
+        directory = os.path.join(root, version)
+
+        # The same results were published before. Readers may have the columns
+        # memory-mapped, so the version is reused rather than rewritten.
+        existing = cls._publish_existing(root, directory, source)
+        if existing is not None:
+            return existing
+
+        # Columns are written to a sibling directory that is moved into place once
+        # complete, so a version directory never holds partial files
+        tmp_directory = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+
+        qualified = frame["qualified"].to_numpy()
+        scaling = {}
+        arrays = {}
+        for col in frame.columns:
+            values = frame[col].to_numpy()
+            if values.dtype == object or pd.api.types.is_string_dtype(frame[col]):
+                values = values.astype(str)
+            arrays[col] = values
+
+            if col not in _UNSCALED_COLUMNS and np.issubdtype(values.dtype, np.number):
+                numeric = values.astype(np.float64)
+                mean = float(numeric[qualified].mean()) if qualified.any() else 0.0
+                scale = float(numeric[qualified].std()) if qualified.any() else 1.0
+                # StandardScaler leaves constant features unscaled
+                scale = scale if scale > 0 else 1.0
+                scaling[col] = (mean, scale)
+                arrays[f"{SCALED_PREFIX}{col}"] = (numeric - mean) / scale
+
+        for name, values in arrays.items():
+            with open(os.path.join(tmp_directory, f"{name}.npy"), "wb") as f:
+                np.save(f, np.ascontiguousarray(values))
+
+        metadata = {
+            "version": version,
+            "source": source,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "n_rows": len(frame),
+            "min_games": MIN_GAMES,
+            "columns": list(frame.columns),
+            "scaling": scaling,
+        }
+        _write_json(os.path.join(tmp_directory, METADATA_FILE), metadata)
+
+        # A directory without metadata is left over from an interrupted build
+        if not os.path.exists(os.path.join(directory, METADATA_FILE)):
+            shutil.rmtree(directory, ignore_errors=True)
+        try:
+            os.replace(tmp_directory, directory)
+        except OSError:
+            # Another process published the same version first
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            existing = cls._publish_existing(root, directory, source)
+            if existing is None:
+                raise
+            return existing
+
+        _write_json(os.path.join(root, CURRENT_FILE), {"version": version})
+        prune_versions(root)
+        return cls(directory, metadata)
+
+    @classmethod
+    def _publish_existing(
+        cls, root: str, directory: str, source: Optional[str]
+    ) -> Optional["FeatureStore"]:
+        """Make an already written version current, or return None if there is none."""
+        metadata_path = os.path.join(directory, METADATA_FILE)
+        try:
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        if source is not None and metadata.get("source") != source:
+            metadata["source"] = source
+            _write_json(metadata_path, metadata)
+        _write_json(os.path.join(root, CURRENT_FILE), {"version": metadata["version"]})
+        return cls(directory, metadata)
+
+    @classmethod
+    def open(cls, root: Optional[str] = None, version: Optional[str] = None) -> "FeatureStore":
+        """Open a version of the store, by default the current one.
+
+        Raises:
+            FileNotFoundError: If the store or version has not been built.
+        """
+        root = root or artifact_path(FEATURE_STORE_DIR)
+        version = version or current_version(root)
+        directory = os.path.join(root, version)
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            return cls(directory, json.load(f))
+
+    @classmethod
+    def for_results(cls, csv_path: str, root: Optional[str] = None) -> "FeatureStore":
+        """Open the store for a WAR results file, rebuilding it if the file has changed.
+
+        Args:
+            csv_path: Path to the aggregated WAR results CSV.
+            root: Feature store directory. Defaults to ``features`` in the WAR artifacts directory.
+
+        Returns:
+            A store built from the current contents of ``csv_path``.
+        """
+        source = file_hash(csv_path)
+        try:
+            store = cls.open(root)
+            if store.source == source:
+                return store
+        except FileNotFoundError:
+            pass
+        return cls.build(pd.read_csv(csv_path), root=root, source=source)
+
+
+def current_version(root: Optional[str] = None) -> str:
+    """Get the current version of the feature store.
+
+    Raises:
+        FileNotFoundError: If the store has not been built.
+    """
+    root = root or artifact_path(FEATURE_STORE_DIR)
+    with open(os.path.join(root, CURRENT_FILE)) as f:
+        return json.load(f)["version"]
+
+
+def prune_versions(root: Optional[str] = None, keep: int = KEEP_VERSIONS) -> List[str]:
+    """Delete old feature store versions.
+
+    The ``keep`` most recently created versions are kept, along with the current
+    version and any version with saved projections. Directories still being written
+    are left alone.
+
+    Args:
+        root: Feature store directory. Defaults to ``features`` in the WAR artifacts directory.
+        keep: Number of most recent versions to keep.
+
+    Returns:
+        The versions deleted.
+    """
+    root = root or artifact_path(FEATURE_STORE_DIR)
+    try:
+        current = current_version(root)
+    except FileNotFoundError:
+        current = None
+
+    versions = []
+    for entry in os.listdir(root):
+        directory = os.path.join(root, entry)
+        try:
+            with open(os.path.join(directory, METADATA_FILE)) as f:
+                created_at = json.load(f).get("created_at") or ""
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        versions.append((created_at, entry))
+    versions.sort(reverse=True)
+
+    deleted = []
+    for _, version in versions[keep:]:
+        directory = os.path.join(root, version)
+        # Projections live in the version directory (see projection.PROJECTIONS_DIR)
+        if version == current or os.path.isdir(os.path.join(directory, "projections")):
+            continue
+        shutil.rmtree(directory, ignore_errors=True)
+        deleted.append(version)
+    return deleted
+
+
+def _derive_features(player_war: pd.DataFrame) -> pd.DataFrame:
+    """Add the derived columns shared by every ML analysis."""
+    frame = player_war.reset_index(drop=True).copy()
+
+    numeric = frame.select_dtypes(include="number").columns
+    frame[numeric] = frame[numeric].fillna(0)
+
+    if "war_per_game" not in frame.columns:
+        frame["war_per_game"] = frame["war_value"] / frame["games_played"]
+    if "points" not in frame.columns and {"skgoals", "skassists"} <= set(frame.columns):
+        frame["points"] = frame["skgoals"] + frame["skassists"]
+
+    position_map = {position: i for i, position in enumerate(POSITION_ORDER)}
+    frame["position_idx"] = (
+        frame["detailed_position"].astype(str).map(position_map).fillna(-1).astype(np.int8)
+    )
+    frame["qualified"] = frame["games_played"].to_numpy() >= MIN_GAMES
+    for col in ("player_name", "detailed_position"):
+        frame[col] = frame[col].astype(str)
+    return frame
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
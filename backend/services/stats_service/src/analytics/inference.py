@@ -0,0 +1,130 @@
+"""Micro-batching of concurrent prediction requests."""
+
+import asyncio
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+class MicroBatcher:
+    """Coalesces concurrent prediction calls into single batched model calls.
+
+    Requests are queued, and a background task drains the queue into batches of up to
+    ``max_batch_size`` items, waiting at most ``max_wait_ms`` for a batch to fill. Each
+    batch runs ``predict_batch`` once in the default executor, so the event loop is
+    never blocked, and the results are handed back to each waiting request in order.
+    If a batch fails, its requests are rerun one by one, so an error only reaches the
+    request that caused it.
+
+    A batcher is bound to the event loop that first uses it. :meth:`close` stops its
+    worker once the queued requests are answered.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 1024,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            predict_batch: Maps a list of items to one result per item.
+            max_batch_size: Maximum items per model call. A single request larger than
+                this is still run as one call.
+            max_wait_ms: Maximum time to wait for more requests before running a batch.
+        """
+        self._predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def predict(self, items: Sequence[Any]) -> List[Any]:
+        """Predict a group of items, sharing the model call with concurrent requests.
+
+        Args:
+            items: Items to predict, e.g. every player in a draft pool.
+
+        Returns:
+            One result per item, in order.
+        """
+        if not items:
+            return []
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((list(items), future))
+        return await future
+
+    def close(self) -> None:
+        """Stop the worker once the requests already queued have been answered.
+
+        A request made after closing is still answered, and the worker stops again.
+        """
+        self._closed = True
+        if self._worker is not None and not self._worker.done():
+            # Wake an idle worker so it sees the batcher is closed
+            self._queue.put_nowait(None)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self._queue.get()
+            if request is None:
+                if self._queue.empty():
+                    return
+                continue
+            pending: List[Tuple[List[Any], asyncio.Future]] = [request]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if request is None:
+                    continue
+                pending.append(request)
+                size += len(request[0])
+
+            batch = [item for items, _ in pending for item in items]
+            try:
+                results = await loop.run_in_executor(None, self._predict_batch, batch)
+            except Exception as e:
+                if len(pending) == 1:
+                    _settle(pending[0][1], exception=e)
+                else:
+                    # Rerun each request alone, so a bad item only fails its own caller
+                    for items, future in pending:
+                        try:
+                            result = await loop.run_in_executor(None, self._predict_batch, items)
+                        except Exception as request_error:
+                            _settle(future, exception=request_error)
+                        else:
+                            _settle(future, result=list(result))
+            else:
+                offset = 0
+                for items, future in pending:
+                    _settle(future, result=list(results[offset:offset + len(items)]))
+                    offset += len(items)
+
+            if self._closed and self._queue.empty():
+                return
+
+
+def _settle(
+    future: asyncio.Future, result: Any = None, exception: Optional[BaseException] = None
+) -> None:
+    """Complete a request's future, unless its caller has stopped waiting."""
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
@@ -0,0 +1,226 @@
+"""Precomputed WAR leaderboards served without touching pandas at request time."""
+
+import base64
+import json
+import math
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Columns of the aggregated WAR results carried into each leaderboard row
+LEADERBOARD_COLUMNS = [
+    "player_id",
+    "player_name",
+    "detailed_position",
+    "games_played",
+    "war_value",
+    "war_per_game",
+    "war_ci_low",
+    "war_ci_high",
+    "offensive_war",
+    "defensive_war",
+    "teamplay_war",
+    "points",
+    "archetype",
+]
+
+
+class LeaderboardIndex:
+    """Sorted in-memory WAR leaderboards with cursor pagination.
+
+    Rows for each season are stored once, sorted by WAR. Every position gets a
+    precomputed partition of row numbers in the same order, so a page is a slice of a
+    ready-made list and the cursor is simply the offset to resume from. A
+    ``min_games`` threshold gets its own partition, built on first use and kept, so
+    ranks count qualifying players only and later pages still seek directly.
+
+    Attributes:
+        latest_season: The season written most recently, used when none is requested.
+        generated_at: ISO timestamp of the last update.
+    """
+
+    def __init__(
+        self,
+        seasons: Dict[str, List[Dict[str, Any]]],
+        latest_season: Optional[str] = None,
+        generated_at: Optional[str] = None,
+    ) -> None:
+        """Initialize the index from per-season rows already sorted by WAR."""
+        self._seasons = seasons
+        self.latest_season = latest_season
+        self.generated_at = generated_at
+        self._partitions: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        self._qualified: Dict[Tuple[str, Optional[str], int], List[int]] = {}
+        for season, rows in seasons.items():
+            self._partition(season, rows)
+
+    @property
+    def seasons(self) -> List[str]:
+        """Get the seasons available in the index."""
+        return sorted(self._seasons)
+
+    def positions(self, season: str) -> List[str]:
+        """Get the positions with at least one player in a season."""
+        return sorted(position for s, position in self._partitions if s == season and position)
+
+    def update_season(self, season: str, player_war: pd.DataFrame) -> None:
+        """Replace the leaderboard for a season with freshly aggregated WAR results.
+
+        Args:
+            season: The season the results belong to.
+            player_war: Aggregated results as produced by ``HockeyWAR.aggregate_player_war``.
+        """
+        columns = [col for col in LEADERBOARD_COLUMNS if col in player_war.columns]
+        ranked = player_war.sort_values("war_value", ascending=False, kind="stable")[columns]
+
+        rows = []
+        for record in ranked.to_dict("records"):
+            row = {key: _to_json_value(value) for key, value in record.items()}
+            row["player_id"] = str(row["player_id"])
+            rows.append(row)
+
+        self._seasons[season] = rows
+        self._partition(season, rows)
+        self.latest_season = season
+        self.generated_at = datetime.now(timezone.utc).isoformat()
+
+    def page(
+        self,
+        season: Optional[str] = None,
+        position: Optional[str] = None,
+        min_games: int = 0,
+        limit: int = 25,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of a leaderboard.
+
+        Args:
+            season: Season to rank. Defaults to the latest season.
+            position: Restrict to a single position.
+            min_games: Skip players with fewer games played.
+            limit: Maximum number of rows to return.
+            cursor: Cursor returned by the previous page, or None for the first page.
+
+        Returns:
+            The rows of the page, each with its ``rank`` among the players of the
+            season/position with at least ``min_games`` games, and the cursor for the
+            next page (None when the leaderboard is exhausted).
+
+        Raises:
+            KeyError: If the season is not in the index.
+            ValueError: If the cursor is malformed.
+        """
+        season = season or self.latest_season
+        if season not in self._seasons:
+            raise KeyError(f"Season {season} not found in leaderboard")
+
+        rows = self._seasons[season]
+        partition = self._qualifying(season, position, min_games)
+        offset = decode_cursor(cursor) if cursor else 0
+
+        end = min(offset + limit, len(partition))
+        items = [
+            {"rank": rank + 1, **rows[partition[rank]]} for rank in range(offset, end)
+        ]
+
+        next_cursor = encode_cursor(end) if end < len(partition) else None
+        return items, next_cursor
+
+    def save(self, path: str) -> None:
+        """Persist the index as JSON, replacing the file atomically.
+
+        Args:
+            path: Destination file path.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "generated_at": self.generated_at,
+                    "latest_season": self.latest_season,
+                    "seasons": self._seasons,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LeaderboardIndex":
+        """Load an index previously written with :meth:`save`.
+
+        Args:
+            path: Path to the JSON file.
+
+        Returns:
+            The loaded LeaderboardIndex.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["seasons"], data.get("latest_season"), data.get("generated_at"))
+
+    @classmethod
+    def load_or_empty(cls, path: str) -> "LeaderboardIndex":
+        """Load an index if it exists, otherwise start an empty one."""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls({})
+
+    def _qualifying(self, season: str, position: Optional[str], min_games: int) -> List[int]:
+        """Get the partition of a season/position limited to players with ``min_games``."""
+        partition = self._partitions.get((season, position), [])
+        if min_games <= 0:
+            return partition
+
+        key = (season, position, min_games)
+        if key in self._qualified:
+            return self._qualified[key]
+
+        rows = self._seasons[season]
+        qualified = [i for i in partition if (rows[i].get("games_played") or 0) >= min_games]
+        # Thresholds above every player's games are not kept, which bounds the cache
+        if qualified:
+            self._qualified[key] = qualified
+        return qualified
+
+    def _partition(self, season: str, rows: List[Dict[str, Any]]) -> None:
+        """Rebuild the per-position row lists for a season."""
+        for key in [key for key in self._partitions if key[0] == season]:
+            del self._partitions[key]
+        for key in [key for key in self._qualified if key[0] == season]:
+            del self._qualified[key]
+
+        self._partitions[(season, None)] = list(range(len(rows)))
+        for i, row in enumerate(rows):
+            self._partitions.setdefault((season, row["detailed_position"]), []).append(i)
+
+
+def encode_cursor(offset: int) -> str:
+    """Encode a leaderboard offset as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        prefix, offset = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
+def _to_json_value(value: Any) -> Any:
+    """Convert NumPy scalars and NaN into plain JSON-friendly values."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
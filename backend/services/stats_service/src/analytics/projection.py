@@ -0,0 +1,310 @@
+"""2-D player projections for scatter plots, cached with the feature store version."""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+
+from .features import SCALED_PREFIX, FeatureStore
+
+# Subdirectory of each feature store version holding its projections
+PROJECTIONS_DIR = "projections"
+
+# Players fed to IncrementalPCA per batch
+PCA_BATCH_SIZE = 4096
+
+# Projection names become file names, so they are restricted
+_SAFE_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.-]*")
+
+
+def projection_file(name: str, version: str) -> str:
+    """Get the path of a projection relative to the feature store directory.
+
+    Raises:
+        FileNotFoundError: If the name is not a valid projection name.
+    """
+    if not _SAFE_NAME.fullmatch(name) or not _SAFE_NAME.fullmatch(version):
+        raise FileNotFoundError(f"No projection named {name}")
+    return os.path.join(version, PROJECTIONS_DIR, f"{name}.npz")
+
+
+def projection_path(store: FeatureStore, name: str) -> str:
+    """Get the path of a projection saved with a feature store version."""
+    return os.path.join(os.path.dirname(store.directory), projection_file(name, store.version))
+
+
+class PlayerProjection:
+    """2-D coordinates of the players of one feature store version.
+
+    Projections are fitted with ``IncrementalPCA`` over batches of the memory-mapped
+    feature columns, so the full feature matrix is never materialized. Each one is
+    saved in the feature store version it was computed from; a new WAR run gets a
+    new version directory, so a cached projection never outlives its data.
+
+    Attributes:
+        name: Projection name, e.g. ``"clusters"``.
+        version: Feature store version the coordinates were computed from.
+        features: Features that were projected.
+        rows: Feature store row of each player.
+        coords: (players x 2) coordinates.
+        explained_variance: Variance ratio of each axis, or None if the coordinates
+            were not computed by PCA.
+        clusters: Cluster label of each player, if assigned.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        features: Sequence[str],
+        rows: np.ndarray,
+        coords: np.ndarray,
+        player_names: Sequence[str],
+        positions: Sequence[str],
+        war_values: np.ndarray,
+        explained_variance: Optional[np.ndarray] = None,
+        clusters: Optional[np.ndarray] = None,
+    ) -> None:
+        self.name = name
+        self.version = version
+        self.features = list(features)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.player_names = np.asarray(player_names, dtype=str)
+        self.positions = np.asarray(positions, dtype=str)
+        self.war_values = np.asarray(war_values, dtype=np.float64)
+        self.explained_variance = explained_variance
+        self.clusters = clusters
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def points(self, position: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the projected players.
+
+        Args:
+            position: Restrict to a detailed position.
+
+        Returns:
+            Player name, position, WAR, coordinates and cluster (or None) of each player.
+        """
+        selected = np.arange(len(self)) if position is None else np.flatnonzero(self.positions == position)
+        return [
+            {
+                "player_name": str(self.player_names[i]),
+                "detailed_position": str(self.positions[i]),
+                "war_value": float(self.war_values[i]),
+                "x": float(self.coords[i, 0]),
+                "y": float(self.coords[i, 1]),
+                "cluster": None if self.clusters is None else int(self.clusters[i]),
+            }
+            for i in selected
+        ]
+
+    @classmethod
+    def compute(
+        cls,
+        store: FeatureStore,
+        name: str,
+        features: Sequence[str],
+        batch_size: int = PCA_BATCH_SIZE,
+    ) -> "PlayerProjection":
+        """Project the standardized features of the qualified players to 2-D.
+
+        Args:
+            store: Feature store to project.
+            name: Projection name.
+            features: Numeric base columns to project.
+            batch_size: Players per IncrementalPCA batch.
+
+        Returns:
+            The projection (not saved).
+        """
+        rows = np.flatnonzero(store.qualified)
+        columns = [store.column(f"{SCALED_PREFIX}{f}") for f in features]
+        coords, explained = _fit_transform(lambda chunk: np.column_stack([c[chunk] for c in columns]), rows, batch_size)
+        return cls._for_rows(store, name, features, rows, coords, explained)
+
+    @classmethod
+    def from_coords(
+        cls,
+        store: FeatureStore,
+        name: str,
+        coords: np.ndarray,
+        rows: np.ndarray,
+        features: Sequence[str],
+        batch_size: int = PCA_BATCH_SIZE,
+    ) -> "PlayerProjection":
+        """Build a projection from precomputed vectors such as learned embeddings.
+
+        Vectors with more than two dimensions are reduced with IncrementalPCA.
+
+        Args:
+            store: Feature store the vectors' players come from.
+            name: Projection name.
+            coords: (players x dims) vectors.
+            rows: Feature store row of each vector.
+            features: Names of the vector dimensions.
+            batch_size: Players per IncrementalPCA batch.
+
+        Returns:
+            The projection (not saved).
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        explained = None
+        if coords.shape[1] > 2:
+            coords, explained = _fit_transform(lambda chunk: coords[chunk], np.arange(len(coords)), batch_size)
+        return cls._for_rows(store, name, features, np.asarray(rows), coords, explained)
+
+    @classmethod
+    def for_store(
+        cls,
+        store: FeatureStore,
+        name: str,
+        features: Sequence[str],
+        batch_size: int = PCA_BATCH_SIZE,
+    ) -> "PlayerProjection":
+        """Get the cached projection of a feature store version, computing it if needed.
+
+        Args:
+            store: Feature store to project.
+            name: Projection name.
+            features: Numeric base columns to project.
+            batch_size: Players per IncrementalPCA batch.
+
+        Returns:
+            The projection, saved in the store's version directory.
+        """
+        path = projection_path(store, name)
+        if os.path.exists(path):
+            projection = cls.load(path)
+            if projection.features == list(features):
+                return projection
+
+        projection = cls.compute(store, name, features, batch_size)
+        projection.save(path)
+        return projection
+
+    def save(self, path: str) -> None:
+        """Write the projection atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "name": np.array(self.name),
+            "version": np.array(self.version),
+            "features": np.array(self.features, dtype=str),
+            "rows": self.rows,
+            "coords": self.coords,
+            "player_names": self.player_names,
+            "positions": self.positions,
+            "war_values": self.war_values,
+        }
+        if self.explained_variance is not None:
+            arrays["explained_variance"] = np.asarray(self.explained_variance)
+        if self.clusters is not None:
+            arrays["clusters"] = np.asarray(self.clusters, dtype=np.int64)
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PlayerProjection":
+        """Load a projection written by :meth:`save`."""
+        with np.load(path) as data:
+            return cls(
+                name=str(data["name"]),
+                version=str(data["version"]),
+                features=data["features"].tolist(),
+                rows=data["rows"],
+                coords=data["coords"],
+                player_names=data["player_names"],
+                positions=data["positions"],
+                war_values=data["war_values"],
+                explained_variance=data["explained_variance"] if "explained_variance" in data else None,
+                clusters=data["clusters"] if "clusters" in data else None,
+            )
+
+    @classmethod
+    def _for_rows(cls, store, name, features, rows, coords, explained) -> "PlayerProjection":
+        """Attach the player details of the given store rows to their coordinates."""
+        return cls(
+            name=name,
+            version=store.version,
+            features=features,
+            rows=rows,
+            coords=coords,
+            player_names=np.asarray(store.column("player_name"))[rows],
+            positions=np.asarray(store.column("detailed_position"))[rows],
+            war_values=np.asarray(store.column("war_value"))[rows],
+            explained_variance=explained,
+        )
+
+
+def carry_over_projections(previous: FeatureStore, store: FeatureStore) -> List[str]:
+    """Save the projections of a previous feature store version with a new version.
+
+    A projection is copied when the new version has the same players in the same rows
+    and the same values for the projected features, e.g. when only a label column such
+    as ``archetype`` was added. Otherwise it is recomputed from the new version, with
+    the ``archetype`` labels as clusters, if its features are columns of the store;
+    projections of other vectors, such as learned embeddings, are left out.
+
+    Args:
+        previous: Feature store version the projections were saved with.
+        store: New feature store version.
+
+    Returns:
+        Names of the projections saved with the new version.
+    """
+    directory = os.path.join(previous.directory, PROJECTIONS_DIR)
+    if previous.version == store.version or not os.path.isdir(directory):
+        return []
+
+    saved = []
+    for file_name in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(file_name)
+        path = projection_path(store, name)
+        if extension != ".npz" or os.path.exists(path):
+            continue
+
+        projection = PlayerProjection.load(os.path.join(directory, file_name))
+        if _same_inputs(previous, store, projection.features):
+            projection.version = store.version
+        elif all(f in store.columns for f in projection.features):
+            had_clusters = projection.clusters is not None
+            projection = PlayerProjection.compute(store, name, projection.features)
+            if had_clusters and "archetype" in store.columns:
+                projection.clusters = np.asarray(store.column("archetype"))[projection.rows]
+        else:
+            continue
+        projection.save(path)
+        saved.append(name)
+    return saved
+
+
+def _same_inputs(previous: FeatureStore, store: FeatureStore, features: Sequence[str]) -> bool:
+    """Check that two store versions hold the same players and values of the features."""
+    if len(previous) != len(store):
+        return False
+    columns = ["player_id", "player_name", "detailed_position", "war_value"]
+    columns += [f"{SCALED_PREFIX}{f}" for f in features if f in previous.columns]
+    try:
+        return all(np.array_equal(previous.column(c), store.column(c)) for c in columns)
+    except KeyError:
+        return False
+
+
+def _fit_transform(batch, rows: np.ndarray, batch_size: int):
+    """Fit a 2-component IncrementalPCA batch by batch, then project every batch."""
+    if len(rows) < 2:
+        raise ValueError("At least 2 players are needed for a projection")
+    # Equal-sized chunks, so no batch is smaller than the number of components
+    chunks = np.array_split(rows, max(1, len(rows) // batch_size))
+    pca = IncrementalPCA(n_components=2)
+    for chunk in chunks:
+        pca.partial_fit(batch(chunk))
+    coords = np.vstack([pca.transform(batch(chunk)) for chunk in chunks])
+    return coords, pca.explained_variance_ratio_
@@ -0,0 +1,295 @@
+"""Versioned store of trained WAR models and the preprocessing they were trained with."""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .artifacts import ArtifactCache, artifact_path
+
+# Subdirectory of the artifacts directory holding registered models
+REGISTRY_DIR = "registry"
+
+BUNDLE_FILE = "bundle.joblib"
+TORCH_MODEL_FILE = "model.pt"
+LATEST_FILE = "latest.json"
+
+# Model names and versions become directory names, so they are restricted
+_SAFE_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.-]*")
+
+
+class RegisteredModel:
+    """A trained model bundled with everything needed to run it on raw player stats.
+
+    Attributes:
+        name: Registry name of the model.
+        version: Version of the model within its name.
+        kind: ``"sklearn"`` or ``"torch"``.
+        features: Input feature columns, in model order.
+        targets: Predicted values, in output order.
+        scaler: Fitted ``StandardScaler`` applied to the features, if any.
+        positions: Position names by embedding index, for position-aware models.
+        metadata: Free-form training details (metrics, dataset hash, ...).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: str,
+        kind: str,
+        model: Any,
+        features: Sequence[str],
+        targets: Sequence[str],
+        scaler: Any = None,
+        positions: Optional[Sequence[str]] = None,
+        outputs: Optional[Sequence[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.version = version
+        self.kind = kind
+        self.features = list(features)
+        self.targets = list(targets)
+        self.scaler = scaler
+        self.positions = None if positions is None else list(positions)
+        self.metadata = metadata or {}
+        self._model = model
+        # Keys of the dict returned by a torch model, aligned with ``targets``
+        self._outputs = list(outputs) if outputs is not None else self.targets
+        self._position_index = {p: i for i, p in enumerate(self.positions or [])}
+
+    def validate(self, record: Mapping[str, Any]) -> None:
+        """Check that a player record can be scored by this model.
+
+        Args:
+            record: Feature values keyed by feature name, plus ``detailed_position``
+                for position-aware models.
+
+        Raises:
+            ValueError: If a feature or the position is missing or unknown.
+        """
+        missing = [f for f in self.features if record.get(f) is None]
+        if missing:
+            raise ValueError(f"Missing features for model {self.name}: {missing}")
+        if self.positions is not None and record.get("detailed_position") not in self._position_index:
+            raise ValueError(
+                f"Invalid detailed_position: {record.get('detailed_position')}. "
+                f"Must be one of {self.positions}"
+            )
+
+    def predict_records(self, records: Sequence[Mapping[str, Any]]) -> List[Dict[str, float]]:
+        """Predict the targets for a batch of player records in a single model call.
+
+        Args:
+            records: Records accepted by :meth:`validate`.
+
+        Returns:
+            Target -> predicted value for each record, in input order.
+        """
+        if not records:
+            return []
+        X = np.array([[float(r[f]) for f in self.features] for r in records], dtype=np.float64)
+        if self.scaler is not None:
+            X = np.asarray(self.scaler.transform(self._inputs_for(self.scaler, X)))
+
+        if self.kind == "torch":
+            predictions = self._predict_torch(X, [r["detailed_position"] for r in records])
+        else:
+            predictions = np.asarray(self._model.predict(self._inputs_for(self._model, X)))
+            predictions = predictions.reshape(len(records), -1)
+
+        return [dict(zip(self.targets, row.tolist())) for row in predictions]
+
+    def _inputs_for(self, estimator: Any, X: np.ndarray) -> Any:
+        """Pass column names only to estimators that were fitted with them."""
+        if hasattr(estimator, "feature_names_in_"):
+            return pd.DataFrame(X, columns=self.features)
+        return X
+
+    def _predict_torch(self, X: np.ndarray, positions: Sequence[str]) -> np.ndarray:
+        import torch
+
+        position_idx = [self._position_index[p] for p in positions]
+        with torch.no_grad():
+            outputs = self._model(
+                torch.as_tensor(X, dtype=torch.float32),
+                torch.as_tensor(position_idx, dtype=torch.long),
+            )
+        return np.hstack([outputs[key].reshape(len(X), -1).numpy() for key in self._outputs])
+
+
+class ModelRegistry:
+    """Stores every trained model version on disk and tracks the latest one per name.
+
+    Each version is a directory holding a joblib bundle with the model and its
+    preprocessing. Torch models are saved as TorchScript next to the bundle, so
+    serving them does not need the training code. ``latest.json`` is replaced
+    atomically once a version is completely written, so readers never see a
+    partial model.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        """Initialize the registry.
+
+        Args:
+            root: Registry directory. Defaults to ``registry`` in the WAR artifacts directory.
+        """
+        self.root = root or artifact_path(REGISTRY_DIR)
+        self._cache = ArtifactCache(self.root)
+
+    def register(
+        self,
+        name: str,
+        model: Any,
+        features: Sequence[str],
+        targets: Sequence[str] = ("war_value",),
+        scaler: Any = None,
+        positions: Optional[Sequence[str]] = None,
+        outputs: Optional[Sequence[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Save a trained model as the new latest version of ``name``.
+
+        Args:
+            name: Registry name, e.g. ``"war_multitask"``.
+            model: A fitted sklearn estimator or a torch ``nn.Module``.
+            features: Input feature columns, in model order.
+            targets: Predicted values, in output order.
+            scaler: Fitted scaler to apply to the features before predicting.
+            positions: Position names by embedding index, for position-aware models.
+            outputs: Keys of the dict returned by a torch model, aligned with ``targets``.
+            metadata: Free-form training details to keep with the model.
+
+        Returns:
+            The new version.
+        """
+        if not _SAFE_NAME.fullmatch(name):
+            raise ValueError(f"Invalid model name: {name}")
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        directory = os.path.join(self.root, name, version)
+        os.makedirs(directory, exist_ok=True)
+
+        kind = "torch" if hasattr(model, "state_dict") else "sklearn"
+        if kind == "torch":
+            import torch
+
+            torch.jit.script(model.eval()).save(os.path.join(directory, TORCH_MODEL_FILE))
+
+        joblib.dump(
+            {
+                "kind": kind,
+                "model": model if kind == "sklearn" else None,
+                "features": list(features),
+                "targets": list(targets),
+                "scaler": scaler,
+                "positions": None if positions is None else list(positions),
+                "outputs": None if outputs is None else list(outputs),
+                "metadata": metadata or {},
+            },
+            os.path.join(directory, BUNDLE_FILE),
+        )
+
+        latest_path = os.path.join(self.root, name, LATEST_FILE)
+        tmp_path = f"{latest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": version, "registered_at": datetime.now(timezone.utc).isoformat()}, f)
+        os.replace(tmp_path, latest_path)
+        return version
+
+    def latest_version(self, name: str) -> str:
+        """Get the latest version of a model.
+
+        Raises:
+            FileNotFoundError: If no version of the model has been registered.
+        """
+        _check_name(name)
+        with open(os.path.join(self.root, name, LATEST_FILE)) as f:
+            return json.load(f)["version"]
+
+    def versions(self, name: str) -> List[str]:
+        """Get every registered version of a model, oldest first."""
+        directory = os.path.join(self.root, name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            entry for entry in os.listdir(directory)
+            if os.path.exists(os.path.join(directory, entry, BUNDLE_FILE))
+        )
+
+    def names(self) -> List[str]:
+        """Get the names of all models with a latest version."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, entry, LATEST_FILE))
+        )
+
+    def get(self, name: str, version: Optional[str] = None) -> RegisteredModel:
+        """Get a model, loading it only if it is new or a newer version was registered.
+
+        Args:
+            name: Registry name of the model.
+            version: Version to get. Defaults to the latest.
+
+        Returns:
+            The loaded model, shared between callers.
+
+        Raises:
+            FileNotFoundError: If the model or version does not exist.
+        """
+        _check_name(name)
+        if version is None:
+            return self._cache.get(os.path.join(name, LATEST_FILE), lambda _: self.load(name))
+        return self._cache.get(
+            os.path.join(name, version, BUNDLE_FILE), lambda _: self.load(name, version)
+        )
+
+    def load(self, name: str, version: Optional[str] = None) -> RegisteredModel:
+        """Load a registered model.
+
+        Args:
+            name: Registry name of the model.
+            version: Version to load. Defaults to the latest.
+
+        Returns:
+            The loaded model.
+
+        Raises:
+            FileNotFoundError: If the model or version does not exist.
+        """
+        version = version or self.latest_version(name)
+        _check_name(version)
+        directory = os.path.join(self.root, name, version)
+        bundle = joblib.load(os.path.join(directory, BUNDLE_FILE))
+
+        model = bundle["model"]
+        if bundle["kind"] == "torch":
+            import torch
+
+            model = torch.jit.load(os.path.join(directory, TORCH_MODEL_FILE))
+            model.eval()
+
+        return RegisteredModel(
+            name=name,
+            version=version,
+            kind=bundle["kind"],
+            model=model,
+            features=bundle["features"],
+            targets=bundle["targets"],
+            scaler=bundle["scaler"],
+            positions=bundle["positions"],
+            outputs=bundle["outputs"],
+            metadata=bundle["metadata"],
+        )
+
+
+def _check_name(name: str) -> None:
+    """Reject names that could escape the registry directory."""
+    if not _SAFE_NAME.fullmatch(name):
+        raise FileNotFoundError(f"No registered model or version named {name}")
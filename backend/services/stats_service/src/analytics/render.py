@@ -0,0 +1,169 @@
+"""Background chart rendering for the WAR and ML analysis jobs."""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .artifacts import ARTIFACTS_DIR
+
+# Manifest of the data hash each chart was last rendered from
+MANIFEST_FILE = "charts_manifest.json"
+
+
+def charts_enabled() -> bool:
+    """Check whether chart rendering is enabled (``WAR_RENDER_CHARTS``, default on)."""
+    return os.getenv("WAR_RENDER_CHARTS", "1").lower() not in ("0", "false", "no", "off")
+
+
+class RenderQueue:
+    """Renders charts in worker processes so the analysis never waits on plotting.
+
+    Each chart is a module-level function ``render(data, path, **options)`` that draws
+    ``data`` and saves it to ``path``. Workers use the non-interactive Agg backend. A
+    chart whose output exists and whose data, options and function are unchanged since
+    it was last rendered is skipped. With rendering disabled every submission is a no-op.
+
+    Use as a context manager, or call :meth:`close`, to wait for the queued charts.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        n_jobs: Optional[int] = None,
+        cache_dir: Optional[str] = ARTIFACTS_DIR,
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            enabled: Render charts at all. Defaults to the ``WAR_RENDER_CHARTS`` setting.
+            n_jobs: Worker processes. ``None`` uses every core, 1 renders in-process.
+            cache_dir: Directory of the render manifest. ``None`` always re-renders.
+        """
+        self.enabled = charts_enabled() if enabled is None else enabled
+        self.n_jobs = n_jobs
+        self._manifest_path = None if cache_dir is None else os.path.join(cache_dir, MANIFEST_FILE)
+        self._manifest: Dict[str, str] = self._load_manifest()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: List[Tuple[str, str, Future]] = []
+        self.skipped = 0
+
+    def submit(self, render: Callable[..., None], data: Any, path: str, **options: Any) -> Optional[Future]:
+        """Queue a chart for rendering.
+
+        Args:
+            render: Module-level function that draws ``data`` and saves it to ``path``.
+            data: Everything the chart needs. Must be picklable.
+            path: Output image path.
+            **options: Extra keyword arguments for ``render``.
+
+        Returns:
+            The pending render, or None if rendering is disabled or the chart is current.
+        """
+        if not self.enabled:
+            return None
+
+        key = os.path.abspath(path)
+        digest = _chart_hash(render, data, options)
+        if self._manifest.get(key) == digest and os.path.exists(path):
+            self.skipped += 1
+            return None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.n_jobs == 1:
+            future: Future = Future()
+            try:
+                _render_chart(render, data, path, options)
+                future.set_result(path)
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker)
+            future = self._executor.submit(_render_chart, render, data, path, options)
+
+        self._pending.append((key, digest, future))
+        return future
+
+    def wait(self) -> Dict[str, str]:
+        """Wait for every queued chart and record the rendered ones in the manifest.
+
+        Returns:
+            Output path -> error message for each chart that failed to render.
+        """
+        errors = {}
+        for key, digest, future in self._pending:
+            try:
+                future.result()
+                self._manifest[key] = digest
+            except Exception as e:
+                errors[key] = str(e)
+        self._pending = []
+        self._save_manifest()
+        return errors
+
+    def close(self) -> Dict[str, str]:
+        """Wait for every queued chart and shut the workers down.
+
+        Returns:
+            Output path -> error message for each chart that failed to render.
+        """
+        errors = self.wait()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        return errors
+
+    def __enter__(self) -> "RenderQueue":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _load_manifest(self) -> Dict[str, str]:
+        if self._manifest_path is None or not os.path.exists(self._manifest_path):
+            return {}
+        try:
+            with open(self._manifest_path) as f:
+                return json.load(f)
+        except ValueError:
+            return {}
+
+    def _save_manifest(self) -> None:
+        if self._manifest_path is None:
+            return
+        os.makedirs(os.path.dirname(self._manifest_path) or ".", exist_ok=True)
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+
+
+def _init_worker() -> None:
+    """Select the Agg backend before any chart code imports pyplot."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _render_chart(render: Callable[..., None], data: Any, path: str, options: Dict[str, Any]) -> str:
+    """Render one chart and release its figures."""
+    import matplotlib.pyplot as plt
+
+    try:
+        render(data, path, **options)
+    finally:
+        plt.close("all")
+    return path
+
+
+def _chart_hash(render: Callable[..., None], data: Any, options: Dict[str, Any]) -> str:
+    """Hash a chart's function, data and options."""
+    digest = hashlib.sha1(f"{render.__module__}.{render.__qualname__}".encode())
+    digest.update(pickle.dumps((data, sorted(options.items())), protocol=4))
+    return digest.hexdigest()[:16]
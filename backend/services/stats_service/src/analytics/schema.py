@@ -0,0 +1,137 @@
+"""Explicit dtype schema for the per-game player stats used by the WAR pipeline."""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Identifiers exceed the int32 range (EA player and match IDs are 13-14 digits)
+ID_COLUMNS = ["match_id", "club_id", "player_id", "opponent_club_id"]
+
+# Low-cardinality labels repeated on every row
+CATEGORICAL_COLUMNS = [
+    "player_name",
+    "position",
+    "detailed_position",
+    "position_abbreviation",
+    "position_category",
+    "client_platform",
+    "game_result",
+    "home_away",
+]
+
+# Per-game counters that fit comfortably in a signed byte
+INT8_COLUMNS = [
+    "player_level", "pos_sorted", "is_guest", "player_dnf", "pnhl_online_game_type",
+    "team_side", "opponent_score", "score", "toi",
+    "skassists", "skbs", "skdeflections", "skfol", "skfow", "skgiveaways", "skgoals",
+    "skgwg", "skhits", "skinterceptions", "skpassattempts", "skpasses",
+    "skpenaltiesdrawn", "skpim", "skpkclearzone", "skplusmin", "skppg",
+    "sksaucerpasses", "skshg", "skshotattempts", "skshots", "sktakeaways",
+    "glbrksaves", "glbrkshots", "gldsaves", "glga", "glpensaves", "glpenshots",
+    "glpkclearzone", "glpokechecks", "glsaves", "glshots", "glsoperiods",
+    "points", "faceoffs_total", "shots_missed", "passes_missed",
+    "major_penalties", "minor_penalties", "total_penalties",
+    "penalty_differential", "net_defensive_contribution",
+]
+
+# Counters with a wider range (seconds, possession time, team IDs, display levels)
+INT16_COLUMNS = [
+    "player_level_display", "team_id", "opponent_team_id", "toi_seconds", "skpossession",
+]
+
+# Everything else numeric is a rate or rating and is stored as float32
+PLAYER_STATS_SCHEMA: Dict[str, str] = {
+    **{col: "int64" for col in ID_COLUMNS},
+    **{col: "category" for col in CATEGORICAL_COLUMNS},
+    **{col: "int8" for col in INT8_COLUMNS},
+    **{col: "int16" for col in INT16_COLUMNS},
+}
+
+
+def load_player_stats(csv_path: str, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Load a per-game player stats CSV with compact dtypes.
+
+    Categorical and float columns are typed while parsing. Integer counters are parsed
+    with the default dtype and then narrowed, so an out-of-range count keeps a wider
+    integer type instead of failing the load, and a counter with missing values
+    becomes a nullable integer type instead of having them filled in.
+
+    Args:
+        csv_path: Path to the player stats CSV.
+        schema: Column -> dtype overrides. Defaults to ``PLAYER_STATS_SCHEMA``.
+
+    Returns:
+        The loaded DataFrame.
+    """
+    schema = PLAYER_STATS_SCHEMA if schema is None else schema
+    header = pd.read_csv(csv_path, nrows=0).columns
+
+    parse_dtypes = {
+        col: dtype for col, dtype in schema.items()
+        if col in header and dtype == "category"
+    }
+    df = pd.read_csv(csv_path, dtype=parse_dtypes)
+    return apply_schema(df, schema)
+
+
+def apply_schema(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Narrow the dtypes of an already loaded DataFrame in place.
+
+    Args:
+        df: DataFrame to convert.
+        schema: Column -> dtype overrides. Defaults to ``PLAYER_STATS_SCHEMA``.
+
+    Returns:
+        The same DataFrame, for chaining.
+    """
+    schema = PLAYER_STATS_SCHEMA if schema is None else schema
+
+    for col in df.columns:
+        dtype = schema.get(col)
+        if dtype == "category":
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        elif dtype is not None and dtype.startswith("int"):
+            df[col] = _narrow_int(df[col], np.dtype(dtype))
+        elif pd.api.types.is_float_dtype(df[col]) or pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+
+    return df
+
+
+def _narrow_int(series: pd.Series, dtype: np.dtype) -> pd.Series:
+    """Cast a counter column to ``dtype``, widening if its values do not fit.
+
+    A counter with missing values becomes the matching nullable integer type (e.g.
+    ``Int8``), so missing stays missing. A float column holding fractional values is
+    kept as float32 rather than truncated.
+    """
+    present = series.dropna()
+    if pd.api.types.is_float_dtype(present) and not (present % 1 == 0).all():
+        return series.astype(np.float32)
+    info = np.iinfo(dtype)
+    if len(present) and (present.min() < info.min or present.max() > info.max):
+        dtype = pd.to_numeric(present, downcast="integer").dtype
+    if len(present) < len(series):
+        return series.astype(dtype.name.capitalize())
+    return series.astype(dtype)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Summarize the memory used by each column of a DataFrame.
+
+    Args:
+        df: DataFrame to inspect.
+
+    Returns:
+        One row per column with its dtype and size in bytes, largest first. The
+        total across columns is stored in ``attrs["total_bytes"]``.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "dtype": df.dtypes.astype(str),
+        "bytes": usage,
+    }).sort_values("bytes", ascending=False)
+    report.attrs["total_bytes"] = int(usage.sum())
+    return report
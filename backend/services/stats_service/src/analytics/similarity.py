@@ -0,0 +1,324 @@
+"""Top-K player similarity search over feature vectors or learned embeddings."""
+
+import glob
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Distance measures an index can rank players by
+METRICS = ("cosine", "euclidean")
+
+
+class SimilarityIndex:
+    """Nearest player search without materializing an N x N matrix.
+
+    Player vectors are stored in one contiguous float32 array, so the score of every
+    player is a single matrix-vector product. With the ``cosine`` metric the vectors
+    are L2-normalized and the product is the cosine similarity. With ``euclidean``
+    they are kept as is and the squared distance is recovered from the product and
+    each row's squared norm, computed once on load. The top K
+    are then selected with ``argpartition`` in linear time. The vectors are saved as a
+    raw ``.npy`` file, named by the metadata, and memory-mapped when loaded, so
+    opening the index is cheap even for every player who has ever played in the
+    league. Rows are partitioned by position up front, so a position-filtered query
+    only scores that position's rows.
+
+    Attributes:
+        player_names: Display names, one per row.
+        positions: Detailed position of each row.
+        war_values: Season WAR of each row, returned alongside matches.
+        features: Names of the features the vectors were built from.
+        source: What the vectors are, e.g. ``"features"`` or ``"embedding"``.
+        metric: ``"cosine"`` or ``"euclidean"``.
+        scaler_mean: Per-feature mean used to standardize the vectors.
+        scaler_scale: Per-feature scale used to standardize the vectors.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        player_names: Sequence[str],
+        positions: Sequence[str],
+        war_values: Sequence[float],
+        features: Sequence[str],
+        scaler_mean: Optional[Sequence[float]] = None,
+        scaler_scale: Optional[Sequence[float]] = None,
+        source: str = "features",
+        metric: str = "cosine",
+    ) -> None:
+        """Initialize the index from vectors already prepared for ``metric``.
+
+        Use :meth:`from_features` or :meth:`load` rather than calling this directly.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric}, expected one of {METRICS}")
+        self._vectors = vectors
+        self.metric = metric
+        self._sq_norms = (
+            np.einsum("ij,ij->i", vectors, vectors) if metric == "euclidean" else None
+        )
+        self.player_names = list(player_names)
+        self.positions = list(positions)
+        self.war_values = np.asarray(war_values, dtype=np.float64)
+        self.features = list(features)
+        self.source = source
+        self.scaler_mean = None if scaler_mean is None else np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = None if scaler_scale is None else np.asarray(scaler_scale, dtype=np.float64)
+
+        # The first row for a name wins, matching the lookup the DataFrame version used
+        self._row_of: Dict[str, int] = {}
+        for row, name in enumerate(self.player_names):
+            self._row_of.setdefault(name, row)
+
+        position_array = np.asarray(self.positions, dtype=object)
+        self._partitions: Dict[str, np.ndarray] = {
+            position: np.flatnonzero(position_array == position)
+            for position in dict.fromkeys(self.positions)
+        }
+
+    @classmethod
+    def from_features(
+        cls,
+        scaled: np.ndarray,
+        player_names: Sequence[str],
+        positions: Sequence[str],
+        war_values: Sequence[float],
+        features: Sequence[str],
+        scaler_mean: Optional[Sequence[float]] = None,
+        scaler_scale: Optional[Sequence[float]] = None,
+        source: str = "features",
+        metric: str = "cosine",
+    ) -> "SimilarityIndex":
+        """Build the index from standardized feature rows.
+
+        Args:
+            scaled: Standardized features, one row per player.
+            player_names: Display names aligned with ``scaled``.
+            positions: Detailed positions aligned with ``scaled``.
+            war_values: Season WAR aligned with ``scaled``.
+            features: Names of the feature columns.
+            scaler_mean: Mean used to standardize, kept so new players can be embedded.
+            scaler_scale: Scale used to standardize, kept so new players can be embedded.
+            source: What the vectors are, e.g. ``"features"`` or ``"embedding"``.
+            metric: ``"cosine"`` to compare directions, ``"euclidean"`` to compare
+                positions, as learned embeddings are trained to be.
+
+        Returns:
+            The populated SimilarityIndex.
+        """
+        vectors = np.array(scaled, dtype=np.float32, order="C")
+        if metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return cls(
+            vectors, player_names, positions, war_values, features, scaler_mean, scaler_scale,
+            source, metric,
+        )
+
+    def __contains__(self, player_name: str) -> bool:
+        return player_name in self._row_of
+
+    def __len__(self) -> int:
+        return len(self.player_names)
+
+    @property
+    def position_names(self) -> List[str]:
+        """Get the positions with at least one player in the index."""
+        return sorted(self._partitions)
+
+    def row_of(self, player_name: str) -> int:
+        """Get the row of a player by name.
+
+        Raises:
+            ValueError: If the player is not in the index.
+        """
+        try:
+            return self._row_of[player_name]
+        except KeyError:
+            raise ValueError(f"Player {player_name} not found in data") from None
+
+    def query(
+        self,
+        player_name: str,
+        k: int = 5,
+        same_position: bool = False,
+        position: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Find the players most similar to a player.
+
+        Args:
+            player_name: Name of the player to find similar players for.
+            k: Number of similar players to return.
+            same_position: Restrict results to the player's position.
+            position: Restrict results to this position. Takes precedence over
+                ``same_position``.
+
+        Returns:
+            Matches sorted from most to least similar, excluding the player. The
+            ``similarity`` of a match is the cosine similarity, or ``1 / (1 + d)``
+            for a Euclidean distance ``d``.
+
+        Raises:
+            ValueError: If the player is not in the index.
+        """
+        row = self.row_of(player_name)
+        query = np.asarray(self._vectors[row])
+        if position is None and same_position:
+            position = self.positions[row]
+
+        if position is None:
+            scores = self._score(self._vectors, query)
+            scores[row] = -np.inf
+            return self._top_k(scores, k)
+
+        rows = self._partitions.get(position, np.empty(0, dtype=np.int64))
+        scores = self._score(self._vectors[rows], query, rows)
+        scores[rows == row] = -np.inf
+        return self._top_k(scores, k, rows)
+
+    def save(self, path: str) -> None:
+        """Persist the index as ``<path>.<hash>.npy`` vectors and ``<path>.json`` metadata.
+
+        The vectors are named after a hash of their contents and the metadata names the
+        file it belongs to. The metadata is replaced last and atomically, so a reader
+        always sees a complete index: either the old metadata with the old vectors or
+        the new metadata with the new ones. The vectors of the previous index are kept
+        for readers still opening it; older ones are removed.
+
+        Args:
+            path: Destination path without extension, or the path of the ``.json`` metadata.
+        """
+        path = _base_path(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        vectors = np.ascontiguousarray(self._vectors, dtype=np.float32)
+        digest = hashlib.sha1(vectors.tobytes()).hexdigest()[:12]
+        vectors_file = f"{os.path.basename(path)}.{digest}.npy"
+        vectors_path = os.path.join(os.path.dirname(path), vectors_file)
+        if not os.path.exists(vectors_path):
+            tmp_vectors = f"{vectors_path}.tmp"
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, vectors)
+            os.replace(tmp_vectors, vectors_path)
+
+        previous = _vectors_path(path)
+        tmp_meta = f"{path}.json.tmp"
+        with open(tmp_meta, "w") as f:
+            json.dump(
+                {
+                    "vectors": vectors_file,
+                    "player_names": self.player_names,
+                    "positions": self.positions,
+                    "war_values": self.war_values.tolist(),
+                    "features": self.features,
+                    "source": self.source,
+                    "metric": self.metric,
+                    "scaler_mean": None if self.scaler_mean is None else self.scaler_mean.tolist(),
+                    "scaler_scale": None if self.scaler_scale is None else self.scaler_scale.tolist(),
+                },
+                f,
+            )
+        os.replace(tmp_meta, f"{path}.json")
+
+        keep = {vectors_path, previous}
+        for stale in glob.glob(f"{glob.escape(path)}.*.npy"):
+            if stale not in keep:
+                os.remove(stale)
+
+    @classmethod
+    def load(cls, path: str) -> "SimilarityIndex":
+        """Load an index written with :meth:`save`, memory-mapping the vectors.
+
+        Args:
+            path: Path without extension, or the path of the ``.json`` metadata.
+
+        Returns:
+            The loaded SimilarityIndex.
+        """
+        base = _base_path(path)
+        with open(f"{base}.json") as f:
+            meta = json.load(f)
+        vectors = np.load(_vectors_path(base, meta), mmap_mode="r")
+        return cls(
+            vectors,
+            meta["player_names"],
+            meta["positions"],
+            meta["war_values"],
+            meta["features"],
+            meta.get("scaler_mean"),
+            meta.get("scaler_scale"),
+            meta.get("source", "features"),
+            meta.get("metric", "cosine"),
+        )
+
+    def _score(
+        self, vectors: np.ndarray, query: np.ndarray, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Score rows against a query vector, higher meaning more similar.
+
+        Euclidean scores are negated squared distances. ``rows`` selects the squared
+        norms matching ``vectors`` when only a partition is scored.
+        """
+        scores = vectors @ query
+        if self.metric == "euclidean":
+            sq_norms = self._sq_norms if rows is None else self._sq_norms[rows]
+            scores = np.minimum(2 * scores - sq_norms - query @ query, 0)
+        return scores
+
+    def _top_k(
+        self, scores: np.ndarray, k: int, rows: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """Select the ``k`` best scoring rows in linear time.
+
+        ``rows`` maps positions in ``scores`` back to index rows when only a partition
+        was scored.
+        """
+        valid = int(np.isfinite(scores).sum())
+        k = min(k, valid)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        matches = []
+        for i in top:
+            row = int(i if rows is None else rows[i])
+            matches.append({
+                "index": row,
+                "player_name": self.player_names[row],
+                "detailed_position": self.positions[row],
+                "war_value": float(self.war_values[row]),
+                "similarity": self._similarity(float(scores[i])),
+            })
+        return matches
+
+    def _similarity(self, score: float) -> float:
+        """Convert a score from :meth:`_score` into the similarity reported to callers."""
+        if self.metric == "euclidean":
+            return 1.0 / (1.0 + float(np.sqrt(-score)))
+        return score
+
+
+def _base_path(path: str) -> str:
+    """Strip the ``.json`` suffix from an index path."""
+    return path[:-len(".json")] if path.endswith(".json") else path
+
+
+def _vectors_path(base: str, meta: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Get the vectors file named by an index's metadata, or None if there is none.
+
+    The metadata is read from ``<base>.json`` unless given. Indexes saved before the
+    vectors were named by hash point to ``<base>.npy``.
+    """
+    if meta is None:
+        try:
+            with open(f"{base}.json") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+    vectors_file = meta.get("vectors")
+    if vectors_file is None:
+        return f"{base}.npy"
+    return os.path.join(os.path.dirname(base), vectors_file)
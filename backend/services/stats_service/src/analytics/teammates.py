@@ -0,0 +1,219 @@
+"""Teammate co-occurrence index for WAR synergy analysis."""
+
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class TeammateIndex:
+    """Sparse player x player co-occurrence and shared-WAR matrix.
+
+    Rows are stored in CSR form: for player ``i`` the teammates live in
+    ``indices[indptr[i]:indptr[i + 1]]`` with the number of games played together in
+    ``games`` and the summed WAR the teammate produced in those games in ``war_sum``.
+    A single row slice is therefore all that is needed to answer a query, which keeps
+    lookups at O(degree) regardless of how many players the league has.
+
+    Attributes:
+        player_ids: Player identifiers, one per matrix row.
+        player_names: Display names aligned with ``player_ids``.
+    """
+
+    def __init__(
+        self,
+        player_ids: np.ndarray,
+        player_names: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        games: np.ndarray,
+        war_sum: np.ndarray,
+    ) -> None:
+        """Initialize a TeammateIndex from prebuilt CSR arrays.
+
+        Use :meth:`from_games` or :meth:`load` rather than calling this directly.
+        """
+        self.player_ids = player_ids
+        self.player_names = player_names
+        self._indptr = indptr
+        self._indices = indices
+        self._games = games
+        self._war_sum = war_sum
+        self._row_of = {player_id: row for row, player_id in enumerate(player_ids)}
+
+    @classmethod
+    def from_games(cls, df: pd.DataFrame) -> "TeammateIndex":
+        """Build the index from per-game player rows.
+
+        Players are matched into rosters with a hash join on ``(match_id, club_id)``,
+        so every pair of players who dressed for the same club in the same game is
+        counted once.
+
+        Args:
+            df: Per-game rows with ``match_id``, ``club_id``, ``player_id``,
+                ``player_name`` and ``war_value`` columns.
+
+        Returns:
+            The populated TeammateIndex.
+        """
+        player_ids = df["player_id"].astype(str).to_numpy()
+        names = dict(zip(player_ids, df["player_name"].astype(str).to_numpy()))
+        ordered_ids = np.array(sorted(names), dtype=object)
+        row_of = {player_id: row for row, player_id in enumerate(ordered_ids)}
+
+        # Hash join: bucket every player-game by the roster it belongs to. Keying the
+        # roster by player collapses matches that were fetched once per club.
+        rosters: Dict[Tuple[str, str], Dict[int, float]] = defaultdict(dict)
+        for match_id, club_id, player_id, war in zip(
+            df["match_id"].astype(str).to_numpy(),
+            df["club_id"].astype(str).to_numpy(),
+            player_ids,
+            df["war_value"].to_numpy(dtype=float),
+        ):
+            rosters[(match_id, club_id)][row_of[player_id]] = war
+
+        # Accumulate pairwise games together and the teammate's WAR in those games
+        pairs: List[Dict[int, List[float]]] = [{} for _ in ordered_ids]
+        for roster in rosters.values():
+            for row in roster:
+                neighbours = pairs[row]
+                for other, other_war in roster.items():
+                    if other == row:
+                        continue
+                    cell = neighbours.setdefault(other, [0, 0.0])
+                    cell[0] += 1
+                    cell[1] += other_war
+
+        indptr = np.zeros(len(ordered_ids) + 1, dtype=np.int64)
+        indices, games, war_sum = [], [], []
+        for row, neighbours in enumerate(pairs):
+            for other in sorted(neighbours):
+                indices.append(other)
+                games.append(neighbours[other][0])
+                war_sum.append(neighbours[other][1])
+            indptr[row + 1] = len(indices)
+
+        return cls(
+            player_ids=ordered_ids,
+            player_names=np.array([names[p] for p in ordered_ids], dtype=object),
+            indptr=indptr,
+            indices=np.array(indices, dtype=np.int32),
+            games=np.array(games, dtype=np.int32),
+            war_sum=np.array(war_sum, dtype=np.float64),
+        )
+
+    def __contains__(self, player_id: Any) -> bool:
+        return str(player_id) in self._row_of
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+    def degree(self, player_id: Any) -> int:
+        """Get the number of distinct teammates a player has shared a roster with."""
+        row = self._row(player_id)
+        return int(self._indptr[row + 1] - self._indptr[row])
+
+    def games_together(self, player_id: Any, teammate_id: Any) -> int:
+        """Get how many games two players have played on the same roster."""
+        row = self._row(player_id)
+        other = self._row(teammate_id)
+        start, end = self._indptr[row], self._indptr[row + 1]
+        pos = start + np.searchsorted(self._indices[start:end], other)
+        if pos < end and self._indices[pos] == other:
+            return int(self._games[pos])
+        return 0
+
+    def top_synergies(
+        self, player_id: Any, k: int = 5, min_games: int = 3, largest: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get the teammates a player has produced the best (or worst) results with.
+
+        Teammates are ranked by their average WAR in the games shared with the player.
+
+        Args:
+            player_id: The player to look up.
+            k: Number of teammates to return.
+            min_games: Minimum games together for a teammate to be considered.
+            largest: Return the highest averages if True, the lowest if False.
+
+        Returns:
+            Teammate records sorted from best to worst (or worst to best when
+            ``largest`` is False).
+
+        Raises:
+            KeyError: If the player is not in the index.
+        """
+        row = self._row(player_id)
+        start, end = self._indptr[row], self._indptr[row + 1]
+        games = self._games[start:end]
+        keep = np.flatnonzero(games >= min_games)
+        if len(keep) == 0 or k <= 0:
+            return []
+
+        avg_war = self._war_sum[start:end][keep] / games[keep]
+        order = avg_war if not largest else -avg_war
+        if len(keep) > k:
+            top = np.argpartition(order, k - 1)[:k]
+            top = top[np.argsort(order[top], kind="stable")]
+        else:
+            top = np.argsort(order, kind="stable")
+
+        teammates = self._indices[start:end][keep]
+        return [
+            {
+                "teammate_id": self.player_ids[teammates[i]],
+                "teammate_name": self.player_names[teammates[i]],
+                "games_together": int(games[keep[i]]),
+                "teammate_avg_war": float(avg_war[i]),
+            }
+            for i in top
+        ]
+
+    def save(self, path: str) -> None:
+        """Persist the index to a ``.npz`` file.
+
+        Args:
+            path: Destination file path.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Write to a temporary file first so readers never see a partial index
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                player_ids=self.player_ids.astype(str),
+                player_names=self.player_names.astype(str),
+                indptr=self._indptr,
+                indices=self._indices,
+                games=self._games,
+                war_sum=self._war_sum,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TeammateIndex":
+        """Load an index previously written with :meth:`save`.
+
+        Args:
+            path: Path to the ``.npz`` file.
+
+        Returns:
+            The loaded TeammateIndex.
+        """
+        with np.load(path) as data:
+            return cls(
+                player_ids=data["player_ids"].astype(object),
+                player_names=data["player_names"].astype(object),
+                indptr=data["indptr"],
+                indices=data["indices"],
+                games=data["games"],
+                war_sum=data["war_sum"],
+            )
+
+    def _row(self, player_id: Any) -> int:
+        try:
+            return self._row_of[str(player_id)]
+        except KeyError:
+            raise KeyError(f"Player {player_id} not found in teammate index") from None
@@ -0,0 +1,250 @@
+"""Per-game WAR history with constant-time rolling window queries."""
+
+import os
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Per-game WAR components stored for every player-game, in column order
+WAR_COMPONENTS = ["war_value", "offensive_war", "defensive_war", "teamplay_war"]
+
+# Rolling windows precomputed for form charts
+ROLLING_WINDOWS = (5, 10, 20)
+
+
+class WARTimeSeries:
+    """Compact per-player time series of per-game WAR components.
+
+    All player-games live in one contiguous float32 matrix, grouped by player and
+    ordered by game. Player ``i`` owns rows ``indptr[i]:indptr[i + 1]``. A float64 prefix
+    sum over the whole matrix turns the total over any run of a player's games into a
+    difference of two rows, so form and trend queries cost O(1) for any window.
+
+    Attributes:
+        player_ids: Player identifiers, one per series.
+    """
+
+    def __init__(
+        self,
+        player_ids: np.ndarray,
+        indptr: np.ndarray,
+        match_ids: np.ndarray,
+        values: np.ndarray,
+        rolling: Dict[int, np.ndarray],
+    ) -> None:
+        """Initialize the store from prebuilt arrays.
+
+        Use :meth:`from_games` or :meth:`load` rather than calling this directly.
+        """
+        self.player_ids = player_ids
+        self._indptr = indptr
+        self._match_ids = match_ids
+        self._values = values
+        self._rolling = rolling
+        self._prefix = np.zeros((len(values) + 1, values.shape[1]), dtype=np.float64)
+        np.cumsum(values, axis=0, dtype=np.float64, out=self._prefix[1:])
+        self._row_of = {player_id: row for row, player_id in enumerate(player_ids)}
+
+    @classmethod
+    def from_games(
+        cls, df: pd.DataFrame, windows: Sequence[int] = ROLLING_WINDOWS
+    ) -> "WARTimeSeries":
+        """Build the store from per-game WAR rows.
+
+        Games are ordered by ``match_id``, which EA assigns in increasing order. A game
+        fetched once per club is only stored once.
+
+        Args:
+            df: Per-game rows with ``player_id``, ``match_id`` and the WAR components.
+            windows: Rolling window lengths to precompute.
+
+        Returns:
+            The populated WARTimeSeries.
+        """
+        games = pd.DataFrame({
+            "player_id": df["player_id"].astype(str).to_numpy(),
+            "match_id": df["match_id"].to_numpy(dtype=np.int64),
+        })
+        for col in WAR_COMPONENTS:
+            games[col] = df[col].to_numpy(dtype=np.float32)
+        games = (
+            games.drop_duplicates(["player_id", "match_id"])
+            .sort_values(["player_id", "match_id"], kind="stable")
+        )
+
+        player_ids, starts = np.unique(games["player_id"].to_numpy(), return_index=True)
+        indptr = np.append(starts, len(games)).astype(np.int64)
+        values = np.ascontiguousarray(games[WAR_COMPONENTS].to_numpy(dtype=np.float32))
+
+        store = cls(
+            player_ids=player_ids.astype(object),
+            indptr=indptr,
+            match_ids=games["match_id"].to_numpy(),
+            values=values,
+            rolling={},
+        )
+        store._rolling = {window: store._rolling_means(window) for window in windows}
+        return store
+
+    def __contains__(self, player_id: Any) -> bool:
+        return str(player_id) in self._row_of
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+    @property
+    def windows(self) -> Sequence[int]:
+        """Get the precomputed rolling window lengths."""
+        return sorted(self._rolling)
+
+    def games_played(self, player_id: Any) -> int:
+        """Get the number of games stored for a player."""
+        start, end = self._span(player_id)
+        return int(end - start)
+
+    def history(self, player_id: Any) -> Dict[str, np.ndarray]:
+        """Get a player's per-game history in game order.
+
+        Args:
+            player_id: The player to look up.
+
+        Returns:
+            ``match_id`` plus one array per WAR component. The arrays are views into
+            the store and must not be modified.
+        """
+        start, end = self._span(player_id)
+        history = {"match_id": self._match_ids[start:end]}
+        for i, col in enumerate(WAR_COMPONENTS):
+            history[col] = self._values[start:end, i]
+        return history
+
+    def rolling(self, player_id: Any, window: int) -> Dict[str, np.ndarray]:
+        """Get a player's precomputed rolling averages, one value per game.
+
+        Early games average over the games available so far.
+
+        Args:
+            player_id: The player to look up.
+            window: One of the precomputed window lengths.
+
+        Returns:
+            One array per WAR component.
+
+        Raises:
+            ValueError: If the window was not precomputed.
+        """
+        if window not in self._rolling:
+            raise ValueError(f"Window {window} is not precomputed (available: {self.windows})")
+        start, end = self._span(player_id)
+        means = self._rolling[window]
+        return {col: means[start:end, i] for i, col in enumerate(WAR_COMPONENTS)}
+
+    def window_sum(self, player_id: Any, first: int, last: int) -> Dict[str, float]:
+        """Get the totals over a run of a player's games.
+
+        Args:
+            player_id: The player to look up.
+            first: Index of the first game (0-based, inclusive).
+            last: Index after the last game (exclusive).
+
+        Returns:
+            The total of each WAR component over the games.
+        """
+        start, end = self._span(player_id)
+        first = min(max(first, 0), end - start)
+        last = min(max(last, first), end - start)
+        totals = self._prefix[start + last] - self._prefix[start + first]
+        return {col: float(totals[i]) for i, col in enumerate(WAR_COMPONENTS)}
+
+    def form(self, player_id: Any, window: int = 5) -> Dict[str, Any]:
+        """Get a player's average WAR components over their most recent games.
+
+        Args:
+            player_id: The player to look up.
+            window: Number of recent games to average.
+
+        Returns:
+            The number of games averaged and the mean of each WAR component.
+        """
+        n_games = self.games_played(player_id)
+        games = min(window, n_games)
+        totals = self.window_sum(player_id, n_games - games, n_games)
+        form = {"games": games}
+        form.update({col: (total / games if games else 0.0) for col, total in totals.items()})
+        return form
+
+    def trend(self, player_id: Any, window: int = 5) -> Dict[str, float]:
+        """Get the change in average WAR between the last window and the one before it.
+
+        Args:
+            player_id: The player to look up.
+            window: Number of games in each window.
+
+        Returns:
+            Recent minus previous average for each WAR component, or zeros if the
+            player has not played enough games for two windows.
+        """
+        n_games = self.games_played(player_id)
+        if n_games < 2 * window:
+            return {col: 0.0 for col in WAR_COMPONENTS}
+        recent = self.window_sum(player_id, n_games - window, n_games)
+        previous = self.window_sum(player_id, n_games - 2 * window, n_games - window)
+        return {col: (recent[col] - previous[col]) / window for col in WAR_COMPONENTS}
+
+    def save(self, path: str) -> None:
+        """Persist the store to a ``.npz`` file, replacing it atomically.
+
+        Args:
+            path: Destination file path.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                player_ids=self.player_ids.astype(str),
+                indptr=self._indptr,
+                match_ids=self._match_ids,
+                values=self._values,
+                **{f"rolling_{window}": means for window, means in self._rolling.items()},
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WARTimeSeries":
+        """Load a store previously written with :meth:`save`.
+
+        Args:
+            path: Path to the ``.npz`` file.
+
+        Returns:
+            The loaded WARTimeSeries.
+        """
+        with np.load(path) as data:
+            rolling = {
+                int(key.split("_")[1]): data[key] for key in data.files if key.startswith("rolling_")
+            }
+            return cls(
+                player_ids=data["player_ids"].astype(object),
+                indptr=data["indptr"],
+                match_ids=data["match_ids"],
+                values=data["values"],
+                rolling=rolling,
+            )
+
+    def _rolling_means(self, window: int) -> np.ndarray:
+        """Compute trailing means over ``window`` games for every player-game at once."""
+        rows = np.arange(len(self._values))
+        # First row of the player each row belongs to, so windows never cross players
+        player_start = np.repeat(self._indptr[:-1], np.diff(self._indptr))
+        first = np.maximum(rows + 1 - window, player_start)
+        totals = self._prefix[rows + 1] - self._prefix[first]
+        return (totals / (rows + 1 - first)[:, None]).astype(np.float32)
+
+    def _span(self, player_id: Any) -> Tuple[int, int]:
+        try:
+            row = self._row_of[str(player_id)]
+        except KeyError:
+            raise KeyError(f"Player {player_id} not found in WAR time series") from None
+        return self._indptr[row], self._indptr[row + 1]
@@ -0,0 +1,197 @@
+"""Parallel cross-validated training of the WAR regression models."""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold
+
+from .artifacts import ARTIFACTS_DIR, dataset_hash
+
+# Subdirectory of the artifacts directory holding fitted models
+MODELS_CACHE_DIR = "models"
+# Cached models kept after a run, least recently used removed first. A WAR analysis
+# writes about a dozen (every position x model), so this keeps a few runs.
+MODELS_CACHE_SIZE = int(os.getenv("WAR_MODELS_CACHE_SIZE", 64))
+
+# Regressors available to the harness, by display name
+MODEL_CLASSES = {
+    "Random Forest": (RandomForestRegressor, {"n_estimators": 100, "random_state": 42}),
+    "Gradient Boosting": (GradientBoostingRegressor, {"random_state": 42}),
+}
+
+Fold = Tuple[np.ndarray, np.ndarray]
+
+
+def make_model(name: str):
+    """Create an unfitted regressor by name.
+
+    Raises:
+        ValueError: If the name is not in ``MODEL_CLASSES``.
+    """
+    if name not in MODEL_CLASSES:
+        raise ValueError(f"Unknown model: {name}. Must be one of {list(MODEL_CLASSES)}")
+    cls, params = MODEL_CLASSES[name]
+    return cls(**params)
+
+
+def make_folds(n_rows: int, n_splits: int = 5) -> List[Fold]:
+    """Precompute (train, test) row indices for K-fold cross-validation.
+
+    The split matches the default of ``cross_val_score(cv=n_splits)`` for regressors.
+    """
+    return list(KFold(n_splits=n_splits).split(np.empty((n_rows, 1))))
+
+
+def cross_validate_models(
+    datasets: Mapping[str, Tuple[pd.DataFrame, pd.Series]],
+    model_names: Sequence[str],
+    n_splits: int = 5,
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = ARTIFACTS_DIR,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Cross-validate and fit every model on every dataset in one process pool.
+
+    Each dataset's folds are computed once and shared by all models. Every model x
+    dataset x fold fit, plus one fit on each full dataset, becomes a separate task,
+    so all cores stay busy however the work is split. Fitted models are cached by
+    dataset hash and model configuration, so unchanged data is never refitted. After
+    each call the cache is pruned to the ``MODELS_CACHE_SIZE`` most recently used
+    models.
+
+    Args:
+        datasets: Name -> (features, target), e.g. one entry per position.
+        model_names: Names from ``MODEL_CLASSES`` to train on every dataset.
+        n_splits: Number of cross-validation folds.
+        n_jobs: Worker processes. ``None`` uses every core, 1 runs in-process.
+        cache_dir: Root directory for cached models. ``None`` disables caching.
+
+    Returns:
+        (dataset, model) -> dict with the ``model`` fitted on the full dataset, the
+        per-fold R² in ``cv_scores`` and ``feature_importances`` (feature -> importance,
+        or None if the model has none).
+    """
+    results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    cache_paths: Dict[Tuple[str, str], str] = {}
+    tasks = []
+
+    for dataset, (X, y) in datasets.items():
+        folds = make_folds(len(X), n_splits)
+
+        for name in model_names:
+            key = (dataset, name)
+            if cache_dir is not None:
+                cache_paths[key] = _cache_path(cache_dir, X, y, name, n_splits)
+                if os.path.exists(cache_paths[key]):
+                    results[key] = joblib.load(cache_paths[key])
+                    # Mark the entry as recently used for pruning
+                    os.utime(cache_paths[key])
+                    continue
+
+            for i, (train, test) in enumerate(folds):
+                tasks.append((key, i, name, X, y, train, test))
+            tasks.append((key, None, name, X, y, None, None))
+
+    if n_jobs == 1 or len(tasks) <= 1:
+        outputs = [_fit_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            outputs = list(executor.map(_fit_task, tasks))
+
+    fitted: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for (key, fold, _, _, _, _, _), output in zip(tasks, outputs):
+        entry = fitted.setdefault(key, {"scores": {}})
+        if fold is None:
+            entry["model"] = output
+        else:
+            entry["scores"][fold] = output
+
+    for key, entry in fitted.items():
+        model = entry["model"]
+        columns = list(datasets[key[0]][0].columns)
+        importances = getattr(model, "feature_importances_", None)
+        results[key] = {
+            "model": model,
+            "cv_scores": np.array([entry["scores"][fold] for fold in sorted(entry["scores"])]),
+            "feature_importances": (
+                None if importances is None else dict(zip(columns, importances.tolist()))
+            ),
+        }
+        if key in cache_paths:
+            tmp_path = f"{cache_paths[key]}.tmp"
+            joblib.dump(results[key], tmp_path)
+            os.replace(tmp_path, cache_paths[key])
+
+    if cache_dir is not None:
+        prune_model_cache(cache_dir, keep=set(cache_paths.values()))
+
+    return results
+
+
+def prune_model_cache(
+    cache_dir: str = ARTIFACTS_DIR,
+    max_entries: int = MODELS_CACHE_SIZE,
+    keep: Optional[Set[str]] = None,
+) -> List[str]:
+    """Remove the least recently used cached models beyond ``max_entries``.
+
+    Args:
+        cache_dir: Root directory for cached models.
+        max_entries: Number of cached models to keep.
+        keep: Cache files that must not be removed, e.g. those used by the current run.
+
+    Returns:
+        The paths removed.
+    """
+    directory = os.path.join(cache_dir, MODELS_CACHE_DIR)
+    keep = keep or set()
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".joblib")]
+    except FileNotFoundError:
+        return []
+
+    entries = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            continue
+    entries.sort(reverse=True)
+
+    removed = []
+    for _, path in entries[max_entries:]:
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed.append(path)
+    return removed
+
+
+def _fit_task(task: Tuple[Any, Optional[int], str, pd.DataFrame, pd.Series, Any, Any]) -> Any:
+    """Fit one fold and return its R², or fit the full dataset and return the model."""
+    _, fold, name, X, y, train, test = task
+    model = make_model(name)
+    if fold is None:
+        return model.fit(X, y)
+    model.fit(X.iloc[train], y.iloc[train])
+    return float(r2_score(y.iloc[test], model.predict(X.iloc[test])))
+
+
+def _cache_path(cache_dir: str, X: pd.DataFrame, y: pd.Series, name: str, n_splits: int) -> str:
+    """Get the cache file of a model trained on a dataset."""
+    version = dataset_hash(pd.concat([X, y.rename("__target__")], axis=1))
+    config = f"{name}|{sorted(make_model(name).get_params().items())}|{n_splits}"
+    config_key = hashlib.sha1(config.encode()).hexdigest()[:12]
+    directory = os.path.join(cache_dir, MODELS_CACHE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{config_key}_{version}.joblib")
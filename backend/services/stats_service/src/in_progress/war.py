@@ -1,8 +1,16 @@
+import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from src.analytics import TeammateIndex, TEAMMATE_INDEX_FILE, artifact_path
+from src.analytics import LeaderboardIndex, LEADERBOARD_FILE
+from src.analytics import WARTimeSeries, TIMESERIES_FILE
+from src.analytics import load_player_stats, memory_report, bootstrap_war_intervals
+from src.analytics import FeatureStore, carry_over_projections, file_hash, RenderQueue
+from src.analytics import ArchetypeModel, ARCHETYPES_FILE
+
+from src.in_progress.war_charts import plot_war_by_position, plot_top_players, plot_war_vs_traditional, plot_player_report
 
 class HockeyWAR:
     """
@@ -12,13 +20,25 @@ class HockeyWAR:
     and contextual adjustments to provide a comprehensive value metric.
     """
     
-    def __init__(self, csv_path: str):
-        """Initialize with the path to player data CSV."""
-        self.df = pd.read_csv(csv_path)
+    def __init__(self, csv_path: str, season: str = "current", render_charts: Optional[bool] = None):
+        """
+        Initialize with the path to player data CSV and the season it covers.
+        
+        Charts are rendered in background worker processes; ``render_charts=False``
+        (or ``WAR_RENDER_CHARTS=0``) skips them entirely.
+        """
+        self.df = load_player_stats(csv_path)
+        # A game fetched once per club appears twice; count every player-game once, as
+        # the time series does, so games played and WAR totals agree across artifacts
+        self.df = self.df.drop_duplicates(['player_id', 'match_id']).reset_index(drop=True)
+        self.season = season
+        self.charts = RenderQueue(enabled=render_charts)
         self.position_groups = ['center', 'leftWing', 'rightWing', 'leftDefense', 'rightDefense', 'goalie']
         self.replacement_level = {}
         self.war_components = {}
         self.player_war = None
+        self.teammate_index = None
+        self.war_timeseries = None
         
         # Define metrics that contribute to WAR by position and component
         # Revised to use more established metrics instead of the custom ones
@@ -115,7 +135,6 @@ class HockeyWAR:
         # Create all derived columns upfront to avoid fragmentation
         # Initialize all columns we'll use in one go
         new_columns = {
-            'position_category': 'skater',
             'game_impact_norm': 0.0,
             'glgaa_normalized': 0.0,
             'offensive_war': 0.0,
@@ -131,20 +150,21 @@ class HockeyWAR:
         # Add all columns at once to prevent fragmentation
         for col, default in new_columns.items():
             if col not in self.df.columns:
-                self.df[col] = default
+                self.df[col] = np.float32(default)
                 
         # Create a fresh copy to defragment
         self.df = self.df.copy()
         
         # Fill NaN values appropriately
-        numeric_cols = self.df.select_dtypes(include=['float64', 'int64']).columns
+        numeric_cols = self.df.select_dtypes(include='number').columns
         for col in numeric_cols:
             # Use 0 for most metrics if missing
             self.df[col] = self.df[col].fillna(0)
             
         # Create position category
-        self.df['position_category'] = self.df['detailed_position'].apply(
-            lambda x: 'goalie' if x == 'goalie' else 'skater'
+        self.df['position_category'] = pd.Categorical(
+            np.where(self.df['detailed_position'] == 'goalie', 'goalie', 'skater'),
+            categories=['skater', 'goalie']
         )
         
         # Handle special metrics that need preprocessing
@@ -160,13 +180,21 @@ class HockeyWAR:
         
         # Minimum games/TOI threshold for reliable stats
         # Group by player and count games
-        player_games = self.df.groupby(['player_id', 'player_name', 'detailed_position']).size().reset_index(name='games_played')
+        player_games = self.df.groupby(['player_id', 'player_name', 'detailed_position'], observed=True).size().reset_index(name='games_played')
         # Only include players with at least 3 games
         qualified_players = player_games[player_games['games_played'] >= 3]['player_id'].tolist()
         self.df_qualified = self.df[self.df['player_id'].isin(qualified_players)]
         
         print(f"Preprocessing complete. {len(qualified_players)} qualified players with 3+ games.")
         
+    def memory_report(self) -> pd.DataFrame:
+        """Print and return the per-column memory usage of the player-game data."""
+        report = memory_report(self.df)
+        total_mb = report.attrs['total_bytes'] / 1024 ** 2
+        print(f"Player-game data: {len(self.df)} rows, {total_mb:.2f} MB")
+        print(report.head(10))
+        return report
+        
     def establish_replacement_level(self) -> None:
         """
         Establish replacement level baselines for each position.
@@ -227,7 +255,7 @@ class HockeyWAR:
         if not metrics:
             return  # Skip if no metrics for this component (e.g., offensive for goalies)
         
-        component_values = np.zeros(len(self.df))
+        component_values = np.zeros(len(self.df), dtype=np.float32)
         
         # Define metric weights based on importance
         # This helps balance metrics with different scales
@@ -300,7 +328,7 @@ class HockeyWAR:
                     
                     # Add contribution from this metric, properly weighted and scaled
                     normalized_weight = weight / total_weight
-                    component_values += above_repl * normalized_weight * scaling_factor
+                    component_values += (above_repl * normalized_weight * scaling_factor).to_numpy(dtype=np.float32)
         
         # Apply position-specific component weight
         component_values *= self.position_weights[position][component]
@@ -405,7 +433,7 @@ class HockeyWAR:
     def aggregate_player_war(self) -> pd.DataFrame:
         """Aggregate WAR values across all games to get season WAR per player."""
         # Group by player and aggregate
-        player_war = self.df.groupby(['player_id', 'player_name', 'detailed_position']).agg({
+        player_war = self.df.groupby(['player_id', 'player_name', 'detailed_position'], observed=True).agg({
             'war_value': 'sum',
             'offensive_war': 'sum',
             'defensive_war': 'sum',
@@ -435,6 +463,46 @@ class HockeyWAR:
         self.player_war = player_war
         return player_war
     
+    def add_war_intervals(self, n_resamples: int = 1000, confidence: float = 0.9, seed: int = 42) -> pd.DataFrame:
+        """Attach bootstrap confidence intervals for season WAR to the aggregated results."""
+        if self.player_war is None:
+            print("Error: Run aggregate_player_war() first")
+            return None
+        
+        intervals = bootstrap_war_intervals(
+            self.df, n_resamples=n_resamples, confidence=confidence, seed=seed
+        )
+        keys = ['player_id', 'detailed_position']
+        player_war = self.player_war.drop(columns=['war_ci_low', 'war_ci_high', 'war_std'], errors='ignore')
+        player_war = player_war.merge(intervals, on=keys, how='left')
+        
+        self.player_war = player_war.sort_values('war_value', ascending=False)
+        print(f"WAR confidence intervals ({confidence:.0%}) computed from {n_resamples} resamples.")
+        return self.player_war
+    
+    def assign_archetypes(self) -> pd.DataFrame:
+        """Label each player with the nearest stored archetype, without refitting the clustering."""
+        if self.player_war is None:
+            print("Error: Run aggregate_player_war() first")
+            return None
+        
+        try:
+            archetypes = ArchetypeModel.load(artifact_path(ARCHETYPES_FILE))
+        except FileNotFoundError:
+            print("No archetype centroids stored yet; run the WAR ML clustering analysis to fit them.")
+            return self.player_war
+        
+        labels, _ = archetypes.assign(self.player_war[archetypes.features].fillna(0).to_numpy())
+        self.player_war['archetype'] = labels
+        print(f"Players assigned to {len(archetypes)} archetypes (centroids {archetypes.version}).")
+        return self.player_war
+    
+    def build_teammate_index(self) -> TeammateIndex:
+        """Build the teammate co-occurrence index from the per-game WAR values."""
+        self.teammate_index = TeammateIndex.from_games(self.df)
+        print(f"Teammate index built for {len(self.teammate_index)} players.")
+        return self.teammate_index
+    
     def analyze_war_distribution(self) -> Dict[str, pd.DataFrame]:
         """Analyze WAR distribution by position."""
         position_analysis = {}
@@ -453,106 +521,47 @@ class HockeyWAR:
         return position_analysis
             
     def visualize_war(self) -> None:
-        """Generate visualizations of WAR distributions and components."""
+        """Queue visualizations of WAR distributions and components for rendering."""
         if self.player_war is None:
             print("Error: Run aggregate_player_war() first")
             return
-            
-        # Set up the visualization style
-        plt.style.use('seaborn-v0_8-darkgrid')
         
         # 1. WAR distribution by position
-        plt.figure(figsize=(14, 8))
-        
-        sns.boxplot(x='detailed_position', y='war_value', data=self.player_war)
-        plt.title('WAR Distribution by Position', fontsize=16)
-        plt.xlabel('Position', fontsize=14)
-        plt.ylabel('Wins Above Replacement', fontsize=14)
-        plt.axhline(y=0, color='red', linestyle='--', alpha=0.7)
-        plt.tight_layout()
-        plt.savefig('war_by_position.png')
+        self.charts.submit(plot_war_by_position, self.player_war[['detailed_position', 'war_value']],
+                           'war_by_position.png')
         
         # 2. Top players by WAR
         top_n = min(20, len(self.player_war))
-        top_players = self.player_war.head(top_n).copy()  # Create a copy to avoid warnings
-        
-        plt.figure(figsize=(14, 10))
-        
-        # Create stacked bar chart of WAR components
-        ax = plt.subplot(111)
-        
-        # Scale components to match total WAR
-        for idx, row in top_players.iterrows():
-            component_sum = row['offensive_war'] + row['defensive_war'] + row['teamplay_war']
-            if component_sum > 0:  # Avoid division by zero
-                scale_factor = row['war_value'] / component_sum
-                top_players.loc[idx, 'offensive_scaled'] = row['offensive_war'] * scale_factor
-                top_players.loc[idx, 'defensive_scaled'] = row['defensive_war'] * scale_factor
-                top_players.loc[idx, 'teamplay_scaled'] = row['teamplay_war'] * scale_factor
-            else:
-                top_players.loc[idx, 'offensive_scaled'] = 0
-                top_players.loc[idx, 'defensive_scaled'] = 0
-                top_players.loc[idx, 'teamplay_scaled'] = 0
-        
-        # Create labels with position
-        labels = [f"{row['player_name']} ({row['detailed_position'][0:2]})" 
-                 for _, row in top_players.iterrows()]
-        
-        # Plot stacked bars
-        ax.barh(labels, top_players['offensive_scaled'], color='#1f77b4', alpha=0.8, label='Offensive')
-        ax.barh(labels, top_players['defensive_scaled'], left=top_players['offensive_scaled'], 
-                color='#ff7f0e', alpha=0.8, label='Defensive')
-        ax.barh(labels, top_players['teamplay_scaled'], 
-                left=top_players['offensive_scaled'] + top_players['defensive_scaled'],
-                color='#2ca02c', alpha=0.8, label='Teamplay')
-        
-        plt.title('Top Players by WAR', fontsize=16)
-        plt.xlabel('Wins Above Replacement', fontsize=14)
-        plt.legend(loc='lower right')
-        plt.axvline(x=0, color='red', linestyle='--', alpha=0.7)
-        plt.grid(True, axis='x')
-        plt.tight_layout()
-        plt.savefig('top_players_war.png')
+        top_players = self.player_war.head(top_n)[
+            ['player_name', 'detailed_position', 'war_value', 'offensive_war', 'defensive_war', 'teamplay_war']
+        ]
+        self.charts.submit(plot_top_players, top_players, 'top_players_war.png')
         
         # 3. WAR vs Traditional Metrics
-        plt.figure(figsize=(14, 8))
-        
-        # Separate by position for clearer visualization
-        colors = {'center': 'blue', 'leftWing': 'green', 'rightWing': 'orange', 
-                 'leftDefense': 'red', 'rightDefense': 'purple', 'goalie': 'black'}
+        self.charts.submit(
+            plot_war_vs_traditional,
+            self.player_war[['detailed_position', 'points', 'avg_game_impact', 'war_value']],
+            'war_vs_traditional.png',
+            positions=tuple(self.position_groups),
+        )
         
-        for position in self.position_groups:
-            pos_data = self.player_war[self.player_war['detailed_position'] == position]
-            if len(pos_data) > 0:
-                if position != 'goalie':
-                    plt.scatter(pos_data['points'], pos_data['war_value'], 
-                               alpha=0.7, label=position, color=colors[position])
-                else:
-                    # For goalies, use save percentage instead of points
-                    plt.scatter(pos_data['avg_game_impact'], pos_data['war_value'], 
-                               alpha=0.7, label=position, color=colors[position])
-        
-        plt.title('WAR vs Traditional Metrics', fontsize=16)
-        plt.xlabel('Points (Skaters) / Game Impact (Goalies)', fontsize=14)
-        plt.ylabel('Wins Above Replacement', fontsize=14)
-        plt.axhline(y=0, color='red', linestyle='--', alpha=0.7)
-        plt.grid(True)
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig('war_vs_traditional.png')
-        
-        print("Visualizations created and saved.")
+        print("Visualizations queued.")
     
     def run_full_war_calculation(self) -> pd.DataFrame:
         """Run the complete WAR calculation pipeline."""
         print("Starting WAR calculation pipeline...")
         
         self.preprocess_data()
+        self.memory_report()
         self.establish_replacement_level()
         self.calculate_war_components()
         self.calculate_total_war()
         
-        player_war = self.aggregate_player_war()
+        self.aggregate_player_war()
+        self.add_war_intervals()
+        player_war = self.assign_archetypes()
+        self.build_teammate_index()
+        self.build_war_timeseries()
         
         position_analysis = self.analyze_war_distribution()
         
@@ -575,96 +584,102 @@ class HockeyWAR:
         player_war.to_csv('player_war_results.csv', index=False)
         print("\nResults saved to player_war_results.csv")
         
+        # Materialize the ML features for this run, tied to the results file just written
+        try:
+            previous_store = FeatureStore.open()
+        except FileNotFoundError:
+            previous_store = None
+        feature_store = FeatureStore.build(player_war, source=file_hash('player_war_results.csv'))
+        print(f"Feature store version {feature_store.version} saved to {feature_store.directory}")
+        
+        # Keep the projections served by the stats API, e.g. after archetype labels were added
+        if previous_store is not None:
+            carried = carry_over_projections(previous_store, feature_store)
+            if carried:
+                print(f"Projections carried over to the new version: {', '.join(carried)}")
+        
+        # Save teammate index and leaderboard for the stats API
+        self.teammate_index.save(artifact_path(TEAMMATE_INDEX_FILE))
+        print(f"Teammate index saved to {artifact_path(TEAMMATE_INDEX_FILE)}")
+        self.war_timeseries.save(artifact_path(TIMESERIES_FILE))
+        print(f"WAR time series saved to {artifact_path(TIMESERIES_FILE)}")
+        self.publish_leaderboard()
+        
+        # Wait for the charts queued above
+        failed = self.charts.close()
+        for path, error in failed.items():
+            print(f"Failed to render {path}: {error}")
+        print(f"Charts rendered ({self.charts.skipped} unchanged charts skipped)")
+        
         return player_war
     
+    def build_war_timeseries(self) -> WARTimeSeries:
+        """Build the per-game WAR history store from the per-game WAR values."""
+        self.war_timeseries = WARTimeSeries.from_games(self.df)
+        print(f"WAR time series built for {len(self.war_timeseries)} players.")
+        return self.war_timeseries
+    
+    def publish_leaderboard(self) -> LeaderboardIndex:
+        """Write this season's WAR rankings into the leaderboard served by the stats API."""
+        if self.player_war is None:
+            print("Error: Run aggregate_player_war() first")
+            return None
+        
+        path = artifact_path(LEADERBOARD_FILE)
+        leaderboard = LeaderboardIndex.load_or_empty(path)
+        leaderboard.update_season(self.season, self.player_war)
+        leaderboard.save(path)
+        print(f"Leaderboard for season {self.season} saved to {path}")
+        return leaderboard
+    
     def generate_player_reports(self) -> None:
-        """Generate individual reports for top players."""
+        """Queue individual reports for top players for rendering."""
         if self.player_war is None:
             print("Error: Run aggregate_player_war() first")
             return
             
-        # Create directory for player reports
-        import os
-        os.makedirs('player_reports', exist_ok=True)
-        
         # Process top players (or all players above a threshold)
         players_to_analyze = self.player_war[self.player_war['war_value'] > 0].head(30)
         
         print(f"Generating individual reports for {len(players_to_analyze)} players...")
         
         for _, player in players_to_analyze.iterrows():
-            self._create_player_report(player)
+            self.charts.submit(
+                plot_player_report,
+                self._player_report_data(player),
+                f"player_reports/{player['player_name'].replace(' ', '_')}_report.png",
+            )
         
-        print("Individual player reports complete.")
+        print("Individual player reports queued.")
+        
+    def _player_report_data(self, player_row) -> Dict:
+        """Collect everything the report of a single player draws."""
+        if self.war_timeseries is None:
+            self.build_war_timeseries()
+        if self.teammate_index is None:
+            self.build_teammate_index()
         
-    def _create_player_report(self, player_row):
-        """Create detailed report for a single player."""
         player_id = player_row['player_id']
-        player_name = player_row['player_name']
         position = player_row['detailed_position']
         
-        # Get player game data
-        player_games = self.df[self.df['player_id'] == player_id].copy()
-        
-        # Set up multipage figure
-        fig = plt.figure(figsize=(15, 12))
-        fig.suptitle(f"Player Report: {player_name} ({position})", fontsize=18)
-        
-        # 1. Game-by-game WAR components
-        ax1 = plt.subplot(2, 2, 1)
-        self._plot_war_by_game(ax1, player_games)
-        
-        # 2. Opponents analysis
-        ax2 = plt.subplot(2, 2, 2)
-        self._plot_opponent_analysis(ax2, player_games)
-        
-        # 3. WAR component breakdown
-        ax3 = plt.subplot(2, 2, 3)
-        self._plot_war_components(ax3, player_row)
-        
-        # 4. Teammate synergy
-        ax4 = plt.subplot(2, 2, 4)
-        self._plot_teammate_analysis(ax4, player_id, player_games)
-        
-        # Save figure
-        plt.tight_layout(rect=[0, 0, 1, 0.95])  # Adjust for title
-        plt.savefig(f"player_reports/{player_name.replace(' ', '_')}_report.png")
-        plt.close()
-        
-    def _plot_war_by_game(self, ax, player_games):
-        """Plot WAR components for each game."""
-        # Sort by date/game number
-        player_games = player_games.sort_values('match_id')
-        
-        # Extract components
-        games = range(1, len(player_games) + 1)
-        
-        # Plot stacked bars for components
-        ax.bar(games, player_games['offensive_war'], label='Offensive', color='#1f77b4')
-        ax.bar(games, player_games['defensive_war'], bottom=player_games['offensive_war'], 
-            label='Defensive', color='#ff7f0e')
-        ax.bar(games, player_games['teamplay_war'], 
-            bottom=player_games['offensive_war'] + player_games['defensive_war'],
-            label='Teamplay', color='#2ca02c')
-            
-        # Add total WAR line
-        ax.plot(games, player_games['war_value'], 'k--', label='Total WAR')
-        
-        ax.set_title('WAR Components by Game')
-        ax.set_xlabel('Game Number')
-        ax.set_ylabel('WAR Value')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        ax.axhline(y=0, color='red', linestyle='--', alpha=0.3)
+        return {
+            'player_name': player_row['player_name'],
+            'position': position,
+            'components': {c: float(player_row[c]) for c in ('war_value', 'offensive_war', 'defensive_war', 'teamplay_war')},
+            'position_weights': self.position_weights.get(position),
+            # Games are stored in game order
+            'history': self.war_timeseries.history(player_id),
+            'rolling': self.war_timeseries.rolling(player_id, 5),
+            'opponent_stats': self._opponent_stats(player_id),
+            'teammates': self._report_teammates(player_id),
+        }
     
-    def _plot_opponent_analysis(self, ax, player_games):
-        """Plot player performance against different opponents."""
-        # Check if opponent data is available
-        if 'opponent_team' not in player_games.columns:
-            ax.text(0.5, 0.5, "Opponent data not available", 
-                    ha='center', va='center', fontsize=12)
-            ax.set_title('Performance vs Opponents')
-            return
+    def _opponent_stats(self, player_id) -> Optional[pd.DataFrame]:
+        """Average WAR components against each opponent faced at least twice, or None without opponent data."""
+        if 'opponent_team' not in self.df.columns:
+            return None
+        
+        player_games = self.df[self.df['player_id'] == player_id]
         
         # Group by opponent and calculate average WAR and count games
         opponent_stats = player_games.groupby('opponent_team').agg({
@@ -680,148 +695,25 @@ class HockeyWAR:
         # Only include opponents with at least 2 games for reliability
         opponent_stats = opponent_stats[opponent_stats['war_value_count'] >= 2]
         
-        if len(opponent_stats) == 0:
-            ax.text(0.5, 0.5, "Insufficient opponent data\n(need 2+ games vs same opponent)", 
-                    ha='center', va='center', fontsize=12)
-            ax.set_title('Performance vs Opponents')
-            return
-        
         # Sort by average WAR
-        opponent_stats = opponent_stats.sort_values('war_value_mean')
-        
-        # Create stacked bar chart
-        y_pos = range(len(opponent_stats))
-        
-        # Plot stacked components
-        ax.barh(y_pos, opponent_stats['offensive_war_mean'], color='#1f77b4', label='Offensive')
-        ax.barh(y_pos, opponent_stats['defensive_war_mean'], 
-               left=opponent_stats['offensive_war_mean'], color='#ff7f0e', label='Defensive')
-        ax.barh(y_pos, opponent_stats['teamplay_war_mean'], 
-               left=opponent_stats['offensive_war_mean'] + opponent_stats['defensive_war_mean'],
-               color='#2ca02c', label='Teamplay')
-        
-        # Set y-tick labels to opponent names
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels([f"{team} ({count})" for team, count in 
-                           zip(opponent_stats['opponent_team'], opponent_stats['war_value_count'])])
-        
-        ax.set_title('Average WAR Against Opponents')
-        ax.set_xlabel('WAR Value')
-        ax.axvline(x=0, color='red', linestyle='--', alpha=0.3)
-        ax.legend(loc='lower right')
-        ax.grid(True, axis='x', alpha=0.3)
-    
-    def _plot_war_components(self, ax, player_row):
-        """Create a pie chart showing WAR component breakdown for the player."""
-        # Get components
-        offensive = player_row['offensive_war']
-        defensive = player_row['defensive_war']
-        teamplay = player_row['teamplay_war']
-        
-        # Handle negative values for pie chart (can't show negative in pie)
-        components = []
-        labels = []
-        colors = []
-        
-        if offensive > 0:
-            components.append(offensive)
-            labels.append(f'Offensive ({offensive:.2f})')
-            colors.append('#1f77b4')
-            
-        if defensive > 0:
-            components.append(defensive)
-            labels.append(f'Defensive ({defensive:.2f})')
-            colors.append('#ff7f0e')
-            
-        if teamplay > 0:
-            components.append(teamplay)
-            labels.append(f'Teamplay ({teamplay:.2f})')
-            colors.append('#2ca02c')
-        
-        # Create pie chart if we have positive components
-        if sum(components) > 0:
-            ax.pie(components, labels=labels, colors=colors, autopct='%1.1f%%', 
-                  startangle=90, shadow=True)
-            ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-        else:
-            ax.text(0.5, 0.5, "No positive WAR components", 
-                    ha='center', va='center', fontsize=12)
-        
-        position = player_row['detailed_position']
-        ax.set_title(f'WAR Component Breakdown - Total: {player_row["war_value"]:.2f}')
-        
-        # Add position weights as a text note
-        if position in self.position_weights:
-            weights = self.position_weights[position]
-            weight_text = f"Position Weights: Off={weights['offensive']:.2f}, Def={weights['defensive']:.2f}, Team={weights['teamplay']:.2f}"
-            ax.text(0.5, -0.1, weight_text, transform=ax.transAxes, ha='center', fontsize=9)
+        return opponent_stats.sort_values('war_value_mean')
     
-    def _plot_teammate_analysis(self, ax, player_id, player_games):
-        """Analyze how player performs with different teammates."""
-        # Get match IDs where this player played
-        player_match_ids = set(player_games['match_id'].unique())
-        
-        # Find teammates from those matches
-        teammate_data = self.df[self.df['match_id'].isin(player_match_ids)].copy()
-        
-        # Exclude the player themselves
-        teammate_data = teammate_data[teammate_data['player_id'] != player_id]
-        
-        # Group by teammate and count matches together
-        teammates = teammate_data.groupby(['player_id', 'player_name']).agg({
-            'match_id': 'nunique',  # Count unique matches together
-            'war_value': 'mean',    # Average WAR of teammate
-        }).reset_index()
-        
-        # Rename columns
-        teammates.columns = ['teammate_id', 'teammate_name', 'games_together', 'teammate_avg_war']
-        
-        # Only include teammates with 3+ games together
-        teammates = teammates[teammates['games_together'] >= 3]
-        
-        if len(teammates) == 0:
-            ax.text(0.5, 0.5, "Insufficient teammate data\n(need 3+ games with teammates)", 
-                    ha='center', va='center', fontsize=12)
-            ax.set_title('Teammate Analysis')
-            return
-        
-        # Sort by teammate WAR
-        teammates = teammates.sort_values('teammate_avg_war', ascending=False)
-        
-        # Take top and bottom teammates for clarity
-        top_n = min(5, len(teammates))
-        if len(teammates) > 10:
-            teammates = pd.concat([teammates.head(top_n), teammates.tail(top_n)])
-        
-        # Create bar chart
-        y_pos = range(len(teammates))
-        bars = ax.barh(y_pos, teammates['teammate_avg_war'], color='#1f77b4')
-        
-        # Color bars based on positive/negative
-        for i, bar in enumerate(bars):
-            if teammates.iloc[i]['teammate_avg_war'] < 0:
-                bar.set_color('#d62728')  # Red for negative
-        
-        # Add game count annotations
-        for i, bar in enumerate(bars):
-            ax.text(
-                0.5 if bar.get_width() < 0 else bar.get_width() + 0.2,
-                bar.get_y() + bar.get_height()/2,
-                f"({teammates.iloc[i]['games_together']} games)",
-                va='center', fontsize=8
-            )
-        
-        # Set y-tick labels to teammate names
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(teammates['teammate_name'])
-        
-        ax.set_title('Teammate Performance')
-        ax.set_xlabel('Average WAR Value')
-        ax.axvline(x=0, color='red', linestyle='--', alpha=0.3)
-        ax.grid(True, axis='x', alpha=0.3)
+    def _report_teammates(self, player_id) -> pd.DataFrame:
+        """Best and worst teammates by average WAR in games together (3+ games)."""
+        top_n = 5
+        best = self.teammate_index.top_synergies(player_id, k=top_n, min_games=3)
+        teammates = pd.DataFrame(best)
+        if len(best) == top_n:
+            worst = self.teammate_index.top_synergies(player_id, k=top_n, min_games=3, largest=False)
+            worst_ids = set(t['teammate_id'] for t in worst) - set(t['teammate_id'] for t in best)
+            teammates = pd.DataFrame(best + [t for t in reversed(worst) if t['teammate_id'] in worst_ids])
+        return teammates
 
 # Main execution
 if __name__ == "__main__":
+    # Inputs and outputs of the analysis live next to this script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
     # Initialize the WAR calculator
     hockey_war = HockeyWAR("outputs/player_stats.csv")
     
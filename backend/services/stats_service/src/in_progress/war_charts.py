@@ -0,0 +1,359 @@
+"""Chart renderers for the WAR and WAR ML analyses.
+
+Every chart is a module-level function taking the data to draw and the output path,
+so it can be rendered in a ``RenderQueue`` worker process. Data is prepared by the
+analysis; nothing here recomputes results.
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+
+POSITION_COLORS = {'center': 'blue', 'leftWing': 'green', 'rightWing': 'orange',
+                   'leftDefense': 'red', 'rightDefense': 'purple', 'goalie': 'black'}
+
+
+def plot_war_by_position(player_war, path):
+    """Box plot of the WAR distribution by position."""
+    plt.style.use('seaborn-v0_8-darkgrid')
+    plt.figure(figsize=(14, 8))
+
+    sns.boxplot(x='detailed_position', y='war_value', data=player_war)
+    plt.title('WAR Distribution by Position', fontsize=16)
+    plt.xlabel('Position', fontsize=14)
+    plt.ylabel('Wins Above Replacement', fontsize=14)
+    plt.axhline(y=0, color='red', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_top_players(top_players, path):
+    """Stacked bars of the WAR components of the top players, scaled to total WAR."""
+    plt.style.use('seaborn-v0_8-darkgrid')
+    top_players = top_players.copy()
+    plt.figure(figsize=(14, 10))
+
+    # Create stacked bar chart of WAR components
+    ax = plt.subplot(111)
+
+    # Scale components to match total WAR
+    component_sum = top_players['offensive_war'] + top_players['defensive_war'] + top_players['teamplay_war']
+    scale_factor = (top_players['war_value'] / component_sum).where(component_sum > 0, 0)
+    for component in ('offensive', 'defensive', 'teamplay'):
+        top_players[f'{component}_scaled'] = top_players[f'{component}_war'] * scale_factor
+
+    # Create labels with position
+    labels = [f"{row['player_name']} ({row['detailed_position'][0:2]})"
+             for _, row in top_players.iterrows()]
+
+    # Plot stacked bars
+    ax.barh(labels, top_players['offensive_scaled'], color='#1f77b4', alpha=0.8, label='Offensive')
+    ax.barh(labels, top_players['defensive_scaled'], left=top_players['offensive_scaled'],
+            color='#ff7f0e', alpha=0.8, label='Defensive')
+    ax.barh(labels, top_players['teamplay_scaled'],
+            left=top_players['offensive_scaled'] + top_players['defensive_scaled'],
+            color='#2ca02c', alpha=0.8, label='Teamplay')
+
+    plt.title('Top Players by WAR', fontsize=16)
+    plt.xlabel('Wins Above Replacement', fontsize=14)
+    plt.legend(loc='lower right')
+    plt.axvline(x=0, color='red', linestyle='--', alpha=0.7)
+    plt.grid(True, axis='x')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_war_vs_traditional(player_war, path, positions=tuple(POSITION_COLORS)):
+    """Scatter of WAR against points (skaters) or game impact (goalies)."""
+    plt.style.use('seaborn-v0_8-darkgrid')
+    plt.figure(figsize=(14, 8))
+
+    # Separate by position for clearer visualization
+    for position in positions:
+        pos_data = player_war[player_war['detailed_position'] == position]
+        if len(pos_data) > 0:
+            if position != 'goalie':
+                plt.scatter(pos_data['points'], pos_data['war_value'],
+                           alpha=0.7, label=position, color=POSITION_COLORS[position])
+            else:
+                # For goalies, use save percentage instead of points
+                plt.scatter(pos_data['avg_game_impact'], pos_data['war_value'],
+                           alpha=0.7, label=position, color=POSITION_COLORS[position])
+
+    plt.title('WAR vs Traditional Metrics', fontsize=16)
+    plt.xlabel('Points (Skaters) / Game Impact (Goalies)', fontsize=14)
+    plt.ylabel('Wins Above Replacement', fontsize=14)
+    plt.axhline(y=0, color='red', linestyle='--', alpha=0.7)
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_player_report(report, path):
+    """
+    Four-panel report for a single player.
+
+    Parameters:
+    -----------
+    report : dict
+        Prepared by ``HockeyWAR._player_report_data``: ``player_name``, ``position``,
+        ``components`` (WAR totals), ``position_weights`` (or None), ``history`` and
+        ``rolling`` (per-game WAR), ``opponent_stats`` (None if opponent data is not
+        available) and ``teammates``.
+    path : str
+        Output image path.
+    """
+    plt.style.use('seaborn-v0_8-darkgrid')
+    fig = plt.figure(figsize=(15, 12))
+    fig.suptitle(f"Player Report: {report['player_name']} ({report['position']})", fontsize=18)
+
+    # 1. Game-by-game WAR components
+    _plot_war_by_game(plt.subplot(2, 2, 1), report['history'], report['rolling'])
+
+    # 2. Opponents analysis
+    _plot_opponent_analysis(plt.subplot(2, 2, 2), report['opponent_stats'])
+
+    # 3. WAR component breakdown
+    _plot_war_components(plt.subplot(2, 2, 3), report['components'], report['position_weights'])
+
+    # 4. Teammate synergy
+    _plot_teammate_analysis(plt.subplot(2, 2, 4), report['teammates'])
+
+    plt.tight_layout(rect=[0, 0, 1, 0.95])  # Adjust for title
+    plt.savefig(path)
+
+
+def _plot_war_by_game(ax, history, rolling):
+    """Plot WAR components for each game."""
+    games = range(1, len(history['match_id']) + 1)
+
+    # Plot stacked bars for components
+    ax.bar(games, history['offensive_war'], label='Offensive', color='#1f77b4')
+    ax.bar(games, history['defensive_war'], bottom=history['offensive_war'],
+        label='Defensive', color='#ff7f0e')
+    ax.bar(games, history['teamplay_war'],
+        bottom=history['offensive_war'] + history['defensive_war'],
+        label='Teamplay', color='#2ca02c')
+
+    # Add total WAR line and 5-game form
+    ax.plot(games, history['war_value'], 'k--', label='Total WAR')
+    ax.plot(games, rolling['war_value'], color='#9467bd', label='5-game avg')
+
+    ax.set_title('WAR Components by Game')
+    ax.set_xlabel('Game Number')
+    ax.set_ylabel('WAR Value')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    ax.axhline(y=0, color='red', linestyle='--', alpha=0.3)
+
+
+def _plot_opponent_analysis(ax, opponent_stats):
+    """Plot player performance against different opponents."""
+    if opponent_stats is None:
+        ax.text(0.5, 0.5, "Opponent data not available",
+                ha='center', va='center', fontsize=12)
+        ax.set_title('Performance vs Opponents')
+        return
+
+    if len(opponent_stats) == 0:
+        ax.text(0.5, 0.5, "Insufficient opponent data\n(need 2+ games vs same opponent)",
+                ha='center', va='center', fontsize=12)
+        ax.set_title('Performance vs Opponents')
+        return
+
+    # Create stacked bar chart
+    y_pos = range(len(opponent_stats))
+
+    # Plot stacked components
+    ax.barh(y_pos, opponent_stats['offensive_war_mean'], color='#1f77b4', label='Offensive')
+    ax.barh(y_pos, opponent_stats['defensive_war_mean'],
+           left=opponent_stats['offensive_war_mean'], color='#ff7f0e', label='Defensive')
+    ax.barh(y_pos, opponent_stats['teamplay_war_mean'],
+           left=opponent_stats['offensive_war_mean'] + opponent_stats['defensive_war_mean'],
+           color='#2ca02c', label='Teamplay')
+
+    # Set y-tick labels to opponent names
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels([f"{team} ({count})" for team, count in
+                       zip(opponent_stats['opponent_team'], opponent_stats['war_value_count'])])
+
+    ax.set_title('Average WAR Against Opponents')
+    ax.set_xlabel('WAR Value')
+    ax.axvline(x=0, color='red', linestyle='--', alpha=0.3)
+    ax.legend(loc='lower right')
+    ax.grid(True, axis='x', alpha=0.3)
+
+
+def _plot_war_components(ax, components, weights):
+    """Create a pie chart showing WAR component breakdown for the player."""
+    # Handle negative values for pie chart (can't show negative in pie)
+    values = []
+    labels = []
+    colors = []
+    for component, label, color in (('offensive_war', 'Offensive', '#1f77b4'),
+                                    ('defensive_war', 'Defensive', '#ff7f0e'),
+                                    ('teamplay_war', 'Teamplay', '#2ca02c')):
+        if components[component] > 0:
+            values.append(components[component])
+            labels.append(f'{label} ({components[component]:.2f})')
+            colors.append(color)
+
+    # Create pie chart if we have positive components
+    if sum(values) > 0:
+        ax.pie(values, labels=labels, colors=colors, autopct='%1.1f%%',
+              startangle=90, shadow=True)
+        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+    else:
+        ax.text(0.5, 0.5, "No positive WAR components",
+                ha='center', va='center', fontsize=12)
+
+    ax.set_title(f'WAR Component Breakdown - Total: {components["war_value"]:.2f}')
+
+    # Add position weights as a text note
+    if weights is not None:
+        weight_text = f"Position Weights: Off={weights['offensive']:.2f}, Def={weights['defensive']:.2f}, Team={weights['teamplay']:.2f}"
+        ax.text(0.5, -0.1, weight_text, transform=ax.transAxes, ha='center', fontsize=9)
+
+
+def _plot_teammate_analysis(ax, teammates):
+    """Plot the player's best and worst teammates by average WAR together."""
+    if len(teammates) == 0:
+        ax.text(0.5, 0.5, "Insufficient teammate data\n(need 3+ games with teammates)",
+                ha='center', va='center', fontsize=12)
+        ax.set_title('Teammate Analysis')
+        return
+
+    # Create bar chart
+    y_pos = range(len(teammates))
+    bars = ax.barh(y_pos, teammates['teammate_avg_war'], color='#1f77b4')
+
+    # Color bars based on positive/negative
+    for i, bar in enumerate(bars):
+        if teammates.iloc[i]['teammate_avg_war'] < 0:
+            bar.set_color('#d62728')  # Red for negative
+
+    # Add game count annotations
+    for i, bar in enumerate(bars):
+        ax.text(
+            0.5 if bar.get_width() < 0 else bar.get_width() + 0.2,
+            bar.get_y() + bar.get_height()/2,
+            f"({teammates.iloc[i]['games_together']} games)",
+            va='center', fontsize=8
+        )
+
+    # Set y-tick labels to teammate names
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(teammates['teammate_name'])
+
+    ax.set_title('Teammate Performance')
+    ax.set_xlabel('Average WAR Value')
+    ax.axvline(x=0, color='red', linestyle='--', alpha=0.3)
+    ax.grid(True, axis='x', alpha=0.3)
+
+
+def plot_elbow_curve(sweep, path):
+    """Elbow curve of the KMeans k-sweep (inertia indexed by k)."""
+    plt.figure(figsize=(10, 6))
+    plt.plot(sweep.index, sweep['inertia'], marker='o')
+    plt.title('Elbow Method for Optimal Clusters')
+    plt.xlabel('Number of Clusters')
+    plt.ylabel('WCSS (Within-Cluster Sum of Squares)')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_player_clusters(projection, path):
+    """
+    Scatter of the players' 2D PCA projection colored by cluster.
+
+    Parameters:
+    -----------
+    projection : dict
+        ``coords`` (players x 2), ``clusters``, ``explained_variance`` and ``labels``
+        (player name -> coords row) of the players to annotate.
+    path : str
+        Output image path.
+    """
+    coords = projection['coords']
+    clusters = np.asarray(projection['clusters'])
+    plt.figure(figsize=(12, 8))
+
+    # Plot each cluster
+    for cluster in sorted(np.unique(clusters)):
+        cluster_points = coords[clusters == cluster]
+        plt.scatter(
+            cluster_points[:, 0],
+            cluster_points[:, 1],
+            label=f'Cluster {cluster} (n={len(cluster_points)})'
+        )
+
+    # Annotate some top players
+    for player_name, idx in projection['labels']:
+        plt.annotate(player_name, (coords[idx, 0], coords[idx, 1]), fontsize=8)
+
+    explained = projection['explained_variance']
+    plt.title('Player Clusters (PCA Visualization)')
+    plt.xlabel(f'Principal Component 1 ({explained[0]:.2%} variance)')
+    plt.ylabel(f'Principal Component 2 ({explained[1]:.2%} variance)')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_cluster_radar(cluster_profiles, path):
+    """Radar chart of the standardized feature means of each cluster."""
+    features = list(cluster_profiles.columns)
+    angles = np.linspace(0, 2*np.pi, len(features), endpoint=False).tolist()
+    angles += angles[:1]  # Close the circle
+
+    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(polar=True))
+
+    # Add feature labels
+    plt.xticks(angles[:-1], features, size=12)
+
+    # Plot each cluster
+    for cluster in sorted(cluster_profiles.index):
+        values = cluster_profiles.loc[cluster].values.tolist()
+        values += values[:1]  # Close the circle
+
+        ax.plot(angles, values, linewidth=2, label=f'Cluster {cluster}')
+        ax.fill(angles, values, alpha=0.1)
+
+    plt.title('Cluster Profiles', size=15)
+    plt.legend(loc='upper right')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_feature_importance(importance, path):
+    """Bar chart of the WAR prediction model's feature importances."""
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x='importance', y='feature', data=importance)
+    plt.title('Feature Importance for WAR Prediction')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_actual_vs_predicted(results, path):
+    """Scatter of actual against predicted WAR on the test set."""
+    y_test = results['actual_war']
+    plt.figure(figsize=(10, 8))
+    plt.scatter(y_test, results['predicted_war'], alpha=0.5)
+    plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'k--')
+    plt.xlabel('Actual WAR')
+    plt.ylabel('Predicted WAR')
+    plt.title('Actual vs Predicted WAR')
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def plot_position_importance(imp_df, path):
+    """Heatmap of feature importance (rows) by position (columns)."""
+    plt.figure(figsize=(12, 8))
+    sns.heatmap(imp_df, cmap='viridis', annot=True, fmt='.2f')
+    plt.title('Feature Importance by Position')
+    plt.tight_layout()
+    plt.savefig(path)
@@ -7,60 +7,79 @@ including clustering, prediction, position-specific analysis, and player similar
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.decomposition import PCA
 import os
 
+from src.analytics import SimilarityIndex, SIMILARITY_INDEX_FILE, artifact_path
+from src.analytics import kmeans_k_sweep, fit_kmeans, cross_validate_models, ModelRegistry
+from src.analytics import FeatureStore, PlayerProjection, projection_path, RenderQueue
+from src.analytics import ArchetypeModel, ARCHETYPES_FILE
+
+from src.in_progress.war_charts import (
+    plot_elbow_curve, plot_player_clusters, plot_cluster_radar,
+    plot_feature_importance, plot_actual_vs_predicted, plot_position_importance,
+)
+
 
 class WARAnalytics:
     """Machine learning analytics for hockey WAR data."""
     
-    def __init__(self, data_path='player_war_results.csv'):
-        """Initialize with path to the player WAR data CSV."""
+    def __init__(self, data_path='player_war_results.csv', render_charts=None):
+        """
+        Initialize with path to the player WAR data CSV.
+        
+        Charts are rendered in background worker processes; ``render_charts=False``
+        (or ``WAR_RENDER_CHARTS=0``) skips them entirely.
+        """
         self.data_path = data_path
+        self.charts = RenderQueue(enabled=render_charts)
+        self.feature_store = None
         self.player_data = None
         self.scaled_data = None
         self.cluster_model = None
+        self.archetypes = None
         self.prediction_model = None
         self.position_models = {}
-        self.similarity_matrix = None
+        self.similarity_index = None
         
         # Create output directory
         os.makedirs('ml_outputs', exist_ok=True)
         
     def load_data(self):
-        """Load and preprocess player data."""
-        self.player_data = pd.read_csv(self.data_path)
-        print(f"Loaded data for {len(self.player_data)} players")
+        """
+        Load player data from the feature store.
         
-        # Add derived metrics if needed
-        if 'war_per_game' not in self.player_data.columns:
-            self.player_data['war_per_game'] = self.player_data['war_value'] / self.player_data['games_played']
+        Derived features (war_per_game, position index, standardized columns) are
+        materialized once per WAR run; the store is rebuilt automatically when the
+        results file changes.
+        """
+        self.feature_store = FeatureStore.for_results(self.data_path)
+        print(f"Loaded data for {len(self.feature_store)} players (features {self.feature_store.version})")
         
-        # Filter to players with minimum games
-        min_games = 3
-        self.player_data = self.player_data[self.player_data['games_played'] >= min_games]
-        print(f"Filtered to {len(self.player_data)} players with {min_games}+ games")
+        # Keep players with the minimum number of games
+        self.player_data = self.feature_store.to_frame(qualified_only=True)
+        print(f"Filtered to {len(self.player_data)} players with 3+ games")
         
         return self.player_data
     
-    def run_clustering_analysis(self, n_clusters=None, cluster_features=None):
+    def run_clustering_analysis(self, n_clusters=None, cluster_features=None, minibatch=False):
         """
         Perform player clustering to identify archetypes.
         
+        The k-sweep for the elbow curve is fitted in parallel and cached per feature set
+        and dataset, and fits warm-start from the centroids of the previous run. The final
+        centroids are saved as the archetype model used to label players between runs.
+        
         Parameters:
         -----------
         n_clusters : int, optional
             Number of clusters to use. If None, determine automatically.
         cluster_features : list, optional
             Features to use for clustering. If None, use default set.
+        minibatch : bool, optional
+            Use MiniBatchKMeans, which is much faster for large player sets.
         """
         if self.player_data is None:
             self.load_data()
@@ -79,27 +98,20 @@ class WARAnalytics:
             
         print(f"Running clustering with features: {valid_features}")
         
-        # Scale the data
-        scaler = StandardScaler()
-        self.scaled_data = scaler.fit_transform(self.player_data[valid_features])
+        # Standardized features are precomputed in the feature store
+        self.scaled_data = self.feature_store.scaled(valid_features)
         
         # Determine optimal number of clusters if not specified
         if n_clusters is None:
-            wcss = []
             max_clusters = min(10, len(self.player_data) // 5)  # Reasonable max
-            for i in range(1, max_clusters + 1):
-                kmeans = KMeans(n_clusters=i, random_state=42, n_init=10)
-                kmeans.fit(self.scaled_data)
-                wcss.append(kmeans.inertia_)
+            sweep = kmeans_k_sweep(
+                self.scaled_data, range(1, max_clusters + 1), valid_features, minibatch=minibatch
+            )
+            sweep.to_csv('ml_outputs/k_sweep.csv')
+            wcss = sweep['inertia'].tolist()
                 
             # Plot the elbow curve
-            plt.figure(figsize=(10, 6))
-            plt.plot(range(1, max_clusters + 1), wcss, marker='o')
-            plt.title('Elbow Method for Optimal Clusters')
-            plt.xlabel('Number of Clusters')
-            plt.ylabel('WCSS (Within-Cluster Sum of Squares)')
-            plt.tight_layout()
-            plt.savefig('ml_outputs/elbow_curve.png')
+            self.charts.submit(plot_elbow_curve, sweep[['inertia']], 'ml_outputs/elbow_curve.png')
             
             # Simple elbow detection
             diffs = np.diff(wcss)
@@ -108,8 +120,17 @@ class WARAnalytics:
             print(f"Automatic elbow detection suggests {n_clusters} clusters")
         
         # Fit the KMeans model
-        self.cluster_model = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        self.player_data['cluster'] = self.cluster_model.fit_predict(self.scaled_data)
+        self.cluster_model = fit_kmeans(self.scaled_data, n_clusters, valid_features, minibatch=minibatch)
+        self.player_data['cluster'] = self.cluster_model.labels_
+        
+        # Store the centroids with their scaling, so the WAR job and the stats API can
+        # assign archetypes to new players without refitting
+        self.archetypes = ArchetypeModel.from_kmeans(
+            self.cluster_model, self.feature_store.scaler(valid_features), valid_features,
+            source=self.feature_store.version,
+        )
+        self.archetypes.save(artifact_path(ARCHETYPES_FILE))
+        print(f"Archetype centroids saved to {artifact_path(ARCHETYPES_FILE)}")
         
         # Analyze cluster characteristics
         self._analyze_clusters(valid_features)
@@ -142,37 +163,20 @@ class WARAnalytics:
         print("\nPosition Distribution by Cluster (%):")
         print(pos_distribution.round(1))
         
-        # Visualize clusters (PCA to 2D for visualization)
-        pca = PCA(n_components=2)
-        pca_result = pca.fit_transform(self.scaled_data)
-        
-        plt.figure(figsize=(12, 8))
+        # Visualize clusters (2D projection, cached with the feature store and served by the stats API)
+        projection = PlayerProjection.for_store(self.feature_store, 'clusters', features)
+        projection.clusters = self.player_data['cluster'].to_numpy()
+        projection.save(projection_path(self.feature_store, 'clusters'))
         
-        # Plot each cluster
-        for cluster in sorted(self.player_data['cluster'].unique()):
-            cluster_points = pca_result[self.player_data['cluster'] == cluster]
-            plt.scatter(
-                cluster_points[:, 0], 
-                cluster_points[:, 1],
-                label=f'Cluster {cluster} (n={len(cluster_points)})'
-            )
-            
         # Annotate some top players
         top_players = self.player_data.nlargest(10, 'war_value')
-        for _, player in top_players.iterrows():
-            idx = self.player_data.index.get_loc(player.name)
-            plt.annotate(
-                player['player_name'],
-                (pca_result[idx, 0], pca_result[idx, 1]),
-                fontsize=8
-            )
-            
-        plt.title('Player Clusters (PCA Visualization)')
-        plt.xlabel(f'Principal Component 1 ({pca.explained_variance_ratio_[0]:.2%} variance)')
-        plt.ylabel(f'Principal Component 2 ({pca.explained_variance_ratio_[1]:.2%} variance)')
-        plt.legend()
-        plt.tight_layout()
-        plt.savefig('ml_outputs/player_clusters.png')
+        self.charts.submit(plot_player_clusters, {
+            'coords': projection.coords,
+            'clusters': projection.clusters,
+            'explained_variance': projection.explained_variance,
+            'labels': [(player['player_name'], self.player_data.index.get_loc(player.name))
+                       for _, player in top_players.iterrows()],
+        }, 'ml_outputs/player_clusters.png')
         
         # Radar chart for cluster profiles
         self._plot_cluster_radar(features)
@@ -205,29 +209,7 @@ class WARAnalytics:
             columns=cluster_profiles.columns
         )
         
-        # Set up the radar chart
-        n_clusters = len(cluster_profiles)
-        n_features = len(features)
-        angles = np.linspace(0, 2*np.pi, n_features, endpoint=False).tolist()
-        angles += angles[:1]  # Close the circle
-        
-        fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(polar=True))
-        
-        # Add feature labels
-        plt.xticks(angles[:-1], features, size=12)
-        
-        # Plot each cluster
-        for cluster in sorted(cluster_profiles_scaled.index):
-            values = cluster_profiles_scaled.loc[cluster].values.tolist()
-            values += values[:1]  # Close the circle
-            
-            ax.plot(angles, values, linewidth=2, label=f'Cluster {cluster}')
-            ax.fill(angles, values, alpha=0.1)
-            
-        plt.title('Cluster Profiles', size=15)
-        plt.legend(loc='upper right')
-        plt.tight_layout()
-        plt.savefig('ml_outputs/cluster_radar.png')
+        self.charts.submit(plot_cluster_radar, cluster_profiles_scaled, 'ml_outputs/cluster_radar.png')
     
     def build_war_prediction_model(self, features=None, test_size=0.25):
         """
@@ -270,19 +252,16 @@ class WARAnalytics:
             X, y, test_size=test_size, random_state=42
         )
         
-        # Train multiple models and select best
-        models = {
-            'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42),
-            'Gradient Boosting': GradientBoostingRegressor(random_state=42)
-        }
+        # Cross-validate and fit every candidate model at once across all cores
+        model_names = ['Random Forest', 'Gradient Boosting']
+        trained = cross_validate_models({'all': (X_train, y_train)}, model_names)
         
         best_model = None
         best_score = -np.inf
         cv_results = {}
         
-        for name, model in models.items():
-            # Cross-validation
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='r2')
+        for name in model_names:
+            cv_scores = trained[('all', name)]['cv_scores']
             cv_results[name] = {
                 'mean_cv_score': cv_scores.mean(),
                 'std_cv_score': cv_scores.std()
@@ -290,13 +269,11 @@ class WARAnalytics:
             
             print(f"{name} CV R²: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
             
-            # Track best model
+            # Track best model (already fitted on the full training set)
             if cv_scores.mean() > best_score:
                 best_score = cv_scores.mean()
-                best_model = model
+                best_model = trained[('all', name)]['model']
                 
-        # Train best model on full training set
-        best_model.fit(X_train, y_train)
         self.prediction_model = best_model
         
         # Evaluate on test set
@@ -312,6 +289,15 @@ class WARAnalytics:
         print(f"RMSE: {metrics['rmse']:.4f}")
         print(f"MAE: {metrics['mae']:.4f}")
         
+        # Register the model so the stats API can serve predictions from it
+        version = ModelRegistry().register(
+            'war_regressor',
+            best_model,
+            features=valid_features,
+            metadata={'model': type(best_model).__name__, 'cv_results': cv_results, 'test_metrics': metrics},
+        )
+        print(f"Registered war_regressor version {version}")
+        
         # Feature importance
         if hasattr(best_model, 'feature_importances_'):
             importance = pd.DataFrame({
@@ -323,25 +309,11 @@ class WARAnalytics:
             print(importance)
             
             # Visualize feature importance
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x='importance', y='feature', data=importance)
-            plt.title('Feature Importance for WAR Prediction')
-            plt.tight_layout()
-            plt.savefig('ml_outputs/feature_importance.png')
+            self.charts.submit(plot_feature_importance, importance, 'ml_outputs/feature_importance.png')
             
             # Save feature importance to file
             importance.to_csv('ml_outputs/feature_importance.csv', index=False)
         
-        # Plot actual vs predicted
-        plt.figure(figsize=(10, 8))
-        plt.scatter(y_test, y_pred, alpha=0.5)
-        plt.plot([y_test.min(), y_test.max()], [y_test.min(), y_test.max()], 'k--')
-        plt.xlabel('Actual WAR')
-        plt.ylabel('Predicted WAR')
-        plt.title('Actual vs Predicted WAR')
-        plt.tight_layout()
-        plt.savefig('ml_outputs/actual_vs_predicted.png')
-        
         # Identify players where model struggles
         test_results = pd.DataFrame({
             'player_name': self.player_data.loc[X_test.index, 'player_name'],
@@ -351,6 +323,12 @@ class WARAnalytics:
             'error': y_test - y_pred
         })
         
+        # Plot actual vs predicted
+        self.charts.submit(
+            plot_actual_vs_predicted, test_results[['actual_war', 'predicted_war']],
+            'ml_outputs/actual_vs_predicted.png'
+        )
+        
         # Largest overestimates and underestimates
         print("\nLargest prediction errors:")
         print(test_results.nlargest(5, 'error')[['player_name', 'position', 'actual_war', 'predicted_war', 'error']])
@@ -391,7 +369,8 @@ class WARAnalytics:
         # Store importance by position
         position_importance = {}
         
-        # Build model for each position
+        # Collect the data for every position with enough players
+        datasets = {}
         for position in self.player_data['detailed_position'].unique():
             # Filter to this position
             position_df = self.player_data[self.player_data['detailed_position'] == position]
@@ -401,22 +380,18 @@ class WARAnalytics:
                 print(f"Skipping {position} (only {len(position_df)} players, need {min_players})")
                 continue
                 
-            print(f"\nBuilding model for {position} ({len(position_df)} players)")
-            
-            # Prepare data
-            X = position_df[valid_features]
-            y = position_df['war_value']
-            
-            # Train model
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
+            datasets[position] = (position_df[valid_features], position_df['war_value'])
+        
+        # Cross-validate and fit all positions at once across all cores
+        trained = cross_validate_models(datasets, ['Random Forest'])
+        
+        for position, (X, y) in datasets.items():
+            print(f"\nBuilt model for {position} ({len(X)} players)")
             
-            # Cross-validation
-            cv_scores = cross_val_score(model, X, y, cv=5, scoring='r2')
+            model = trained[(position, 'Random Forest')]['model']
+            cv_scores = trained[(position, 'Random Forest')]['cv_scores']
             print(f"CV R² for {position}: {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
             
-            # Train on full position dataset
-            model.fit(X, y)
-            
             # Store model
             self.position_models[position] = {
                 'model': model,
@@ -425,8 +400,8 @@ class WARAnalytics:
             }
             
             # Feature importance
-            if hasattr(model, 'feature_importances_'):
-                importance = dict(zip(valid_features, model.feature_importances_))
+            importance = trained[(position, 'Random Forest')]['feature_importances']
+            if importance is not None:
                 position_importance[position] = importance
                 
                 # Sort and display
@@ -440,11 +415,7 @@ class WARAnalytics:
             imp_df = pd.DataFrame(position_importance)
             
             # Visualize as heatmap
-            plt.figure(figsize=(12, 8))
-            sns.heatmap(imp_df, cmap='viridis', annot=True, fmt='.2f')
-            plt.title('Feature Importance by Position')
-            plt.tight_layout()
-            plt.savefig('ml_outputs/position_importance.png')
+            self.charts.submit(plot_position_importance, imp_df, 'ml_outputs/position_importance.png')
             
             # Save to file
             imp_df.to_csv('ml_outputs/position_importance.csv')
@@ -455,6 +426,10 @@ class WARAnalytics:
         """
         Build a player similarity engine using cosine similarity.
         
+        Players are stored as normalized vectors in a SimilarityIndex, so only the
+        top matches are computed per query instead of a full player x player matrix.
+        The index is saved to the WAR artifacts directory for the API.
+        
         Parameters:
         -----------
         features : list, optional
@@ -462,8 +437,8 @@ class WARAnalytics:
             
         Returns:
         --------
-        similarity_matrix : np.ndarray
-            Matrix of player similarities
+        similarity_index : SimilarityIndex
+            Index of player feature vectors
         """
         if self.player_data is None:
             self.load_data()
@@ -482,12 +457,21 @@ class WARAnalytics:
             
         print(f"Building similarity engine with features: {valid_features}")
         
-        # Scale the data
-        scaler = StandardScaler()
-        similarity_data = scaler.fit_transform(self.player_data[valid_features])
-        
-        # Calculate similarity matrix
-        self.similarity_matrix = cosine_similarity(similarity_data)
+        # Standardized features are precomputed in the feature store
+        similarity_data = self.feature_store.scaled(valid_features)
+        scaler = self.feature_store.scaler(valid_features)
+        
+        # Index normalized vectors instead of materializing every pairwise similarity
+        self.similarity_index = SimilarityIndex.from_features(
+            similarity_data,
+            player_names=self.player_data['player_name'].astype(str).tolist(),
+            positions=self.player_data['detailed_position'].astype(str).tolist(),
+            war_values=self.player_data['war_value'].to_numpy(),
+            features=valid_features,
+            scaler_mean=scaler.mean_,
+            scaler_scale=scaler.scale_,
+        )
+        self.similarity_index.save(artifact_path(SIMILARITY_INDEX_FILE))
         
         # Create a function to find similar players
         with open('ml_outputs/player_similarity_examples.txt', 'w') as f:
@@ -505,7 +489,7 @@ class WARAnalytics:
                     f.write(f"    {similar['player_name']} ({similar['detailed_position']}) - "
                             f"WAR: {similar['war_value']:.2f}, Similarity: {similar['similarity']:.2%}\n")
         
-        return self.similarity_matrix
+        return self.similarity_index
     
     def find_similar_players(self, player_name, n=5, include_position=False):
         """
@@ -524,37 +508,18 @@ class WARAnalytics:
         --------
         DataFrame : Similar players with similarity scores
         """
-        if self.similarity_matrix is None:
+        if self.similarity_index is None:
             self.build_player_similarity_engine()
             
-        # Find player index
-        if player_name not in self.player_data['player_name'].values:
-            raise ValueError(f"Player {player_name} not found in data")
-            
-        player_idx = self.player_data[self.player_data['player_name'] == player_name].index[0]
-        player_position = self.player_data.loc[player_idx, 'detailed_position']
+        matches = self.similarity_index.query(player_name, k=n, same_position=include_position)
         
-        # Get similarities to this player
-        similarities = self.similarity_matrix[player_idx]
-        
-        # Create DataFrame with players and similarities
-        similar_df = pd.DataFrame({
-            'index': self.player_data.index,
-            'player_name': self.player_data['player_name'],
-            'detailed_position': self.player_data['detailed_position'],
-            'war_value': self.player_data['war_value'],
-            'similarity': similarities
-        })
-        
-        # Filter out the player themselves
-        similar_df = similar_df[similar_df['index'] != player_idx]
-        
-        # Optionally filter to same position
-        if include_position:
-            similar_df = similar_df[similar_df['detailed_position'] == player_position]
-            
-        # Get top n similar players
-        return similar_df.nlargest(n, 'similarity')
+        # Map index rows back to the player_data labels
+        similar_df = pd.DataFrame(
+            matches, columns=['index', 'player_name', 'detailed_position', 'war_value', 'similarity']
+        )
+        similar_df['index'] = self.player_data.index[similar_df['index'].to_numpy()]
+        similar_df.index = similar_df['index'].to_numpy()
+        return similar_df
     
     def run_full_analysis(self):
         """Run all analysis methods and generate reports."""
@@ -579,17 +544,22 @@ class WARAnalytics:
         print("\n--- Player Similarity Engine ---")
         self.build_player_similarity_engine()
         
-        print("\nAnalysis complete! Results saved to ml_outputs/ directory")
-        
         # Generate summary report
         self._generate_summary_report()
         
+        # Wait for the charts queued by the analyses
+        failed = self.charts.close()
+        for path, error in failed.items():
+            print(f"Failed to render {path}: {error}")
+        
+        print("\nAnalysis complete! Results saved to ml_outputs/ directory")
+        
         return {
             'player_data': self.player_data,
             'cluster_model': self.cluster_model,
             'prediction_model': self.prediction_model,
             'position_models': self.position_models,
-            'similarity_matrix': self.similarity_matrix
+            'similarity_index': self.similarity_index
         }
     
     def _generate_summary_report(self):
@@ -647,6 +617,9 @@ class WARAnalytics:
 
 
 if __name__ == "__main__":
+    # Inputs and outputs of the analysis live next to this script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
     # Create analytics instance
     analytics = WARAnalytics('player_war_results.csv')
     
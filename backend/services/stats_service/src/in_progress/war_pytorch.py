@@ -2,7 +2,6 @@ import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import torch
 import torch.nn as nn
@@ -11,6 +10,12 @@ from torch.utils.data import DataLoader, TensorDataset
 import torch.nn.functional as F
 from sklearn.metrics import r2_score, mean_squared_error
 
+from src.analytics import SimilarityIndex, EMBEDDING_INDEX_FILE, artifact_path, ModelRegistry
+from src.analytics import FeatureStore, POSITION_ORDER, PlayerProjection, projection_path
+
+# Position names by index of the position embedding
+POSITIONS = POSITION_ORDER
+
 # Set random seeds for reproducibility
 np.random.seed(42)
 torch.manual_seed(42)
@@ -103,37 +108,26 @@ class PlayerEmbeddingNet(nn.Module):
         return embeddings, reconstructed
 
 def load_and_preprocess_data(csv_path):
-    """Load and preprocess the WAR data from CSV."""
-    df = pd.read_csv(csv_path)
+    """Load the WAR data and its precomputed features from the feature store."""
+    store = FeatureStore.for_results(csv_path)
     
-    # Filter to players with enough games (e.g., 3+)
-    df = df[df['games_played'] >= 3].copy()
-    
-    # Convert position to numerical index
-    positions = ['leftWing', 'center', 'goalie', 'rightWing', 'rightDefense', 'leftDefense']
-    position_map = {pos: i for i, pos in enumerate(positions)}
-    df['position_idx'] = df['detailed_position'].map(position_map)
+    # Keep players with enough games (3+)
+    df = store.to_frame(qualified_only=True)
     
     # Select features and targets
     features = ['skgoals', 'skassists', 'skplusmin', 'points', 'games_played']
     targets = ['war_value', 'offensive_war', 'defensive_war', 'teamplay_war']
     
-    # Handle missing values (replace with 0 for goalies)
-    for col in features:
-        if col not in ['games_played']:  # Keep games_played as is
-            df[col] = df[col].fillna(0)  # Fill NaN with 0 (for goalie skater stats)
-    
-    # Split data
-    X = df[features].values
+    # Missing values (goalie skater stats) are already filled with 0 in the store
+    X_scaled = store.scaled(features)
     y = df[targets].values
-    position_idx = df['position_idx'].values
+    position_idx = df['position_idx'].values.astype(np.int64)
     player_names = df['player_name'].values
     
-    # Scale features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    # Scaler matching the stored standardization, for scoring new players
+    scaler = store.scaler(features)
     
-    return X_scaled, y, position_idx, player_names, df, features, targets
+    return X_scaled, y, position_idx, player_names, df, features, targets, scaler
 
 def train_multitask_model(X, y, position_idx, batch_size=16, epochs=100, lr=0.001):
     """Train the position-aware multi-task WAR model."""
@@ -261,13 +255,12 @@ def train_embedding_model(X, position_idx, player_names, batch_size=16, epochs=5
 
 def visualize_embeddings(embeddings, player_names, position_idx, top_n=20, save_path=None):
     """Visualize player embeddings in 2D space."""
-    positions = ['leftWing', 'center', 'goalie', 'rightWing', 'rightDefense', 'leftDefense']
     colors = ['#ff7f0e', '#1f77b4', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
     
     plt.figure(figsize=(12, 10))
     
     # Plot all players
-    for i, pos in enumerate(positions):
+    for i, pos in enumerate(POSITIONS):
         mask = position_idx == i
         plt.scatter(embeddings[mask, 0], embeddings[mask, 1], 
                     color=colors[i], label=pos, alpha=0.7)
@@ -309,15 +302,14 @@ def find_similar_players(embeddings, player_names, position_idx, query_player, t
     closest_indices = np.argsort(distances)[1:top_n+1]
     
     # Position and WAR info
-    positions = ['leftWing', 'center', 'goalie', 'rightWing', 'rightDefense', 'leftDefense']
-    query_position = positions[position_idx[query_idx]]
+    query_position = POSITIONS[position_idx[query_idx]]
     query_war = y[query_idx, 0]
     
     print(f"\nPlayers similar to {query_player} ({query_position}, WAR: {query_war:.2f}):")
     
     for idx in closest_indices:
         player = player_names[idx]
-        position = positions[position_idx[idx]]
+        position = POSITIONS[position_idx[idx]]
         war = y[idx, 0]
         similarity = 1 - (distances[idx] / np.max(distances))  # Normalized similarity
         
@@ -331,8 +323,8 @@ def run_pytorch_war_analysis(csv_path='player_war_results.csv', output_dir='pyto
     os.makedirs(output_dir, exist_ok=True)
     
     # Load and preprocess data
-    global X, y, position_idx, player_names, df, features, targets
-    X, y, position_idx, player_names, df, features, targets = load_and_preprocess_data(csv_path)
+    global X, y, position_idx, player_names, df, features, targets, scaler
+    X, y, position_idx, player_names, df, features, targets, scaler = load_and_preprocess_data(csv_path)
     
     print(f"Loaded data for {len(player_names)} players")
     
@@ -343,6 +335,18 @@ def run_pytorch_war_analysis(csv_path='player_war_results.csv', output_dir='pyto
     # Save model
     torch.save(multitask_model.state_dict(), os.path.join(output_dir, 'multitask_model.pt'))
     
+    # Register the model with its scaler so the stats API can serve predictions from it
+    version = ModelRegistry().register(
+        'war_multitask',
+        multitask_model,
+        features=features,
+        targets=targets,
+        scaler=scaler,
+        positions=POSITIONS,
+        outputs=['total_war', 'offensive_war', 'defensive_war', 'teamplay_war'],
+    )
+    print(f"Registered war_multitask version {version}")
+    
     # Train embedding model
     print("\n--- Training Player Embedding Model ---")
     embedding_model, embeddings, player_names, position_idx = train_embedding_model(X, position_idx, player_names)
@@ -350,9 +354,31 @@ def run_pytorch_war_analysis(csv_path='player_war_results.csv', output_dir='pyto
     # Save model
     torch.save(embedding_model.state_dict(), os.path.join(output_dir, 'embedding_model.pt'))
     
+    # Publish the embeddings for the stats API, which swaps in the new index on its next request.
+    # Ranked by Euclidean distance, like find_similar_players: the embeddings are 2D
+    # autoencoder codes, so cosine would only compare their angle around the origin
+    embedding_index = SimilarityIndex.from_features(
+        embeddings,
+        player_names=[str(name) for name in player_names],
+        positions=df['detailed_position'].astype(str).tolist(),
+        war_values=y[:, 0],
+        features=[f'embedding_{i}' for i in range(embeddings.shape[1])],
+        source='embedding',
+        metric='euclidean',
+    )
+    embedding_index.save(artifact_path(EMBEDDING_INDEX_FILE))
+    
+    # Save the 2D coordinates with the feature store, for the stats API's scatter plots
+    store = FeatureStore.for_results(csv_path)
+    projection = PlayerProjection.from_coords(
+        store, 'embedding', embeddings, rows=df.index.to_numpy(),
+        features=[f'embedding_{i}' for i in range(embeddings.shape[1])],
+    )
+    projection.save(projection_path(store, 'embedding'))
+    
     # Visualize embeddings
     print("\n--- Generating Player Embedding Visualization ---")
-    visualize_embeddings(embeddings, player_names, position_idx, save_path=os.path.join(output_dir, 'player_embeddings.png'))
+    visualize_embeddings(projection.coords, player_names, position_idx, save_path=os.path.join(output_dir, 'player_embeddings.png'))
     
     # Find similar players for top performers
     print("\n--- Finding Similar Players ---")
@@ -363,4 +389,7 @@ def run_pytorch_war_analysis(csv_path='player_war_results.csv', output_dir='pyto
     print("\nPyTorch WAR Analysis complete! Results saved to", output_dir)
 
 if __name__ == "__main__":
+    # Inputs and outputs of the analysis live next to this script
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
     run_pytorch_war_analysis()
\ No newline at end of file
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from src.analytics import ArchetypeModel
+
+
+def make_model():
+    X = np.array([[0.0, 0.0], [0.2, 0.1], [10.0, 10.0], [10.2, 9.9]])
+    scaler = StandardScaler().fit(X)
+    kmeans = KMeans(n_clusters=2, n_init=10, random_state=0).fit(scaler.transform(X))
+    return ArchetypeModel.from_kmeans(kmeans, scaler, ["goals", "assists"], source="v1"), kmeans, X
+
+
+def test_assignment_matches_kmeans():
+    model, kmeans, X = make_model()
+
+    labels, distances = model.assign(X)
+
+    np.testing.assert_array_equal(labels, kmeans.labels_)
+    assert model.assign_one({"goals": 10.0, "assists": 10.0})[0] == labels[2]
+    assert model.sizes.tolist() == [2, 2]
+    with pytest.raises(ValueError):
+        model.assign_one({"goals": 1.0})
+
+
+def test_profile_is_in_raw_units():
+    model, _, _ = make_model()
+    label = model.assign_one({"goals": 0.1, "assists": 0.05})[0]
+
+    assert model.profile(label) == pytest.approx({"goals": 0.1, "assists": 0.05})
+
+
+def test_round_trip(tmp_path):
+    model, _, X = make_model()
+    path = str(tmp_path / "archetypes.npz")
+    model.save(path)
+
+    loaded = ArchetypeModel.load(path)
+
+    assert loaded.features == model.features
+    assert loaded.version == model.version
+    assert loaded.source == "v1"
+    np.testing.assert_array_equal(loaded.assign(X)[0], model.assign(X)[0])
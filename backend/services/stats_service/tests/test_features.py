@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.analytics import FeatureStore, current_version, prune_versions
+from src.analytics.features import KEEP_VERSIONS, SCALED_PREFIX
+
+
+def make_results(war_value=4.0):
+    return pd.DataFrame({
+        "player_id": [1, 2, 3, 4],
+        "player_name": ["a", "b", "c", "d"],
+        "detailed_position": ["center", "goalie", "leftWing", "unknown"],
+        "games_played": [5, 1, 4, 3],
+        "war_value": [war_value, 1.0, 2.0, np.nan],
+        "skgoals": [3, 0, 1, 2],
+        "skassists": [1, 0, 2, 2],
+    })
+
+
+def test_round_trip(tmp_path):
+    root = str(tmp_path)
+    built = FeatureStore.build(make_results(), root=root, source="abc")
+
+    store = FeatureStore.open(root)
+
+    assert store.version == built.version == current_version(root)
+    assert store.source == "abc"
+    assert store.column("points").tolist() == [4, 0, 3, 4]
+    assert store.column("position_idx").tolist() == [1, 2, 0, -1]
+    assert store.qualified.tolist() == [True, False, True, True]
+    assert store.rows_of(3) == [2]
+    pd.testing.assert_frame_equal(store.to_frame(), built.to_frame())
+
+
+def test_scaler_reproduces_the_stored_standardization(tmp_path):
+    store = FeatureStore.build(make_results(), root=str(tmp_path))
+    features = ["skgoals", "war_value"]
+
+    raw = store.to_frame(features, qualified_only=True).to_numpy(dtype=float)
+
+    np.testing.assert_allclose(store.scaler(features).transform(raw), store.scaled(features))
+    np.testing.assert_allclose(
+        store.column(f"{SCALED_PREFIX}skgoals")[np.asarray(store.qualified)],
+        store.scaled(["skgoals"])[:, 0],
+    )
+
+
+def test_same_results_reuse_the_published_version(tmp_path):
+    root = str(tmp_path)
+    first = FeatureStore.build(make_results(), root=root)
+    inode = os.stat(os.path.join(first.directory, "war_value.npy")).st_ino
+
+    second = FeatureStore.build(make_results(), root=root, source="new")
+
+    assert second.version == first.version
+    assert second.source == "new"
+    assert os.stat(os.path.join(second.directory, "war_value.npy")).st_ino == inode
+
+
+def test_publishing_keeps_only_the_most_recent_versions(tmp_path):
+    root = str(tmp_path)
+    versions = [
+        FeatureStore.build(make_results(war_value=float(i)), root=root).version
+        for i in range(5)
+    ]
+
+    assert set(os.listdir(root)) == {"current.json", *versions[-KEEP_VERSIONS:]}
+
+
+def test_pruning_keeps_current_and_projected_versions(tmp_path):
+    root = str(tmp_path)
+    versions = []
+    for i in range(4):
+        versions.append(FeatureStore.build(make_results(war_value=float(i)), root=root).version)
+        if i == 0:
+            os.makedirs(os.path.join(root, versions[0], "projections"))
+    # An older version published again becomes current
+    FeatureStore.build(make_results(war_value=1.0), root=root)
+
+    deleted = prune_versions(root, keep=1)
+
+    assert deleted == [versions[2]]
+    assert set(os.listdir(root)) == {"current.json", versions[0], versions[1], versions[3]}
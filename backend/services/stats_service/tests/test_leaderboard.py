@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from src.analytics import LeaderboardIndex
+from src.analytics.leaderboard import decode_cursor, encode_cursor
+
+
+def make_index():
+    player_war = pd.DataFrame({
+        "player_id": [1, 2, 3, 4, 5],
+        "player_name": ["a", "b", "c", "d", "e"],
+        "detailed_position": ["center", "goalie", "center", "center", "goalie"],
+        "games_played": [10, 2, 8, 3, 9],
+        "war_value": [5.0, 4.0, 3.0, 2.0, 1.0],
+    })
+    index = LeaderboardIndex({})
+    index.update_season("2025", player_war)
+    return index
+
+
+def test_pages_follow_the_cursor_to_the_end():
+    index = make_index()
+
+    items, cursor = index.page(limit=2)
+    assert [item["player_name"] for item in items] == ["a", "b"]
+    items, cursor = index.page(limit=2, cursor=cursor)
+    assert [item["rank"] for item in items] == [3, 4]
+    items, cursor = index.page(limit=2, cursor=cursor)
+    assert [item["player_name"] for item in items] == ["e"]
+    assert cursor is None
+
+
+def test_min_games_ranks_only_qualifying_players():
+    index = make_index()
+
+    items, cursor = index.page(min_games=8, limit=2)
+    assert [(item["rank"], item["player_name"]) for item in items] == [(1, "a"), (2, "c")]
+    items, cursor = index.page(min_games=8, limit=2, cursor=cursor)
+    assert [(item["rank"], item["player_name"]) for item in items] == [(3, "e")]
+    assert cursor is None
+
+
+def test_position_pages_rank_within_the_position():
+    index = make_index()
+
+    items, _ = index.page(position="goalie")
+    assert [(item["rank"], item["player_name"]) for item in items] == [(1, "b"), (2, "e")]
+    assert index.positions("2025") == ["center", "goalie"]
+
+
+def test_round_trip(tmp_path):
+    index = make_index()
+    path = tmp_path / "leaderboard.json"
+    index.save(str(path))
+
+    loaded = LeaderboardIndex.load(str(path))
+
+    assert loaded.latest_season == "2025"
+    assert loaded.generated_at == index.generated_at
+    assert loaded.page(min_games=3, limit=10) == index.page(min_games=3, limit=10)
+
+
+def test_bad_cursor_and_season_are_rejected():
+    index = make_index()
+
+    assert decode_cursor(encode_cursor(7)) == 7
+    with pytest.raises(ValueError):
+        index.page(cursor="not-a-cursor")
+    with pytest.raises(KeyError):
+        index.page(season="1999")
@@ -0,0 +1,91 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from src.analytics import MicroBatcher, ModelRegistry
+
+
+def make_model():
+    X = np.array([[0.0, 1.0], [1.0, 0.0], [2.0, 2.0], [3.0, 1.0]])
+    y = X @ np.array([2.0, -1.0]) + 0.5
+    scaler = StandardScaler().fit(X)
+    return LinearRegression().fit(scaler.transform(X), y), scaler
+
+
+def test_round_trip_predicts_like_the_fitted_model(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    model, scaler = make_model()
+    version = registry.register(
+        "war_regressor", model, features=["a", "b"], scaler=scaler, metadata={"r2": 1.0}
+    )
+
+    loaded = registry.get("war_regressor")
+    predictions = loaded.predict_records([{"a": 1.0, "b": 1.0}, {"a": 0.0, "b": 0.0}])
+
+    assert loaded.version == version == registry.latest_version("war_regressor")
+    assert loaded.metadata == {"r2": 1.0}
+    assert [p["war_value"] for p in predictions] == pytest.approx([1.5, 0.5])
+
+
+def test_latest_follows_new_registrations(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    model, scaler = make_model()
+    first = registry.register("war_regressor", model, features=["a", "b"], scaler=scaler)
+    second = registry.register("war_regressor", model, features=["a", "b"])
+
+    assert registry.versions("war_regressor") == [first, second]
+    assert registry.get("war_regressor").version == second
+    assert registry.get("war_regressor", first).scaler is not None
+    with pytest.raises(FileNotFoundError):
+        registry.get("war_regressor", "missing")
+    with pytest.raises(ValueError):
+        registry.get("war_regressor").validate({"a": 1.0})
+
+
+def test_concurrent_requests_share_one_model_call():
+    calls = []
+
+    def predict_batch(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(predict_batch, max_wait_ms=20)
+        return await asyncio.gather(batcher.predict([1, 2]), batcher.predict([3]))
+
+    assert asyncio.run(run()) == [[2, 4], [6]]
+    assert calls == [[1, 2, 3]]
+
+
+def test_a_failing_request_does_not_fail_its_batch():
+    def predict_batch(items):
+        if None in items:
+            raise ValueError("bad item")
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(predict_batch, max_wait_ms=20)
+        return await asyncio.gather(
+            batcher.predict([1]), batcher.predict([None]), return_exceptions=True
+        )
+
+    good, bad = asyncio.run(run())
+    assert good == [2]
+    assert isinstance(bad, ValueError)
+
+
+def test_closed_batcher_answers_queued_requests_and_stops():
+    async def run():
+        batcher = MicroBatcher(lambda items: items, max_wait_ms=20)
+        pending = asyncio.ensure_future(batcher.predict([1]))
+        await asyncio.sleep(0)
+        batcher.close()
+        result = await pending
+        await asyncio.sleep(0.05)
+        return result, batcher._worker.done()
+
+    assert asyncio.run(run()) == ([1], True)
@@ -0,0 +1,70 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.analytics import SimilarityIndex
+
+NAMES = ["a", "b", "c", "d"]
+POSITIONS = ["center", "center", "goalie", "center"]
+
+
+def make_index(vectors, metric="cosine"):
+    return SimilarityIndex.from_features(
+        np.array(vectors, dtype=float),
+        player_names=NAMES,
+        positions=POSITIONS,
+        war_values=[1.0, 2.0, 3.0, 4.0],
+        features=["x", "y"],
+        metric=metric,
+    )
+
+
+def test_cosine_compares_directions():
+    index = make_index([[1, 0], [10, 0], [1, 1], [0, 1]])
+
+    matches = index.query("a", k=2)
+
+    assert [m["player_name"] for m in matches] == ["b", "c"]
+    assert matches[0]["similarity"] == pytest.approx(1.0)
+
+
+def test_euclidean_compares_positions():
+    index = make_index([[1, 0], [10, 0], [1, 1], [0, 1]], metric="euclidean")
+
+    matches = index.query("a", k=3)
+
+    assert [m["player_name"] for m in matches] == ["c", "d", "b"]
+    assert matches[0]["similarity"] == pytest.approx(0.5)
+
+
+def test_position_filter():
+    index = make_index([[1, 0], [10, 0], [1, 1], [0, 1]], metric="euclidean")
+
+    matches = index.query("a", k=3, same_position=True)
+
+    assert [m["player_name"] for m in matches] == ["d", "b"]
+
+
+def test_round_trip_names_the_vectors_file(tmp_path):
+    path = str(tmp_path / "similarity.json")
+    first = make_index([[1, 0], [10, 0], [1, 1], [0, 1]], metric="euclidean")
+    first.save(path)
+    with open(path) as f:
+        first_file = json.load(f)["vectors"]
+
+    second = make_index([[0, 1], [1, 1], [1, 0], [5, 5]], metric="euclidean")
+    second.save(path)
+    with open(path) as f:
+        second_file = json.load(f)["vectors"]
+    loaded = SimilarityIndex.load(path)
+
+    assert second_file != first_file
+    # The previous vectors stay for readers still opening them
+    assert sorted(os.listdir(tmp_path)) == sorted([first_file, second_file, "similarity.json"])
+    assert loaded.metric == "euclidean"
+    assert loaded.query("a", k=3) == second.query("a", k=3)
+
+    make_index([[2, 0], [1, 0], [0, 2], [1, 1]]).save(path)
+    assert first_file not in os.listdir(tmp_path)
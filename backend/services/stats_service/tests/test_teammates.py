@@ -0,0 +1,48 @@
+import pandas as pd
+
+from src.analytics import TeammateIndex
+
+
+def make_games():
+    # Match 1 is listed once per club that fetched it
+    return pd.DataFrame({
+        "match_id": [1, 1, 1, 1, 2, 2, 3, 3],
+        "club_id": [10, 10, 10, 10, 10, 10, 10, 20],
+        "player_id": [1, 2, 1, 2, 1, 3, 1, 2],
+        "player_name": ["a", "b", "a", "b", "a", "c", "a", "b"],
+        "war_value": [1.0, 0.5, 1.0, 0.5, 2.0, 0.25, 1.0, 1.0],
+    })
+
+
+def test_games_together_counts_each_roster_once():
+    index = TeammateIndex.from_games(make_games())
+
+    # Match 3 was played on different clubs
+    assert index.games_together(1, 2) == 1
+    assert index.games_together(1, 3) == 1
+    assert index.games_together(2, 3) == 0
+    assert index.degree(1) == 2
+
+
+def test_top_synergies_ranks_by_teammate_average_war():
+    index = TeammateIndex.from_games(make_games())
+
+    best = index.top_synergies(1, k=2, min_games=1)
+    worst = index.top_synergies(1, k=1, min_games=1, largest=False)
+
+    assert [t["teammate_name"] for t in best] == ["b", "c"]
+    assert [t["teammate_avg_war"] for t in best] == [0.5, 0.25]
+    assert worst[0]["teammate_name"] == "c"
+    assert index.top_synergies(1, min_games=2) == []
+
+
+def test_round_trip(tmp_path):
+    index = TeammateIndex.from_games(make_games())
+    path = str(tmp_path / "teammates.npz")
+    index.save(path)
+
+    loaded = TeammateIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert "3" in loaded
+    assert loaded.top_synergies(1, k=5, min_games=1) == index.top_synergies(1, k=5, min_games=1)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics import WARTimeSeries
+
+
+def make_games():
+    # Player 1's match 102 is listed twice; rows are out of game order
+    return pd.DataFrame({
+        "player_id": [1, 1, 1, 1, 1, 2],
+        "match_id": [103, 101, 102, 102, 104, 101],
+        "war_value": [3.0, 1.0, 2.0, 2.0, 4.0, 5.0],
+        "offensive_war": [1.0, 0.0, 1.0, 1.0, 2.0, 2.0],
+        "defensive_war": [1.0, 1.0, 0.5, 0.5, 1.0, 2.0],
+        "teamplay_war": [1.0, 0.0, 0.5, 0.5, 1.0, 1.0],
+    })
+
+
+def test_history_is_deduplicated_and_in_game_order():
+    store = WARTimeSeries.from_games(make_games(), windows=(2,))
+
+    history = store.history(1)
+
+    assert store.games_played(1) == 4
+    assert history["match_id"].tolist() == [101, 102, 103, 104]
+    assert history["war_value"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert store.rolling(1, 2)["war_value"].tolist() == [1.0, 1.5, 2.5, 3.5]
+
+
+def test_window_queries():
+    store = WARTimeSeries.from_games(make_games(), windows=(2,))
+
+    assert store.window_sum(1, 1, 3)["war_value"] == 5.0
+    form = store.form(1, window=3)
+    assert form["games"] == 3
+    assert form["war_value"] == pytest.approx(3.0)
+    assert store.trend(1, window=2)["war_value"] == pytest.approx(2.0)
+    # Not enough games for two windows
+    assert store.trend(2, window=2)["war_value"] == 0.0
+
+
+def test_round_trip(tmp_path):
+    store = WARTimeSeries.from_games(make_games(), windows=(2, 3))
+    path = str(tmp_path / "war_timeseries.npz")
+    store.save(path)
+
+    loaded = WARTimeSeries.load(path)
+
+    assert loaded.windows == [2, 3]
+    assert "2" in loaded
+    for col, values in store.history(1).items():
+        np.testing.assert_array_equal(loaded.history(1)[col], values)
+    assert loaded.form(1) == store.form(1)